@@ -2,7 +2,7 @@
 File name: ed_data_viz.py
 Author: Edward Bujak
 Date created: 2023.12.13
-Date last modified: 2023.12.19
+Date last modified: 2026.10.17
 Python Version: 3.11.5 (that ed_data_viz was tested with)
 
 collection of data visualization functions and classes
@@ -11,12 +11,14 @@ For extensive examples of usage, go to ed_data_viz.demo.ipynb
 
 Functions:
     plot_bar_categorical
+    plot_features
     plot_histogram_
     plot_histogram
     plot_pie
 
 Classes:
-    none
+    FigurePool
+    RenderCache
     
 
 
@@ -30,7 +32,7 @@ ed_data_viz.__version__
 """
 
 # module level dunder names
-__version__ = '0.1.4'
+__version__ = '0.1.14'
 version = __version__
 __title__ = "ed_data_viz"
 __summary__ = "Collection of useful data visualization functions and classes."
@@ -43,8 +45,8 @@ __license__ = "GPL"
 __maintainer__ = "Edward Bujak"
 __email__ = "Edward_Bujak@hotmail.com"
 __status__ = "Never Ending Development"
-__classes__ = []
-__functions__ = ['plot_bar_categorical', 'plot_histogram_', 'plot_histogram', 'plot_pie', 'versions',
+__classes__ = ['FigurePool', 'RenderCache']
+__functions__ = ['plot_bar_categorical', 'plot_features', 'plot_histogram_', 'plot_histogram', 'plot_pie', 'versions',
                 ]
 #  __all__ list defines what will be imported from ed_data_viz.py when the statement
 # from ed_data_viz import *
@@ -53,6 +55,32 @@ __all__ = __functions__ + __classes__
 
 __history__ = """
 
+0.1.14 - 2026.10.17 - Edward Bujak - plot_features(): workers=0 raises ValueError instead of using all CPUs
+0.1.13 - 2026.10.17 - Edward Bujak - plot_features(): the max_categories skip rule is applied before the RenderCache lookup, and max_categories is part of
+                                    the cache key, so a cached bar chart no longer brings back a column that is now skipped
+0.1.12 - 2026.10.17 - Edward Bujak - plot_histogram_(): the span of integer data is computed with Python ints and chunks are offset in 64 bits, so int8 data
+                                    or int64 data spanning more than 2**63 no longer overflows
+0.1.11 - 2026.10.17 - Edward Bujak - plot_histogram_(), plot_histogram(), plot_bar_categorical(): a RenderCache hit returns (fig, ax), a figure showing the cached
+                                    image, instead of (None, None); the cache is used only for raster file_paths (.png, .jpg, ...); added test_ed_data_viz.py
+0.1.10 - 2026.10.17 - Edward Bujak - FigurePool: plot_* functions take a pooled figure only with close=True; with close=False they return a figure of
+                                    their own, so a figure a caller holds is never cleared and reused by a later plot call
+0.1.9 - 2026.10.17 - Edward Bujak - added RenderCache class: opt-in on-disk cache of plot images keyed by a blake2b hash of the data buffer
+                                    and every plotting parameter; a hit copies (or symlinks) the cached image to file_path instead of rendering;
+                                    least recently used images are evicted past max_bytes; stats() reports the hit rate
+                                    added cache parameter to plot_histogram_(), plot_histogram(), plot_bar_categorical(), plot_features()
+0.1.8 - 2026.10.17 - Edward Bujak - added FigurePool class: reuses Figure objects across renders of the same size
+                                    plot_histogram_(), plot_histogram(), plot_pie(), plot_bar_categorical() draw through their Figure and
+                                    Axes instead of pyplot state, return (fig, ax), and take ax (draw into an existing Axes) and close
+                                    (close the figure, or give it back to the active FigurePool) parameters
+                                    plot_features() closes every figure it draws, reusing them within each worker
+0.1.7 - 2026.10.17 - Edward Bujak - added plot_features() function: a histogram or bar chart image of every feature of a
+                                    DataFrame, from stats computed once per column, rendered headless in a process pool;
+                                    returns a manifest of the files written
+0.1.6 - 2026.10.17 - Edward Bujak - plot_histogram_(), plot_histogram(): the KDE curve of more than 20,000 values is binned on a
+                                    fine grid and convolved with the kernel by FFT (same Scott's rule bandwidth); added
+                                    kde_max_points to use an exact KDE of a random sample instead
+0.1.5 - 2026.10.17 - Edward Bujak - plot_histogram_() bins numeric data itself, in chunks (np.histogram(),
+                                    np.bincount() for integers), and hands seaborn only the bin edges and counts
 0.1.4 - 2023.12.19 - Edward Bujak - modified plot_bar_bar_categorical() function to call
                                         plt.tight_layout() before plt.savefig() to assure
                                         that saved images are not clipped
@@ -100,6 +128,362 @@ from typing import (
 )
 
 
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+# FIGURES
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+
+import os   # for path.splitext()
+import matplotlib.image   # for imread()
+import matplotlib.pyplot as plt
+from types import TracebackType
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+
+_figure_pools = []   # the active FigurePools, innermost last
+
+
+class FigurePool:
+    """
+    Reuses matplotlib Figure objects across repeated renders of the same size, instead of creating (and
+    leaking) a new one per plot.
+
+    While a FigurePool is active (as a context manager), the plot_* functions called with close=True take
+    their figure from it and give it back, cleared, once drawn and saved; up to max_idle figures per size
+    are kept for reuse, any more are closed. Called with close=False, they return a figure of their own
+    (not from the pool), so a figure a caller holds is never cleared by a later plot. On exit, every figure
+    the pool created is closed, including those still in use (e.g. acquired directly).
+
+    Parameters:
+        - max_idle (Optional[int]): Most idle figures kept per figure size. Defaults to 4.
+
+    Attributes:
+        - created (int): Figures created by the pool.
+        - reused (int): Figures handed out again, after being released.
+
+    Usage/Example:
+        with FigurePool():
+            for feature in features:
+                plot_histogram(feature, df, file_path=f'{feature}.png', close=True)
+    """
+
+    def __init__(self, max_idle: Optional[int] = 4):
+        if not isinstance(max_idle, int) or max_idle < 0:
+            raise ValueError(f"Expected 'max_idle' to be a non-negative integer; {max_idle = }")
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self._idle: Dict[Tuple[float, float], List[plt.Figure]] = {}
+        self._figures: List[plt.Figure] = []   # every figure created, idle or in use
+
+    def acquire(self, figsize: Union[Tuple[Union[int, float], Union[int, float]],
+                                     List[Union[int, float]]]) -> plt.Figure:
+        """Returns an empty figure of size figsize (inches), made current: an idle one if any, else a new one."""
+        idle = self._idle.get((float(figsize[0]), float(figsize[1])))
+        if idle:
+            self.reused += 1
+            return plt.figure(idle.pop())   # make it current again, as plt.figure(figsize=...) would
+        self.created += 1
+        fig = plt.figure(figsize=figsize)
+        self._figures.append(fig)
+        return fig
+
+    def release(self, fig: plt.Figure) -> None:
+        """Clears fig and keeps it for reuse; closes it if the pool did not create it or has enough idle."""
+        if not self.owns(fig):
+            plt.close(fig)
+            return
+        idle = self._idle.setdefault(tuple(fig.get_size_inches().tolist()), [])
+        if any(fig is other for other in idle):
+            return
+        if len(idle) >= self.max_idle:
+            self._figures.remove(fig)
+            plt.close(fig)
+            return
+        fig.clear()
+        # tight_layout() moves the subplot params; start the next render from the defaults
+        fig.subplots_adjust(**{name: plt.rcParams[f'figure.subplot.{name}']
+                               for name in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')})
+        idle.append(fig)
+
+    def owns(self, fig: plt.Figure) -> bool:
+        """Whether fig was created by this pool (and not closed since)."""
+        return any(fig is owned for owned in self._figures)
+
+    def close(self) -> None:
+        """Closes every figure the pool created."""
+        for fig in self._figures:
+            plt.close(fig)
+        self._figures = []
+        self._idle = {}
+
+    def __enter__(self):
+        _figure_pools.append(self)
+        return self
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> bool:
+        if self in _figure_pools:
+            _figure_pools.remove(self)
+        self.close()
+        return False
+
+FigurePool.__version__ = FigurePool.version = '0.2'
+
+
+def _figure_and_axes(ax: Optional[plt.Axes],
+                     figsize: Union[Tuple[Union[int, float], Union[int, float]],
+                                    List[Union[int, float]]],
+                     close: bool,
+                     ) -> Tuple[plt.Figure, plt.Axes]:
+    """The figure and axes a plot_* function draws into: ax and its figure if given, else a new figure
+    of size figsize with a single axes. The figure is from the active FigurePool, if any, only when the
+    plot_* function closes it (close=True): a figure returned to the caller is never cleared and reused."""
+    if ax is not None:
+        return ax.figure, ax
+    if _figure_pools and close:
+        fig = _figure_pools[-1].acquire(figsize)
+        return fig, fig.add_subplot()
+    return plt.subplots(figsize=figsize)
+
+
+def _close_figure(fig: plt.Figure) -> None:
+    """Gives fig back to the active FigurePool that created it, or closes it."""
+    for pool in reversed(_figure_pools):
+        if pool.owns(fig):
+            pool.release(fig)
+            return
+    plt.close(fig)
+
+
+# images that matplotlib.image.imread() reads back (through Pillow, except PNG), for a RenderCache hit
+_RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.webp', '.bmp', '.gif')
+
+
+def _is_raster(file_path: str) -> bool:
+    """Whether the image file_path is saved as (by its extension) can be read back into a figure."""
+    return os.path.splitext(file_path)[1].lower() in _RASTER_EXTENSIONS
+
+
+def _cached_figure(file_path: str,
+                   figsize: Union[Tuple[Union[int, float], Union[int, float]],
+                                  List[Union[int, float]]],
+                   close: bool,
+                   ) -> Tuple[plt.Figure, plt.Axes]:
+    """The (fig, ax) a plot_* function returns when its image was taken from a RenderCache: the image
+    saved to file_path, shown in a figure of size figsize on an axes spanning it, without ticks."""
+    fig, ax = _figure_and_axes(None, figsize, close)
+    ax.imshow(matplotlib.image.imread(file_path))
+    ax.set_axis_off()
+    fig.subplots_adjust(left=0, bottom=0, right=1, top=1)
+    if close:
+        _close_figure(fig)
+    return fig, ax
+
+
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+# CACHE
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+
+import collections   # for OrderedDict()
+import hashlib   # for blake2b()
+import os   # for makedirs(), replace(), symlink(), utime()
+import shutil   # for copyfile()
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+from typing import Optional, Union
+
+_HASH_CHUNK_BYTES = 1 << 24   # bytes of an array hashed at a time (a non-contiguous chunk is copied)
+
+
+def _hash_data(h: 'hashlib._Hash', data) -> None:
+    '''
+    Feeds data to hash h: a numpy array (or the numpy array of a Series, list or tuple) through its
+    buffer, chunk by chunk; object and extension dtypes through pandas' vectorized hash of the values;
+    a dict through its items.
+    '''
+    if isinstance(data, dict):
+        h.update(repr(list(data.items())).encode())
+        return
+    values = data.to_numpy() if isinstance(data, pd.Series) and isinstance(data.dtype, np.dtype) else data
+    if isinstance(values, (list, tuple)):
+        values = np.asarray(values)
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        h.update(f'{values.dtype.str}{values.shape}'.encode())
+        values = values.reshape(-1)
+        step = max(1, _HASH_CHUNK_BYTES // max(1, values.itemsize))
+        for start in range(0, len(values), step):
+            h.update(np.ascontiguousarray(values[start:start + step]).view(np.uint8))
+        return
+    s = data if isinstance(data, pd.Series) else pd.Series(values, dtype=object)
+    h.update(repr(s.dtype).encode())
+    h.update(pd.util.hash_pandas_object(s, index=False).to_numpy())
+
+
+class RenderCache:
+    """
+    Opt-in on-disk cache of rendered plot images, keyed by content: a hash (blake2b) of the data, of every
+    plotting parameter, and of what else decides the image (the matplotlib rcParams, and the versions of
+    ed_data_viz, matplotlib and seaborn). plot_histogram_(), plot_histogram(), plot_bar_categorical() and
+    plot_features() take it as their `cache` argument, for images saved to a file_path, e.g. for the same
+    unchanged columns plotted again by every run of a report.
+
+    On a hit nothing is rendered: the cached image is copied (link='copy') or symbolically linked
+    (link='symlink') to file_path, and the plot_* functions still return (fig, ax), a figure showing
+    that image (so they use the cache only for raster images, e.g. .png; plot_features() for any).
+    On a miss the plot is rendered and saved as usual, then copied into the cache. The least recently
+    used images are removed once the cache holds more than max_bytes; the last use of an image is its
+    file's mtime, so the order carries over to the next run.
+
+    Data is hashed through its buffer (a numeric column costs about as much as reading it once);
+    object and extension dtypes through pandas.util.hash_pandas_object().
+
+    Parameters:
+        - directory (Optional[str]): Directory the images are kept in (created if needed).
+              Defaults to 'ed_data_viz_cache'.
+        - max_bytes (Optional[int]): Most bytes of images kept. Defaults to 256 MiB.
+        - link (Optional[str]): 'copy' or 'symlink'. A symlinked file_path is only valid while its
+              image is in the cache. Defaults to 'copy'.
+
+    Usage/Examples:
+        import ed_data_viz
+
+        cache = ed_data_viz.RenderCache('plots/.cache', max_bytes=1 << 30)
+        ed_data_viz.plot_histogram('price', df, file_path='plots/price.png', cache=cache)
+        ed_data_viz.plot_features(df, 'plots', cache=cache)
+        cache.stats()   # {'hits': ..., 'misses': ..., 'hit_rate': ..., ...}
+
+        # any other image
+        key = cache.key('my_plot', data, {'bins': 50})
+        if not cache.fetch(key, 'plots/my_plot.png'):
+            ...   # render and save 'plots/my_plot.png'
+            cache.store(key, 'plots/my_plot.png')
+    """
+    def __init__(self,
+                 directory: Optional[str] = 'ed_data_viz_cache',
+                 max_bytes: Optional[int] = 256 << 20,
+                 link: Optional[str] = 'copy'):
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError(f"Expected 'max_bytes' to be a non-negative integer; {max_bytes = }")
+        if link not in ('copy', 'symlink'):
+            raise ValueError(f"Expected 'link' to be 'copy' or 'symlink'; {link = }")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # image file name -> size, least recently used first
+        self._entries = collections.OrderedDict()
+        images = [entry for entry in os.scandir(directory) if entry.is_file() and not entry.name.startswith('.')]
+        for entry in sorted(images, key=lambda entry: entry.stat().st_mtime_ns):
+            self._entries[entry.name] = entry.stat().st_size
+        self._evict()
+
+    def key(self, kind: str, data, params: dict) -> str:
+        """
+        The cache key (hex digest) of an image of kind (e.g. the plotting function's name) drawn from data
+        (a Series, array, list, tuple or dict) with params (a dict of every other plotting parameter).
+        """
+        h = hashlib.blake2b(digest_size=20)
+        context = (kind, __version__, matplotlib.__version__, sns.__version__, sorted(params.items()),
+                   [(name, value) for name, value in plt.rcParams.items() if name != 'backend'])
+        h.update(repr(context).encode())
+        _hash_data(h, data)
+        return h.hexdigest()
+
+    def _path(self, key: str, file_path: str) -> str:
+        # the extension decides the image format
+        return os.path.join(self.directory, key + os.path.splitext(file_path)[1].lower())
+
+    def fetch(self, key: str, file_path: str) -> bool:
+        """
+        On a hit, copies (or links) the cached image of key to file_path and returns True; otherwise
+        returns False, and file_path is left to be rendered (a symlink there is removed first, so the
+        render cannot write through it into the cache).
+        """
+        cached = self._path(key, file_path)
+        name = os.path.basename(cached)
+        try:
+            os.utime(cached)   # most recently used, also for the next run
+        except FileNotFoundError:
+            self.misses += 1
+            self._entries.pop(name, None)
+            if os.path.islink(file_path):
+                os.remove(file_path)
+            return False
+
+        self.hits += 1
+        if name not in self._entries:   # stored by another process
+            self._entries[name] = os.path.getsize(cached)
+        self._entries.move_to_end(name)
+        if os.path.lexists(file_path) and (self.link == 'symlink' or os.path.islink(file_path)):
+            os.remove(file_path)
+        if self.link == 'symlink':
+            os.symlink(os.path.abspath(cached), file_path)
+        else:
+            shutil.copyfile(cached, file_path)
+        return True
+
+    def store(self, key: str, file_path: str) -> None:
+        """Copies the image rendered to file_path into the cache as the image of key, evicting as needed."""
+        cached = self._path(key, file_path)
+        size = os.path.getsize(file_path)
+        if size > self.max_bytes:
+            return
+        # copied under a temporary name, then renamed, so no other process sees a partial image
+        temporary = os.path.join(self.directory, f'.{os.getpid()}.{os.path.basename(cached)}')
+        shutil.copyfile(file_path, temporary)
+        os.replace(temporary, cached)
+        name = os.path.basename(cached)
+        self._entries[name] = size
+        self._entries.move_to_end(name)
+        self._evict()
+
+    def _evict(self) -> None:
+        total = sum(self._entries.values())
+        while total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            total -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        """Returns hits, misses, hit_rate, evictions, and the number and bytes of images kept."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'images': len(self._entries),
+            'bytes': sum(self._entries.values()),
+            'max_bytes': self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Removes all images and resets the statistics."""
+        for name in self._entries:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+RenderCache.__version__ = RenderCache.version = '0.2'
+
+
 # -------------------------------------------------------------------------------------------------------
 # -------------------------------------------------------------------------------------------------------
 # UNIVARIATE
@@ -110,7 +494,232 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
 from typing import Union, Optional
+import warnings   # for catch_warnings()
+
+_HISTOGRAM_CHUNK_SIZE = 1 << 22   # values per chunk when binning
+_BINCOUNT_MAX_SPAN = 1 << 24   # integer data spanning at most this many values is counted with np.bincount()
+_KDE_CHUNK_SIZE = 1 << 14   # values per chunk when evaluating the KDE at each grid point
+_KDE_EXACT_MAX_POINTS = 20_000   # more values than this: binned KDE
+_KDE_BINS_PER_BANDWIDTH = 20   # grid points per bandwidth for the binned KDE
+_KDE_MAX_GRID = 1 << 21   # at most this many grid points for the binned KDE
+
+
+def _numeric_values(s: Union[pd.Series, list, tuple, np.ndarray]) -> Optional[np.ndarray]:
+    '''s as a 1-D numeric numpy.ndarray (a view when possible), or None if it is not numeric.'''
+    if isinstance(s, pd.Series):
+        if s.dtype.kind in 'iufb' and not isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+            values = s.to_numpy()
+        elif pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+            values = s.to_numpy(dtype=float, na_value=np.nan)   # nullable Int64, Float64, ...
+        else:
+            return None
+    else:
+        values = np.asarray(s)
+    if values.ndim != 1 or values.dtype.kind not in 'iufb':
+        return None
+    return values
+
+
+def _chunks(values: np.ndarray):
+    for start in range(0, len(values), _HISTOGRAM_CHUNK_SIZE):
+        yield values[start:start + _HISTOGRAM_CHUNK_SIZE]
+
+
+def _binned_counts(values: np.ndarray,
+                   bins: Union[int, str, list, np.ndarray],
+                   ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    '''
+    The bin edges and counts of the histogram of values, like seaborn's histplot() bins them
+    (np.histogram_bin_edges() over the range of the non-NaN values), or None if there are no such values.
+
+    Counted chunk by chunk, so NaNs are dropped without copying values: np.histogram() of each chunk
+    (NaNs are outside every bin), or one np.bincount() per chunk for integer data of a small span.
+    '''
+    is_bool = values.dtype.kind == 'b'
+    if is_bool:
+        values = values.view(np.uint8)   # counted as 0 and 1
+    is_integer = values.dtype.kind in 'iu'
+    if isinstance(bins, (int, np.integer)):
+        first, last = np.inf, -np.inf
+        for chunk in _chunks(values):
+            if len(chunk):
+                # nanmin()/nanmax() reduce without a NaN-free copy; an all-NaN chunk warns, and gives NaN
+                with np.errstate(invalid='ignore'), warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    chunk_min, chunk_max = np.nanmin(chunk), np.nanmax(chunk)
+                if not np.isnan(chunk_min):
+                    first, last = min(first, chunk_min), max(last, chunk_max)
+        if first > last:
+            return None
+        if is_integer:   # Python ints: last - first in the data's own dtype (e.g. int8) can overflow
+            first, last = int(first), int(last)
+        edges = np.histogram_bin_edges([], bins=bins, range=(first, last) if first < last else
+                                       (first - 0.5, last + 0.5))   # a single value, like np.histogram()
+    elif isinstance(bins, str):
+        finite = values if is_integer else values[~np.isnan(values)]   # the rule needs all values
+        if len(finite) == 0:
+            return None
+        # seaborn takes booleans as floats; numpy's rules make bins of integer data at least 1 wide
+        edges = np.histogram_bin_edges(finite.astype(float) if is_bool else finite, bins=bins)
+        first, last = finite.min(), finite.max()
+        if is_integer:
+            first, last = int(first), int(last)
+    else:
+        edges = np.asarray(bins, dtype=float)
+        first = last = None
+
+    counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    if is_integer and first is not None and last - first < _BINCOUNT_MAX_SPAN:
+        value_counts = np.zeros(last - first + 1, dtype=np.int64)
+        wide = np.uint64 if values.dtype.kind == 'u' else np.int64   # chunk - first without overflow
+        for chunk in _chunks(values):
+            value_counts += np.bincount((chunk.astype(wide) - wide(first)).astype(np.intp),
+                                        minlength=len(value_counts))
+        # the bin of each integer value, as np.histogram() assigns it: [edge, next edge), the last bin closed
+        in_range = (np.arange(first, last + 1) >= edges[0]) & (np.arange(first, last + 1) <= edges[-1])
+        bin_of = np.searchsorted(edges, np.arange(first, last + 1), side='right') - 1
+        bin_of = np.minimum(bin_of, len(counts) - 1)
+        counts += np.bincount(bin_of[in_range], weights=value_counts[in_range],
+                              minlength=len(counts)).astype(np.int64)
+    else:
+        for chunk in _chunks(values):
+            counts += np.histogram(chunk, bins=edges)[0]
+    return edges, counts
+
+
+def _kde_exact(values: np.ndarray, gridsize: int = 200) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    '''
+    The Gaussian KDE of the non-NaN values, as seaborn's histplot(kde=True) draws it: Scott's rule
+    bandwidth, evaluated at gridsize points from the min to the max of the values (cut=0); None when
+    seaborn draws no curve (fewer than 2 values, or no variance). Every value adds to every grid point.
+    '''
+    values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values.astype(float)
+    n = len(values)
+    if n < 2:
+        return None
+    std = values.std(ddof=1)
+    if std == 0:
+        return None
+    bw = std * n ** (-1 / 5)   # Scott's rule, as scipy's gaussian_kde()
+    support = np.linspace(values.min(), values.max(), gridsize)
+    density = np.zeros(gridsize)
+    for start in range(0, n, _KDE_CHUNK_SIZE):
+        z = (support[:, None] - values[None, start:start + _KDE_CHUNK_SIZE]) / bw
+        density += np.exp(-0.5 * z * z).sum(axis=1)
+    density /= n * bw * np.sqrt(2 * np.pi)
+    return support, density
+
+
+def _kde_binned(values: np.ndarray, gridsize: int = 200) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    '''
+    _kde_exact() of many values, in time linear in their number: the values are linearly binned onto a
+    fine grid (_KDE_BINS_PER_BANDWIDTH points per bandwidth), the grid is convolved with the Gaussian
+    kernel by FFT, and the result is interpolated at the gridsize points. The bandwidth (Scott's rule)
+    is the same, from the mean and variance accumulated chunk by chunk.
+    '''
+    def _finite_chunks():
+        for chunk in _chunks(values):
+            chunk = chunk[~np.isnan(chunk)] if chunk.dtype.kind == 'f' else chunk.astype(float)
+            if len(chunk):
+                yield chunk
+
+    # first pass: count, mean, sum of squared deviations (merged per chunk, Chan et al.), min, max
+    n, mean, m2 = 0, 0.0, 0.0
+    first, last = np.inf, -np.inf
+    for chunk in _finite_chunks():
+        chunk_mean = chunk.mean()
+        delta = chunk_mean - mean
+        total = n + len(chunk)
+        m2 += ((chunk - chunk_mean) ** 2).sum() + delta ** 2 * n * len(chunk) / total
+        mean += delta * len(chunk) / total
+        n = total
+        first, last = min(first, chunk.min()), max(last, chunk.max())
+    if n < 2 or m2 == 0:
+        return None
+    bw = np.sqrt(m2 / (n - 1)) * n ** (-1 / 5)   # Scott's rule, as scipy's gaussian_kde()
+
+    # second pass: linear binning, each value split between its two neighboring grid points
+    size = int(np.clip(np.ceil((last - first) / bw * _KDE_BINS_PER_BANDWIDTH) + 1, gridsize, _KDE_MAX_GRID))
+    step = (last - first) / (size - 1)
+    grid_counts = np.zeros(size)
+    for chunk in _finite_chunks():
+        position = (chunk - first) / step
+        left = np.minimum(position.astype(np.int64), size - 2)
+        right_weight = position - left
+        grid_counts += np.bincount(left, weights=1 - right_weight, minlength=size)
+        grid_counts += np.bincount(left + 1, weights=right_weight, minlength=size)
+
+    # the kernel at every grid offset, -(size - 1) .. size - 1; the linear convolution by zero-padded FFT
+    offsets = np.arange(-(size - 1), size) * (step / bw)
+    kernel = np.exp(-0.5 * offsets * offsets)
+    n_fft = 1 << int(np.ceil(np.log2(3 * size - 2)))
+    convolved = np.fft.irfft(np.fft.rfft(grid_counts, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    grid_density = convolved[size - 1:2 * size - 1] / (n * bw * np.sqrt(2 * np.pi))
+
+    support = np.linspace(first, last, gridsize)
+    return support, np.interp(support, np.linspace(first, last, size), grid_density)
+
+
+def _kde(values: np.ndarray, max_points: Optional[int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    '''
+    The KDE curve of values for histplot(kde=True): exact for a few values, binned (FFT) otherwise, or,
+    if max_points is given and there are more values, exact on a random sample of about max_points.
+    '''
+    if len(values) <= _KDE_EXACT_MAX_POINTS:
+        return _kde_exact(values)
+    if max_points is not None and len(values) > max_points:
+        rng = np.random.default_rng(0)   # the same sample, and plot, every time
+        return _kde_exact(values[rng.choice(len(values), size=max_points, replace=False)])
+    return _kde_binned(values)
+
+
+def _histogram_stats(values: np.ndarray,
+                     bins: Union[int, str, list, np.ndarray],
+                     kde: bool,
+                     kde_max_points: Optional[int] = None,
+                     ) -> Optional[Tuple[np.ndarray, np.ndarray, Optional[Tuple[np.ndarray, np.ndarray]]]]:
+    '''
+    What _histplot_stats() draws for values: their bin edges, counts and, if kde, KDE curve (None if
+    seaborn would draw none); None if values has no non-NaN values.
+    '''
+    binned = _binned_counts(values, bins)
+    if binned is None:
+        return None
+    edges, counts = binned
+    return edges, counts, _kde(values, kde_max_points) if kde else None
+
+
+def _histplot_stats(edges: np.ndarray,
+                    counts: np.ndarray,
+                    curve: Optional[Tuple[np.ndarray, np.ndarray]],
+                    color: Optional[str],
+                    alpha: Optional[float],
+                    ax: plt.Axes,
+                    ) -> None:
+    '''
+    Draws sns.histplot() into ax from pre-computed bin edges and counts (plus the KDE curve, scaled to
+    the counts), so seaborn gets one weighted point per bin instead of every value.
+    '''
+    if curve is not None:
+        # drawn before the bars, so seaborn sizes the bar edges to the final x range, as when it draws the
+        # curve itself; lines are drawn above patches anyway
+        support, density = curve
+        # like seaborn: scaled to the area of the histogram, in the color of the bars (set below)
+        density = density * (counts * np.diff(edges)).sum()
+        line, = ax.plot(support, density, color='black')
+        line.sticky_edges.y[:] = (0, np.inf)
+
+    sns.histplot(x=(edges[:-1] + edges[1:]) / 2,   # bin centers, weighted by the bin counts
+                 weights=counts,
+                 bins=edges.tolist(),   # a list: seaborn compares bins with 'auto'
+                 color=color,
+                 alpha=alpha,
+                 ax=ax,
+                 )
+    if curve is not None:
+        line.set_color(to_rgba(ax.patches[-1].get_facecolor(), 1))
 
 
 def plot_histogram_(
@@ -125,20 +734,41 @@ def plot_histogram_(
     color: Optional[str] = None,
     alpha: Optional[float] = 0.5,   # 0 .. 1
     file_path: Optional[str] = None,
-    ) -> None:
+    kde_max_points: Optional[int] = None,
+    ax: Optional[plt.Axes] = None,
+    close: Optional[bool] = False,
+    cache: Optional['RenderCache'] = None,
+    ) -> Tuple[plt.Figure, plt.Axes]:
     """
     Create and display a histogram plot of a given pandas Series, list, tuple, or numpy ndarray.
 
+    Numeric data is binned here, chunk by chunk (np.histogram(), or np.bincount() for integer data),
+    dropping NaNs without copying the data, and only the bin edges and counts are handed to seaborn,
+    so plotting time grows with the number of bins, not the number of values.
+    The KDE curve (kde=True) has seaborn's bandwidth (Scott's rule); above 20,000 values it is computed
+    on a fine grid, binned, and convolved with the kernel by FFT, instead of from every value.
+
     Parameters:
         - s (Union[pd.Series, list, tuple, np.ndarray]): The data to be plotted as a histogram.
         - xlabel (Optional[str], optional): Label for the x-axis. Defaults to 'Value'.
         - title (Optional[str], optional): Title for the histogram plot. Defaults to None.
+        - kde_max_points (Optional[int], optional): If given, the KDE curve of more values than this is
+              computed exactly from a random sample of about kde_max_points values, instead of binned.
+              Defaults to None.
+        - ax (Optional[plt.Axes], optional): Axes to draw into (figsize is then ignored). Defaults to None,
+              i.e. a new figure (from the active FigurePool, if any, with close=True).
+        - close (Optional[bool], optional): Close the figure (or give it back to the active FigurePool)
+              once drawn and saved. Defaults to False: the figure returned is the caller's, never reused.
+        - cache (Optional[RenderCache], optional): Take the image saved to file_path from this cache if
+              the same data was plotted with the same parameters before; only used with a raster file_path
+              (.png, .jpg, ...) and without ax. Defaults to None.
 
     Raises:
         - ValueError: If the input data 's' is not a pandas Series, list, tuple, or numpy ndarray.
 
     Returns:
-        - None
+        - Tuple[plt.Figure, plt.Axes]: The figure and axes drawn into. If the image was taken from the cache,
+              the figure shows that image, on an axes without ticks (its title and labels are in the image).
     """
     # Validate input parameter
     if not isinstance(s, (pd.Series, list, tuple, np.ndarray)):
@@ -152,29 +782,53 @@ def plot_histogram_(
         raise ValueError(
             "Both elements in figsize must be positive integers or floats.")
 
-    plt.figure(figsize=figsize)
-
-    sns.histplot(s,
-                 bins=bins,
-                 kde=kde,
-                 color=color,
-                 alpha=alpha,
-                )
+    # an image of the same data and parameters is taken from the cache instead of rendered
+    key = None
+    if cache is not None and file_path is not None and ax is None and _is_raster(file_path):
+        key = cache.key('plot_histogram_', s, {'figsize': figsize, 'xlabel': xlabel, 'title': title, 'bins': bins,
+                                               'kde': kde, 'color': color, 'alpha': alpha,
+                                               'kde_max_points': kde_max_points})
+        if cache.fetch(key, file_path):
+            print(f"Saving file '{file_path}' (cached)")
+            return _cached_figure(file_path, figsize, close)
+
+    fig, ax = _figure_and_axes(ax, figsize, close)
+
+    # numeric data is binned here, in chunks, and only the bins are handed to seaborn
+    values = _numeric_values(s)
+    stats = None if values is None else _histogram_stats(values, bins, kde, kde_max_points)
+    if stats is not None:
+        _histplot_stats(*stats, color=color, alpha=alpha, ax=ax)
+    else:
+        # not numeric, or no non-NaN values
+        sns.histplot(s,
+                     bins=bins,
+                     kde=kde,
+                     color=color,
+                     alpha=alpha,
+                     ax=ax,
+                    )
 
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel('Count')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Count')
 
     # Optionally write the chart out as a file
     if file_path is not None:
         # Apply tight_layout to adjust subplot params on savefig()
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"Saving file '{file_path}'") 
-        plt.savefig(file_path,
+        fig.savefig(file_path,
                     # dpi=1000
                     )
+        if key is not None:
+            cache.store(key, file_path)
+
+    if close:
+        _close_figure(fig)
+    return fig, ax
     
-plot_histogram_.__version__ = plot_histogram_.version = '0.5'
+plot_histogram_.__version__ = plot_histogram_.version = '0.11'
     
 # -------------------------------------------------------------------------------------------------------
 
@@ -183,6 +837,21 @@ import matplotlib.pyplot as plt
 from typing import Optional
 
 
+def _feature_labels(feature: str, s: pd.Series) -> Tuple[str, str]:
+    '''The x label (the feature name in LaTeX) and default title of plots of column feature of a DataFrame, s.'''
+    # Count non-NaN values and calculate percentage
+    N = s.notna().sum()   # Number of non-NaN values
+    num_records = len(s)
+    percentage_not_nan = N / num_records * 100
+
+    # print(f'{N = :,}')
+    # print(f'{num_records = :,}')
+    # print(f'{percentage_not_nan = }')
+
+    feature_latex = '$' + feature.replace('_', '\\_') + '$'
+    return feature_latex, f'Distribution of {feature_latex}\n(Non-NaN Count: {N:,}, {percentage_not_nan:.1f}% Non-NaN)'
+
+
 def plot_histogram(
     feature: str,
     dataframe: Optional[pd.DataFrame] = None,
@@ -195,7 +864,11 @@ def plot_histogram(
     color: Optional[str] = None,
     alpha: Optional[float] = 0.5,   # 0 .. 1
     file_path: Optional[str] = None,
-) -> None: 
+    kde_max_points: Optional[int] = None,
+    ax: Optional[plt.Axes] = None,
+    close: Optional[bool] = False,
+    cache: Optional['RenderCache'] = None,
+) -> Tuple[plt.Figure, plt.Axes]: 
     """
     Create and display a histogram plot of a specified feature in a pandas DataFrame.
 
@@ -204,6 +877,10 @@ def plot_histogram(
         - dataframe (Optional[pd.DataFrame]): The DataFrame containing the feature. 
               If None, the function tries to use a global DataFrame named 'df'.
         - file_path (Optional[str]): Path to save the plot image. If None, the plot is not saved.
+        - kde_max_points (Optional[int]): see plot_histogram_()
+        - ax (Optional[plt.Axes]): see plot_histogram_()
+        - close (Optional[bool]): see plot_histogram_()
+        - cache (Optional[RenderCache]): see plot_histogram_()
         - TODO
         - MORE HERE
         
@@ -213,7 +890,7 @@ def plot_histogram(
         - KeyError: If the 'feature' is not in the DataFrame.
 
     Returns:
-        None
+        - Tuple[plt.Figure, plt.Axes]: see plot_histogram_()
 
     Usage:
         - Call this function with the name of the feature and the DataFrame.
@@ -257,26 +934,17 @@ def plot_histogram(
         raise ValueError(
             "Both elements in figsize must be positive integers or floats.")
 
-    # Count non-NaN values and calculate percentage
-    N = dataframe[feature].notna().sum()   # Number of non-NaN values
-    num_records = len(dataframe)
-    percentage_not_nan = N / num_records * 100
-
-    # print(f'{N = :,}')
-    # print(f'{num_records = :,}')
-    # print(f'{percentage_not_nan = }')
-
-    feature_latex = '$' + feature.replace('_', '\\_') + '$'
+    feature_latex, default_title = _feature_labels(feature, dataframe[feature])
     
     # default title
     if not title:
-        title = f'Distribution of {feature_latex}\n(Non-NaN Count: {N:,}, {percentage_not_nan:.1f}% Non-NaN)'
+        title = default_title
 
     # default xlabel is the feature name
     if not xlabel:
         xlabel = f'${feature}$'
        
-    plot_histogram_(
+    return plot_histogram_(
         dataframe[feature],
         figsize=figsize,
         xlabel=feature_latex,
@@ -286,9 +954,13 @@ def plot_histogram(
         color=color,
         alpha=alpha,
         file_path=file_path,
+        kde_max_points=kde_max_points,
+        ax=ax,
+        close=close,
+        cache=cache,
     )
     
-plot_histogram.__version__ = plot_histogram.version = '0.5'
+plot_histogram.__version__ = plot_histogram.version = '0.9'
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -307,7 +979,9 @@ def plot_pie(
     figsize: Optional[Tuple[int, int]] = (10, 6),
     pie_type: Optional[str] = 'percentage',   # 'percentage' | 'count' | 'percentage_and_count' aka 'count_and_percentage'
     title: Optional[str] = '',
-) -> None:
+    ax: Optional[plt.Axes] = None,
+    close: Optional[bool] = False,
+) -> Tuple[plt.Figure, plt.Axes]:
     """
     Plot a pie chart based on the input data.
 
@@ -320,15 +994,17 @@ def plot_pie(
             Can be 'percentage', 'count', or 'percentage_and_count' (aka 'count_and_percentage').
             Defaults to 'percentage'.
          - title (str, optional): The title of the pie chart. Defaults to an empty string.
+        - ax (plt.Axes, optional): Axes to draw into (figsize is then ignored). Defaults to None, i.e. a new
+            figure (from the active FigurePool, if any, with close=True).
+        - close (bool, optional): Close the figure (or give it back to the active FigurePool) once drawn.
+            Defaults to False: the figure returned is the caller's, never reused.
 
     Raises:
         - ValueError: If pie_type is not one of the allowed values.
 
     Returns:
-        - None
+        - Tuple[plt.Figure, plt.Axes]: The figure and axes drawn into.
     """
-    plt.figure(figsize=figsize)
-    
     def absolute(pct, allvals):
         absolute_count = int(pct/100.*np.sum(allvals))
         return "{:d}".format(absolute_count)
@@ -359,19 +1035,26 @@ def plot_pie(
         raise TypeError(f"The title parameter must be a str; you pass {type(title)}.")
         
     # title = title.strip()
+
+    # created once the arguments are valid, so an error leaves no empty figure behind
+    fig, ax = _figure_and_axes(ax, figsize, close)
         
-    plt.pie(x,
-            labels=labels,
-            autopct=autopct,
-            startangle=startangle,
-            colors=colors,
-            )
-
-    plt.title(title, fontsize=16)
+    ax.pie(x,
+           labels=labels,
+           autopct=autopct,
+           startangle=startangle,
+           colors=colors,
+           )
+
+    ax.set_title(title, fontsize=16)
     # plt.show()
 
+    if close:
+        _close_figure(fig)
+    return fig, ax
 
-plot_pie.__version__ = plot_pie.version = '0.1'
+
+plot_pie.__version__ = plot_pie.version = '0.2'
 
 # -------------------------------------------------------------------------------------------------------
 # -------------------------------------------------------------------------------------------------------
@@ -407,8 +1090,11 @@ def plot_bar_categorical(
     # if total==0 then this is a relative frequency, then this function will calculate total
     # if total!=0 then this is an absolute frequency, and needs to be provided
     total: Optional[int] = 0,   # CHANGE
-    file_path: Optional[str] = None
-) -> None:
+    file_path: Optional[str] = None,
+    ax: Optional[plt.Axes] = None,
+    close: Optional[bool] = False,
+    cache: Optional['RenderCache'] = None,
+) -> Tuple[plt.Figure, plt.Axes]:
     """
     Create and display a bar plot for categorical data. 
     The left y-axis will be the count. 
@@ -435,9 +1121,20 @@ def plot_bar_categorical(
         - total: Optional[int]: Total value for calculating percentages. If set to 0, it will calculate the total
             from the values in the dictionary. Defaults to 0.
         - file_path: Optional[str]: file_path to save image to. Default is None, i.e. no image file is saved,
+        - ax: Optional[plt.Axes]: Axes to draw the counts into (figsize is then ignored); the percentage axis is
+            its twin. Default is None, i.e. a new figure (from the active FigurePool, if any, with close=True).
+        - close: Optional[bool]: Close the figure (or give it back to the active FigurePool) once drawn and saved.
+            Default is False: the figure returned is the caller's, never reused.
+        - cache: Optional[RenderCache]: Take the image saved to file_path from this cache if the same counts were
+            plotted with the same parameters before; only used with a raster file_path (.png, .jpg, ...) and without
+            ax. Default is None.
 
     Raises:
         - ValueError: If the input 'category_value_dict' is not a dictionary or if 'total' is not a non-negative integer.
+
+    Returns:
+        - Tuple[plt.Figure, plt.Axes]: The figure and the (left, count) axes drawn into. If the image was taken
+            from the cache, the figure shows that image, on a single axes without ticks (no twin axis).
     """
     if not isinstance(category_value_dict, dict):
         raise ValueError(f"Input 'category_value_dict' must be a dictionary; you passed a {type(category_value_dict)}.")
@@ -464,8 +1161,21 @@ def plot_bar_categorical(
 
     if total == 0:
         total = sum(category_value_dict.values())    
+
+    # an image of the same counts and parameters is taken from the cache instead of rendered
+    key = None
+    if cache is not None and file_path is not None and ax is None and _is_raster(file_path):
+        key = cache.key('plot_bar_categorical', category_value_dict,
+                        {'title': title, 'xlabel': xlabel, 'ylabel_on_left': ylabel_on_left,
+                         'ylabel_on_right': ylabel_on_right, 'xtick_rotation': xtick_rotation, 'figsize': figsize,
+                         'fontsize_top_of_bar': fontsize_top_of_bar, 'y_ticks_on_left_counts': y_ticks_on_left_counts,
+                         'y_ticks_on_right_percentage': y_ticks_on_right_percentage,
+                         'bar_annotation_type': bar_annotation_type, 'color': color, 'alpha': alpha, 'total': total})
+        if cache.fetch(key, file_path):
+            print(f"Saving file '{file_path}' (cached)")
+            return _cached_figure(file_path, figsize, close)
     
-    fig, ax1 = plt.subplots(figsize=figsize)
+    fig, ax1 = _figure_and_axes(ax, figsize, close)
 
     # Convert keys to strings - so the plotting of the x is exactly as
     # specified and not numeric order
@@ -475,7 +1185,7 @@ def plot_bar_categorical(
     # print(d_str)
 
     # First plot on ax1
-    bars = plt.bar(
+    bars = ax1.bar(
         name_value_dict.keys(),
         name_value_dict.values(),
         color=color,
@@ -547,15 +1257,203 @@ def plot_bar_categorical(
     # Optionally write the chart out as a file
     if file_path is not None:
         # Apply tight_layout to adjust subplot params on savefig()
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"Saving file '{file_path}'") 
-        plt.savefig(file_path,
+        fig.savefig(file_path,
                     # dpi=1000
                     )
+        if key is not None:
+            cache.store(key, file_path)
         
     # plt.show()
 
-plot_bar_categorical.__version__ = plot_bar_categorical.version = '0.3'
+    if close:
+        _close_figure(fig)
+    return fig, ax1
+
+plot_bar_categorical.__version__ = plot_bar_categorical.version = '0.6'
+
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+# BATCH
+# -------------------------------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------------------------------
+
+import concurrent.futures   # for ProcessPoolExecutor()
+import os   # for makedirs(), cpu_count()
+import re   # for sub()
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from typing import List, Optional, Tuple, Union
+
+
+def _render_init() -> None:
+    """Worker process initializer for plot_features(): headless rendering, reusing figures."""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    FigurePool().__enter__()   # for the life of the worker
+
+
+def _render_feature(task: dict) -> str:
+    """Renders one plot_features() figure from its pre-computed stats, saves it, and closes it."""
+    if task['kind'] == 'histogram':
+        fig, ax = _figure_and_axes(None, task['figsize'], True)
+        _histplot_stats(*task['stats'], color=task['color'], alpha=task['alpha'], ax=ax)
+        ax.set_title(task['title'])
+        ax.set_xlabel(task['xlabel'])
+        ax.set_ylabel('Count')
+        fig.tight_layout()
+        fig.savefig(task['file_path'])
+        _close_figure(fig)
+    else:
+        plot_bar_categorical(task['stats'],
+                             title=task['title'],
+                             xlabel=task['xlabel'],
+                             xtick_rotation=task['xtick_rotation'],
+                             color=task['color'],
+                             alpha=task['alpha'],
+                             file_path=task['file_path'],
+                             close=True,
+                             )
+    return task['file_path']
+
+
+def plot_features(
+    dataframe: pd.DataFrame,
+    output_dir: str,
+    features: Optional[List[str]] = None,
+    bins: Optional[int] = 20,
+    kde: Optional[bool] = True,
+    kde_max_points: Optional[int] = None,
+    max_categories: Optional[int] = 50,
+    figsize: Union[Tuple[Union[int, float], Union[int, float]],
+               List[Union[int, float]]] = (8, 7),
+    color: Optional[str] = None,
+    alpha: Optional[float] = 0.5,   # 0 .. 1
+    file_format: Optional[str] = 'png',
+    workers: Optional[int] = None,
+    cache: Optional['RenderCache'] = None,
+) -> pd.DataFrame:
+    """
+    Plot every feature of a DataFrame to an image file: a histogram (as plot_histogram() draws it) for
+    each numeric column, and a bar chart (plot_bar_categorical() of its value counts) for each other one.
+
+    The stats of each column (bin edges, counts and KDE curve, or value counts) are computed once, here;
+    the figures are then rendered from them in a pool of worker processes, headless (Agg backend), and
+    each figure is closed once saved, so the rendering of many features scales with the number of cores.
+
+    Parameters:
+        - dataframe (pd.DataFrame): The data.
+        - output_dir (str): Directory the images are written to (created if needed), one per feature,
+              named after it.
+        - features (Optional[List[str]]): The columns to plot. Defaults to None, i.e. all of them.
+        - bins, kde, kde_max_points, figsize, color, alpha: as for plot_histogram().
+        - max_categories (Optional[int]): Non-numeric columns with more distinct values than this are
+              skipped. Defaults to 50.
+        - file_format (Optional[str]): Image file format, e.g. 'png', 'svg', 'pdf'. Defaults to 'png'.
+        - workers (Optional[int]): Number of worker processes. Defaults to None, i.e. the number of CPUs;
+              1 renders in this process.
+        - cache (Optional[RenderCache]): Take the image of a feature from this cache if the same column was
+              plotted with the same parameters before, without computing its stats. Defaults to None.
+
+    Raises:
+        - TypeError: If 'dataframe' is not a pandas DataFrame.
+        - KeyError: If a feature is not in the DataFrame.
+        - ValueError: If 'workers' is not None or a positive integer.
+
+    Returns:
+        - pd.DataFrame: The manifest, one row per feature: feature, kind ('histogram', 'bar', or
+              'skipped'), and file_path (missing when skipped).
+
+    Example:
+        manifest = plot_features(df, 'plots/2023-12-20')
+        manifest[manifest['kind'] != 'skipped']['file_path'].tolist()
+    """
+    if not isinstance(dataframe, pd.DataFrame):
+        raise TypeError(f"Expected 'dataframe' to be a pandas DataFrame; {type(dataframe) = }")
+
+    features = list(dataframe.columns) if features is None else features
+    missing = [feature for feature in features if feature not in dataframe.columns]
+    if missing:
+        raise KeyError(f"Features {missing} not found in the DataFrame.")
+
+    if workers is not None and (not isinstance(workers, int) or workers <= 0):
+        raise ValueError(f"Expected 'workers' to be None or a positive integer; {workers = }")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = []
+    tasks = []
+    used_names = set()
+    for feature in features:
+        s = dataframe[feature]
+        is_numeric = pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+        kind = 'histogram' if is_numeric else 'bar'
+
+        # one file per feature, named after it (the name is taken unless the feature is skipped)
+        name = re.sub(r'[^\w.-]+', '_', str(feature)) or 'feature'
+        while name in used_names:
+            name += '_'
+        file_path = os.path.join(output_dir, f'{name}.{file_format}')
+
+        # the skip rules of a categorical column come first: a cached image must not bring back a column
+        # that max_categories now skips
+        stats = None
+        is_datetime = pd.api.types.is_datetime64_any_dtype(s.dtype)
+        if not is_numeric and not is_datetime:
+            value_counts = s.value_counts()
+            if 0 < len(value_counts) <= max_categories:
+                stats = value_counts.to_dict()
+        if is_datetime or (not is_numeric and stats is None):   # dates, no values, or too many categories
+            manifest.append({'feature': feature, 'kind': 'skipped', 'file_path': None})
+            continue
+
+        # an image of the same column and parameters is taken from the cache instead of rendered
+        # (a numeric column without values is skipped below, and so never cached)
+        key = None
+        if cache is not None:
+            key = cache.key(f'plot_features/{kind}', s, {'feature': str(feature), 'bins': bins, 'kde': kde,
+                                                         'kde_max_points': kde_max_points, 'figsize': figsize,
+                                                         'color': color, 'alpha': alpha,
+                                                         'max_categories': max_categories})
+            if cache.fetch(key, file_path):
+                used_names.add(name)
+                manifest.append({'feature': feature, 'kind': kind, 'file_path': file_path})
+                continue
+
+        if is_numeric:
+            values = _numeric_values(s)
+            stats = None if values is None else _histogram_stats(values, bins, kde, kde_max_points)
+            if stats is None:   # no values
+                manifest.append({'feature': feature, 'kind': 'skipped', 'file_path': None})
+                continue
+
+        used_names.add(name)
+        feature_latex, title = _feature_labels(str(feature), s)
+        tasks.append({'kind': kind, 'stats': stats, 'file_path': file_path, 'figsize': figsize,
+                      'title': title, 'xlabel': feature_latex, 'xtick_rotation': 45 if len(stats) > 10 else 0,
+                      'color': color, 'alpha': alpha, 'key': key})
+        manifest.append({'feature': feature, 'kind': kind, 'file_path': file_path})
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        with FigurePool():
+            for task in tasks:
+                _render_feature(task)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                                    initializer=_render_init) as executor:
+            for _ in executor.map(_render_feature, tasks):
+                pass
+
+    for task in tasks:
+        if task['key'] is not None:
+            cache.store(task['key'], task['file_path'])
+
+    return pd.DataFrame(manifest, columns=['feature', 'kind', 'file_path'])
+
+plot_features.__version__ = plot_features.version = '0.5'
 
 # -------------------------------------------------------------------------------------------------------
 # -------------------------------------------------------------------------------------------------------
@@ -2,7 +2,7 @@
 File name: ed_utils.py
 Author: Edward Bujak
 Date created: 2018.04.28
-Date last modified: 2023.12.16
+Date last modified: 2026.10.17
 Python Version: 3.11.5 (that ed_utils was tested with)
 
 collection of utility functions and classes
@@ -10,16 +10,29 @@ collection of utility functions and classes
 Functions:
     _inspector
     adder
+    build_gzip_index
+    build_line_index
     column_str
     five_number_summary
     five_number_summary2
+    five_number_summary_frame
     get_memory_info
     grep
+    grep_files
+    grep_many
+    grouped_five_number_summary
     head
     inspector
+    iqr_fences
+    iqr_outliers
     is_latitude
     is_longitude
     is_this_life_as_we_know_it
+    iter_grep
+    iter_grep_many
+    iter_head
+    iter_tail
+    lines
     ls_l - only available on unix-like Operating systems, not Windows
     meaning_of_life
     pp
@@ -29,10 +42,14 @@ Functions:
     tree
     versions
     wc
+    wc_batch
 
 Classes:
     HiddenPrints
     DummyContextManager
+    FollowTail
+    MetadataCache
+    KLLSketch
 
 
 Dependencies (aka requirements.txt)
@@ -55,7 +72,7 @@ ed_utils.__version__
 """
 
 # module level dunder names
-__version__ = '0.4.4'
+__version__ = '0.6.20'
 version = __version__
 __title__ = "ed_utils"
 __summary__ = "Collection of useful utility functions and classes."
@@ -77,11 +94,13 @@ __dunders__ = ["__title__", "__summary__",
                '__classes__', '__functions__', '__all__', '__history__',
               ]
                
-__classes__ = ['HiddenPrints', 'DummyContextManager']
-__functions__ = ['_inspector', 'adder', 'column_str', 'five_number_summary', 'five_number_summary2',
-                 'is_this_life_as_we_know_it', 'ls_l', 'meaning_of_life', 'pp',
+__classes__ = ['HiddenPrints', 'DummyContextManager', 'FollowTail', 'MetadataCache', 'KLLSketch']
+__functions__ = ['_inspector', 'adder', 'build_gzip_index', 'build_line_index', 'column_str', 'five_number_summary',
+                 'five_number_summary2', 'five_number_summary_frame', 'grep_files', 'grep_many', 'grouped_five_number_summary',
+                 'iqr_fences', 'iqr_outliers', 'is_this_life_as_we_know_it',
+                 'iter_grep', 'iter_grep_many', 'iter_head', 'iter_tail', 'lines', 'ls_l', 'meaning_of_life', 'pp',
                  'print_function_annotations', 'speak', 'tail',
-                 'tree', 'versions', 'wc'
+                 'tree', 'versions', 'wc', 'wc_batch'
                  ]
 #  __all__ list defines what will be imported from ed_utils.py when the statement
 # from ed_utils import *
@@ -89,6 +108,94 @@ __functions__ = ['_inspector', 'adder', 'column_str', 'five_number_summary', 'fi
 __all__ = __functions__ + __classes__
 
 __history__ = """
+0.6.20 - 2026.10.17 - Edward Bujak - iqr_fences() 0.2: chunked input takes Q1 and Q3 by the same method as a DataFrame
+                                    (Tukey's hinges or linear), from KLLSketch order statistics; tests of iqr_outliers() and KLLSketch
+0.6.19 - 2026.10.17 - Edward Bujak - grep_files(): whether a pattern needs the line-by-line search is read from its text, not from the re module's private
+                                    parser (anything that looks like \\A, \\Z or a lookaround counts); workers=0 raises ValueError instead of using all CPUs
+0.6.18 - 2026.10.17 - Edward Bujak - iter_tail(): numbers its lines again, as iter_head() and iter_grep() do (number_lines removed); tail() prints through a
+                                    private helper that does not number them, so it still reads only the last lines
+0.6.17 - 2026.10.17 - Edward Bujak - iter_grep_many(), grep_many(): with regex=True the hits are every pattern found in the line (not only those
+                                    winning the alternation), as for literal patterns; patterns with \\A, \\Z or a lookaround are matched line
+                                    by line; _trie_regex() is iterative
+0.6.16 - 2026.10.17 - Edward Bujak - wc_batch(): with recursive=True, symlinks to directories are not followed (a link to a parent looped until ELOOP),
+                                    and unreadable subdirectories are skipped instead of failing the whole batch
+0.6.15 - 2026.10.17 - Edward Bujak - build_gzip_index(): a sidecar made within 2 seconds of the file's mtime is provisional (format EDGZIX02 keeps a hash of the
+                                    compressed file), verified and then trusted on a later load, as a line index is
+0.6.14 - 2026.10.17 - Edward Bujak - build_line_index(): an index made within 2 seconds of the file's mtime is provisional (index format EDLIDX03 keeps a hash
+                                    of the content); its first use after that window checks the content and marks it trusted, instead of ignoring it forever
+0.6.13 - 2026.10.17 - Edward Bujak - gzip and bz2 detection: 'BZh' is bz2 only if followed by a block size digit and a block (or end of stream) magic;
+                                    the gzip index skips the NUL padding after a member, as the gzip module does, and raises EOFError for a truncated file;
+                                    added test_ed_utils.py
+0.6.12 - 2026.10.17 - Edward Bujak - MetadataCache: tables are named ed_utils_listings and ed_utils_wc_counts, and the database is marked with PRAGMA application_id;
+                                    an SQLite file with tables MetadataCache does not own is refused (ValueError) instead of having tables dropped
+0.6.11 - 2026.10.17 - Edward Bujak - added build_gzip_index(): a gzip checkpoint index sidecar (.gzidx) validated by size and mtime (not trusted within 2 seconds
+                                    of the mtime); tail() of a gzip file loads it if present. Checkpoints are zran-style (bit offset and a compressed
+                                    32 KiB window, at most 1,024 per file) instead of decompressor copies, bounding index memory; without the zlib C library
+                                    (ctypes) a gzip file is streamed like bz2 and xz
+0.6.10 - 2026.10.17 - Edward Bujak - MetadataCache: paths and names are stored as BLOBs (os.fsencode()), so names that are not valid UTF-8
+                                    are cached; a cache database of the old (TEXT) schema is emptied on open
+0.6.9 - 2026.10.17 - Edward Bujak - lines(): the line index is only built with build_index=True (otherwise the file is read without one);
+                                    build_line_index(), lines(): index_dir to keep indexes outside the data directory; an index made within
+                                    2 seconds of the file's mtime is not trusted (index format EDLIDX02 records when it was made)
+0.6.8 - 2026.10.17 - Edward Bujak - grep_files(): results in sorted path order; patterns with \\A, \\Z or a lookaround are searched line by line,
+                                    so they match as in grep()
+0.6.7 - 2026.10.17 - Edward Bujak - wc_batch(): docstring states which parts release the GIL, with measured throughput
+0.6.6 - 2026.10.17 - Edward Bujak - iter_tail(): line numbers are opt-in (number_lines=True); by default line_number is None and the start of
+                                    the file is not read, so tail() again takes time depending on num_lines, not on file size
+0.6.5 - 2026.10.17 - Edward Bujak - FollowTail: a rotated file that cannot be opened yet is retried on the next wake-up instead of raising
+                                    FileNotFoundError; a last line without a trailing newline is also yielded when the follow times out
+0.6.4 - 2026.10.17 - Edward Bujak - added iqr_fences() and iqr_outliers(): Tukey fences of all columns at once and broadcast
+                                    outlier masks or filtered frames; chunked data is fenced from KLLSketch quartiles in one
+                                    pass and flagged in a second, streaming pass
+0.6.3 - 2026.10.17 - Edward Bujak - five_number_summary2() accepts numpy scalars, and ndarray, np.memmap and Series input
+                                    checked by dtype; a np.memmap is summarized exactly in chunks (histogram passes, then
+                                    selection), dropping read pages, so the resident set stays small
+0.6.2 - 2026.10.17 - Edward Bujak - added grouped_five_number_summary(): 5-number summaries of many groups from one sort
+                                    by group and value, with order statistics picked at each group's offset
+0.6.1 - 2026.10.17 - Edward Bujak - added KLLSketch class: streaming, mergeable and serializable quantile sketch with
+                                    bounded memory for approximate five-number summaries of data read in chunks
+0.6.0 - 2026.10.17 - Edward Bujak - added five_number_summary_frame() to summarize all numeric
+                                    DataFrame columns in one vectorized pass; the select method of
+                                    five_number_summary() now uses nested single-kth partitions
+0.5.9 - 2026.10.17 - Edward Bujak - five_number_summary(method='select'): Tukey-hinge quartiles by np.partition() on the needed
+                                    order statistics; ndarray/Series input is validated by dtype
+0.5.8 - 2026.10.17 - Edward Bujak - head(), tail(), wc() and grep() read gzip, bz2, xz and zstd compressed files (detected by
+                                    magic bytes) as streams; tail() of a gzip file uses an in-memory checkpoint index
+0.5.7 - 2026.10.17 - Edward Bujak - added MetadataCache class: opt-in SQLite cache of directory listings and wc() counts,
+                                    validated by mtime/inode (and size), with hit/miss statistics; tree(), ls_l() and wc()
+                                    take it as their cache argument
+0.5.6 - 2026.10.17 - Edward Bujak - ls_l() accepts globs, lists recursively (recursive=True), sorts by name, size or mtime,
+                                    and pages its output (limit, page); Jupyter output is paginated and shown as soon as
+                                    the page is listed
+0.5.5 - 2026.10.17 - Edward Bujak - ls_l() lists with os.scandir() and one stat per entry, memoizes owner/group names and
+                                    mtime strings, looks permission strings up in a table, joins output lines once and uses
+                                    os.listxattr() where available
+0.5.4 - 2026.10.17 - Edward Bujak - added tree(sizes=True): du-style totals added up bottom-up after a thread-pool scan,
+                                    hard links counted once, and the top heaviest directories listed
+0.5.3 - 2026.10.17 - Edward Bujak - tree() walks iteratively with os.scandir() (no recursion limit, no extra stat per entry);
+                                    added max_depth, exclude glob patterns and output='dict'/'table'
+0.5.2 - 2026.10.17 - Edward Bujak - added build_line_index() and lines() functions: an on-disk sidecar index of line offsets
+                                    and wc() counts, so lines() seeks directly to any line range; head(), tail() and wc()
+                                    use an up-to-date index when one exists
+0.5.1 - 2026.10.17 - Edward Bujak - added grep_many() and iter_grep_many() functions: search a file for many patterns
+                                    in one pass with a trie-shaped regex (literals) or one combined regex, reporting
+                                    which patterns hit each line
+0.5.0 - 2026.10.17 - Edward Bujak - added grep_files() function: grep over a directory or glob (optionally recursive),
+                                    pattern compiled once, memory-mapped files searched in worker processes,
+                                    with invert (-v), count_only (-c) and files_only (-l) modes
+0.4.9 - 2026.10.17 - Edward Bujak - added wc_batch() function: wc() over a directory or glob with os.scandir() and a
+                                    bounded thread pool; returns a per-file DataFrame and totals with files per second
+0.4.8 - 2026.10.17 - Edward Bujak - rewrote wc() to count memory-mapped, newline-aligned byte ranges with no per-line
+                                    Python work; files >= 64 MiB are counted in a process pool
+                                    added unit ('chars' or 'bytes') and workers optional arguments to wc()
+0.4.7 - 2026.10.17 - Edward Bujak - added iter_head(), iter_tail(), iter_grep() generator functions that lazily
+                                    yield (line_number, line) tuples
+                                    head(), tail(), grep() are now thin printing wrappers over them
+0.4.6 - 2026.10.17 - Edward Bujak - added follow=True mode to tail() (like tail -f); returns a FollowTail iterator
+                                    added FollowTail class: inotify or adaptive polling, truncation and rotation
+                                        detection, lines-per-second throughput via .stats()
+0.4.5 - 2026.10.17 - Edward Bujak - rewrote tail() to seek backwards from the end of the file in fixed-size
+                                    binary blocks; only the last num_lines lines are read and decoded
 0.4.4 - 2023.12.16 - Edward Bujak - added print_function_annotations() function
 0.4.3 - 2023.12.15 - Edward Bujak - changed __copyright__ attribute
                                     added __title__ attribute
@@ -175,9 +282,9 @@ from typing import (
 #     Generic,
 #     Hashable,
 #     Iterable,
-#     Iterator,
+    Iterator,   # for iter_head(), iter_tail(), iter_grep()
 #     IO,
-#     List,
+    List,   # for tree()
 #     NoReturn,
     Optional,   # for head(), tail(), speak(), grep()
 #     Sequence,
@@ -217,42 +324,104 @@ is_this_life_as_we_know_it.__version__ = is_this_life_as_we_know_it.version = '0
     
 # -------------------------------------------------------------------------------------------------------
 
-import os   # for getcwd(), listdir(), ...
+import concurrent.futures   # for ThreadPoolExecutor()
+import fnmatch   # for translate()
+import heapq   # for nlargest()
+import os   # for getcwd(), scandir(), ...
+import re   # for compile()
 
 class DirectoryNotFoundError(Exception):
     pass
 
 def tree(path:  Optional[str] = None,
          indent: Optional[int] = 0,
-         ignore_hidden: Optional[bool] = True) -> (int, int):
+         ignore_hidden: Optional[bool] = True,
+         max_depth: Optional[int] = None,
+         exclude: Union[str, Iterable[str], None] = None,
+         output: Optional[str] = 'print',
+         sizes: Optional[bool] = False,
+         top: Optional[int] = 10,
+         workers: Optional[int] = None,
+         cache: Optional['MetadataCache'] = None) -> Union[Tuple[int, int], dict, 'pd.DataFrame']:
     """
-    Recursively list the contents of a directory in a tree format.
+    List the contents of a directory in a tree format, optionally with du-style sizes.
+
+    The directory is walked iteratively (no recursion limit) with os.scandir(), whose entries already
+    know whether they are directories, so no extra stat is made per entry.
+
+    With sizes=True, the whole tree is scanned first, one directory per task in a thread pool (so the stat
+    calls of many directories are in flight at once, which is what matters on network filesystems), then
+    the byte totals and file counts are added up bottom-up. Sizes are apparent sizes (st_size) of files;
+    a file with several hard links is counted once, at its first path in tree order. Symbolic links are
+    not followed (a link counts as a file of the link's own size), and totals include everything below
+    `max_depth`, only the listing stops there.
 
     Parameters:
         path (str): The directory path to list.
         indent (int, optional): The current level of indentation for visual representation. Defaults to 0.
         ignore_hidden (bool, optional): Whether to ignore hidden files and directories. Defaults to True.
+        max_depth (int, optional): Descend at most this many levels; 1 lists only the entries of `path`.
+                                   Defaults to None, i.e. no limit.
+        exclude (str or iterable of str, optional): Glob pattern(s), e.g. '*.pyc' or ['__pycache__', '.git'],
+                                   matched against entry names; matching files and directories (and the
+                                   contents of the latter) are skipped. Defaults to None.
+        output (str, optional): 'print' - print the tree (the format below).
+                                'dict' - return a nested dict instead: {name: {...}} for a directory,
+                                         {name: None} for a file.
+                                'table' - return a pandas DataFrame instead, one row per entry in tree order,
+                                          with columns path, name, depth (1 for the entries of `path`), is_dir.
+                                Defaults to 'print'.
+        sizes (bool, optional): Whether to add up sizes, as described above. With output='print' each entry
+                                shows its size (for a directory, its total) and the `top` heaviest directories
+                                are listed at the end; with 'dict' a file maps to its size instead of None;
+                                with 'table' there are two more columns, size and files (the number of files
+                                the size is made of, 1 for a file). Defaults to False.
+        top (int, optional): With sizes=True and output='print', how many of the heaviest directories (at any
+                             depth) to list. Defaults to 10.
+        workers (int, optional): With sizes=True, the number of threads scanning directories.
+                                 Defaults to None, i.e. the ThreadPoolExecutor default.
+        cache (MetadataCache, optional): Take the listings of unchanged directories from this cache
+                                 (not with sizes=True, whose file sizes change without the directory).
+                                 Defaults to None.
 
     Returns:
-        None.
+        (dir_count, file_count) for output='print', otherwise the dict or DataFrame.
 
     Usage/Examples:
-        >>> from ed_utils import list_directory
-        >>> list_directory("/path/to/directory")
+        >>> from ed_utils import tree
+        >>> tree("/path/to/directory")
+        /path/to/directory
         |-- dir1
-        |   |-- file1.txt
-        |   `-- file2.txt
+            |-- file1.txt
+            `-- file2.txt
         |-- dir2
-        |   |-- subdir1
-        |   |   `-- file3.txt
-        |   `-- subdir2
+            |-- subdir1
+                `-- file3.txt
+            `-- subdir2
         |-- file4.txt
         `-- file5.txt
 
-        2 directories, 5 files
+        4 directories, 5 files
+
+        >>> tree("/path/to/directory", max_depth=1, exclude='*.txt', output='dict')
+        {'dir1': {}, 'dir2': {}}
+
+        >>> tree("/data/lake", max_depth=1, sizes=True, top=3)
+        /data/lake
+        |-- [   1.2G]  raw
+        |-- [ 310.5M]  staged
+        `-- [  12.0K]  README.md
+
+        2 directories, 1 files, 1.5G in 1,873 files
+
+        Heaviest directories:
+          [   1.2G]      1,204 files  /data/lake/raw
+          [ 900.1M]        601 files  /data/lake/raw/2024
+          [ 310.5M]        668 files  /data/lake/staged
 
     Raises:
         DirectoryNotFoundException: If the provided `path` does not exist.
+        ValueError: If `max_depth` is not a positive int or `output` is not 'print', 'dict' or 'table'.
     """
     # handle default path of None, to be interprted at the current working directory
     if path is None:
@@ -266,45 +435,775 @@ def tree(path:  Optional[str] = None,
     # Ensure the path exists
     if not os.path.isdir(path):
         raise DirectoryNotFoundError(f"The path '{path}' does not exist.")
-    
+
+    if max_depth is not None and (not isinstance(max_depth, int) or max_depth < 1):
+        raise ValueError(f'max_depth must be None or an int >= 1; {max_depth = }')
+
+    if output not in ('print', 'dict', 'table'):
+        raise ValueError(f"output must be 'print', 'dict' or 'table'; {output = }")
+
+    # the patterns are compiled once into one regex, not re-parsed per entry by fnmatch.fnmatch()
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    exclude_match = re.compile('|'.join(fnmatch.translate(p) for p in exclude)).match if exclude else None
+
+    if sizes:
+        rows, entry_sizes = _tree_sizes(path, ignore_hidden, exclude_match, workers)
+        walk = (row for row in rows if max_depth is None or row[0] <= max_depth)
+    else:
+        entry_sizes = None
+        walk = _walk_tree(path, ignore_hidden, max_depth, exclude_match, cache)
+
+    if output == 'dict':
+        return _tree_dict(walk, entry_sizes)
+    if output == 'table':
+        return _tree_table(walk, entry_sizes)
+
     print(path)
     
-    def _list_directory(path: str,
-                        indent: int = 0,
-                        ignore_hidden: bool = True) -> (int, int):
-        # Get the list of items in the directory
-        items = sorted(os.listdir(path))
-
-        # Optionally filter out hidden files and directories
-        if ignore_hidden:
-            items = [item for item in items if not item.startswith('.')]
-
-        dir_count = 0
-        file_count = 0
-
-        for index, item in enumerate(items):
-            full_path = os.path.join(path, item)
-
-            # Use symbols and indentation to display the tree structure
-            prefix = '|-- ' if index != len(items) - 1 else '`-- '
-            print(' ' * indent + prefix + item)
-
-            if os.path.isdir(full_path):
-                dir_count += 1
-                sub_dir_count, sub_file_count = _list_directory(full_path, indent + 4, ignore_hidden)
-                dir_count += sub_dir_count
-                file_count += sub_file_count
-            else:
-                file_count += 1
+    dir_count = 0
+    file_count = 0
+
+    for depth, entry, is_dir, is_last in walk:
+        # Use symbols and indentation to display the tree structure
+        prefix = '|-- ' if not is_last else '`-- '
+        if entry_sizes is not None:
+            prefix += f'[{_format_size(entry_sizes[entry.path][0])}]  '
+        print(' ' * (indent + 4 * (depth - 1)) + prefix + entry.name)
+
+        if is_dir:
+            dir_count += 1
+        else:
+            file_count += 1
 
-        if indent == 0:
+    if indent == 0:
+        if entry_sizes is None:
             print(f"\n{dir_count} directories, {file_count} files")
-
-        return dir_count, file_count
-    
-    return _list_directory(path, indent, ignore_hidden)
+        else:
+            total_size, total_files = entry_sizes[path]
+            print(f"\n{dir_count} directories, {file_count} files, "
+                  f"{_format_size(total_size).strip()} in {total_files:,} files")
+
+    if entry_sizes is not None and top:
+        heaviest = heapq.nlargest(top, ((size, files, entry.path) for _, entry, is_dir, _ in rows if is_dir
+                                        for size, files in [entry_sizes[entry.path]]))
+        if heaviest:
+            print('\nHeaviest directories:')
+            for size, files, dir_path in heaviest:
+                print(f'  [{_format_size(size)}]  {files:>9,} files  {dir_path}')
+
+    return dir_count, file_count
            
-tree.__version__ = tree.version = '0.6'
+tree.__version__ = tree.version = '0.8'
+
+
+def _format_size(size: int) -> str:
+    """`size` in bytes with a binary prefix, right-aligned in 7 characters, like ls_l(): '  12.3M'."""
+    if size < 1024:
+        return f"{size:6d}B"
+    for unit in 'KMGT':
+        size /= 1024
+        if size < 1024 or unit == 'T':
+            return f"{size:6.1f}{unit}"
+
+
+def _walk_tree(path: str,
+               ignore_hidden: bool,
+               max_depth: Optional[int],
+               exclude_match,
+               cache: Optional['MetadataCache'] = None) -> Iterator[Tuple[int, os.DirEntry, bool, bool]]:
+    """
+    Yields (depth, entry, is_dir, is_last) for the entries under `path` in tree order (depth-first, sorted
+    by name), depth 1 being the entries of `path`. An explicit stack of sorted entry lists replaces recursion.
+    Directories are listed through `cache` if one is given.
+    """
+    def _sorted_entries(dir_path: str) -> List[os.DirEntry]:
+        entries = [entry for entry in _scandir_list(dir_path, cache)
+                   if not (ignore_hidden and entry.name.startswith('.'))
+                   and not (exclude_match and exclude_match(entry.name))]
+        entries.sort(key=lambda entry: entry.name, reverse=True)   # so that pop() yields them in order
+        return entries
+
+    stack = [(_sorted_entries(path), 1)]
+    while stack:
+        entries, depth = stack[-1]
+        if not entries:
+            stack.pop()
+            continue
+
+        entry = entries.pop()
+        is_dir = entry.is_dir()   # cached by scandir() on most platforms, follows symlinks like os.path.isdir()
+        yield depth, entry, is_dir, not entries
+
+        if is_dir and (max_depth is None or depth < max_depth):
+            stack.append((_sorted_entries(entry.path), depth + 1))
+
+
+def _scandir_list(dir_path: str, cache: Optional['MetadataCache'] = None) -> List[os.DirEntry]:
+    """list(os.scandir(dir_path)), or the entries from `cache` (DirEntry stand-ins) if the directory is unchanged."""
+    if cache is not None:
+        return cache.scandir(dir_path)
+    with os.scandir(dir_path) as it:
+        return list(it)
+
+
+def _tree_sizes(path: str,
+                ignore_hidden: bool,
+                exclude_match,
+                workers: Optional[int]) -> Tuple[List[Tuple[int, os.DirEntry, bool, bool]], dict]:
+    """
+    Scans the whole tree under `path` in a thread pool and adds up sizes bottom-up.
+    Returns the rows (depth, entry, is_dir, is_last) of the tree in tree order, like _walk_tree() yields them,
+    and a dict mapping the path of every entry, and `path` itself, to (size, files): the apparent size of
+    a file (0 for a hard link already counted) and 1, or the totals of a directory.
+    """
+    def _scan(dir_path: str) -> List[Tuple[os.DirEntry, bool, Optional[os.stat_result]]]:
+        with os.scandir(dir_path) as it:
+            entries = [entry for entry in it
+                       if not (ignore_hidden and entry.name.startswith('.'))
+                       and not (exclude_match and exclude_match(entry.name))]
+        entries.sort(key=lambda entry: entry.name)
+        # the stat (lstat on POSIX) is the slow part on a network filesystem, and runs in this worker thread
+        return [(entry, is_dir, None if is_dir else entry.stat(follow_symlinks=False))
+                for entry in entries
+                for is_dir in [entry.is_dir(follow_symlinks=False)]]
+
+    # scan every directory, submitting each subdirectory as soon as its parent has been listed
+    listings = {}
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        pending = {executor.submit(_scan, path): path}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                items = listings[pending.pop(future)] = future.result()
+                for entry, is_dir, _ in items:
+                    if is_dir:
+                        pending[executor.submit(_scan, entry.path)] = entry.path
+
+    # walk the listings in tree order; hard links are deduplicated on (st_dev, st_ino) in that order
+    rows = []
+    entry_sizes = {path: [0, 0]}
+    parent_paths = []   # parent_paths[i] is the parent of the directory rows[i], for the bottom-up pass
+    seen_inodes = set()
+    stack = [(path, iter(listings[path]), 1)]
+    while stack:
+        dir_path, items, depth = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            continue
+
+        entry, is_dir, file_stat = item
+        is_last = entry is listings[dir_path][-1][0]
+        rows.append((depth, entry, is_dir, is_last))
+        if is_dir:
+            entry_sizes[entry.path] = [0, 0]
+            parent_paths.append((entry.path, dir_path))
+            stack.append((entry.path, iter(listings[entry.path]), depth + 1))
+        else:
+            size = file_stat.st_size
+            if file_stat.st_nlink > 1:
+                if (file_stat.st_dev, file_stat.st_ino) in seen_inodes:
+                    size = 0
+                seen_inodes.add((file_stat.st_dev, file_stat.st_ino))
+            entry_sizes[entry.path] = (size, 1)
+            entry_sizes[dir_path][0] += size
+            entry_sizes[dir_path][1] += 1
+
+    # a subdirectory comes after its parent in tree order, so in reverse order it is complete before the parent
+    for dir_path, parent_path in reversed(parent_paths):
+        size, files = entry_sizes[dir_path] = tuple(entry_sizes[dir_path])
+        entry_sizes[parent_path][0] += size
+        entry_sizes[parent_path][1] += files
+    entry_sizes[path] = tuple(entry_sizes[path])
+
+    return rows, entry_sizes
+
+
+def _tree_dict(walk: Iterator[Tuple[int, os.DirEntry, bool, bool]], entry_sizes: Optional[dict] = None) -> dict:
+    """
+    Nested dict of the tree yielded by _walk_tree(): {name: {...}} for a directory, {name: None} for a file,
+    or {name: size} for a file if `entry_sizes` from _tree_sizes() is given.
+    """
+    root = {}
+    parents = [root]   # parents[depth - 1] is the dict that the entries at depth go in
+    for depth, entry, is_dir, _ in walk:
+        del parents[depth:]
+        parents[-1][entry.name] = {} if is_dir else None if entry_sizes is None else entry_sizes[entry.path][0]
+        if is_dir:
+            parents.append(parents[-1][entry.name])
+    return root
+
+
+def _tree_table(walk: Iterator[Tuple[int, os.DirEntry, bool, bool]], entry_sizes: Optional[dict] = None) -> 'pd.DataFrame':
+    """
+    DataFrame of the tree yielded by _walk_tree(): one row (path, name, depth, is_dir) per entry,
+    plus (size, files) if `entry_sizes` from _tree_sizes() is given.
+    """
+    import pandas as pd
+
+    if entry_sizes is None:
+        rows = [(entry.path, entry.name, depth, is_dir) for depth, entry, is_dir, _ in walk]
+        return pd.DataFrame(rows, columns=['path', 'name', 'depth', 'is_dir'])
+
+    rows = [(entry.path, entry.name, depth, is_dir) + tuple(entry_sizes[entry.path])
+            for depth, entry, is_dir, _ in walk]
+    return pd.DataFrame(rows, columns=['path', 'name', 'depth', 'is_dir', 'size', 'files'])
+
+# -------------------------------------------------------------------------------------------------------
+
+import bisect   # for bisect_right()
+import bz2   # for open()
+import collections   # for OrderedDict()
+import gzip   # for open()
+import hashlib   # for blake2b()
+import io   # for TextIOWrapper()
+import lzma   # for open()
+import re   # for compile()
+import struct   # for the gzip index sidecar
+import time   # for time_ns()
+import zlib   # for compress(), decompress()
+
+# compressed files are recognized by their first bytes, not by their names
+_COMPRESSION_MAGIC = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+
+# 'BZh' alone is plain text too: bzip2 is recognized by the block size digit and the magic of the
+# first block (or of the end of the stream, for no data)
+_BZ2_MAGIC = re.compile(rb'BZh[1-9](1AY&SY|\x17rE8P\x90)')
+
+
+def _compression(filename: str) -> Optional[str]:
+    """Returns 'gzip', 'bz2', 'xz' or 'zstd' if `filename` is compressed with it, otherwise None."""
+    with open(filename, 'rb') as file:
+        start = file.read(10)
+    for magic, compression in _COMPRESSION_MAGIC:
+        if start.startswith(magic) and (compression != 'bz2' or _BZ2_MAGIC.match(start)):
+            return compression
+    return None
+
+
+def _open_decompressed(filename: str, compression: str):
+    """
+    Returns a binary file object streaming the decompressed content of `filename`; data is decompressed
+    as it is read, in buffers of bounded size. Zstandard needs Python 3.14+ or the 'zstandard' module.
+    """
+    if compression == 'gzip':
+        return gzip.open(filename, 'rb')
+    if compression == 'bz2':
+        return bz2.open(filename, 'rb')
+    if compression == 'xz':
+        return lzma.open(filename, 'rb')
+
+    try:
+        from compression import zstd   # Python 3.14+ stdlib
+        return zstd.open(filename, 'rb')
+    except ImportError:
+        pass
+    try:
+        import zstandard   # not part of Python stdlib
+    except ImportError:
+        raise ImportError(f"{filename} is zstd compressed. The 'zstandard' module is not available. "
+                          "You might need to install it. 'pip install zstandard'")
+    file = open(filename, 'rb')
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True,
+                                                                         closefd=True))
+
+
+def _open_text(filename: str, encoding: Optional[str]):
+    """open(filename, 'r', encoding=encoding), decompressing `filename` on the fly if it is compressed."""
+    compression = _compression(filename)
+    if compression is None:
+        return open(filename, 'r', encoding=encoding)
+    return io.TextIOWrapper(_open_decompressed(filename, compression), encoding=encoding)
+
+
+def _stream_tail(file, num_lines: int) -> Tuple[int, bytes]:
+    """
+    The last `num_lines` b'\\n' separated lines of binary stream `file` (read once, to the end), and the number
+    of b'\\n' before them; like _tail_offset() and _count_newlines() for a stream that cannot seek.
+    Memory use is bounded by the lines kept.
+    """
+    last_lines = collections.deque(maxlen=num_lines)
+    newlines = 0
+    for line in file:
+        if len(last_lines) == num_lines:
+            newlines += 1   # the line dropped from the deque ended with b'\n'
+        last_lines.append(line)
+    return newlines, b''.join(last_lines)
+
+
+_GZIP_INDEX_SPAN = 4 * 1024 * 1024   # uncompressed bytes between checkpoints of a _GzipIndex (at least)
+_GZIP_INDEX_MAX_POINTS = 1024   # checkpoints per _GzipIndex; beyond, every other one is dropped (span doubles)
+_GZIP_INDEXES_MAX = 8   # gzip indexes kept in memory (least recently used are dropped)
+_gzip_indexes = collections.OrderedDict()   # filename -> _GzipIndex
+
+# Gzip index sidecar, 'data.log.gz' -> 'data.log.gz.gzidx' (see build_gzip_index()):
+#     header      - magic, size and st_mtime_ns of the gzip file when indexed (to detect changes), the time
+#                   it was indexed (time_ns(), before reading it), uncompressed size, number of b'\n',
+#                   span and number of checkpoints
+#     checkpoints - per checkpoint: compressed offset, bit offset, uncompressed offset, b'\n' before it,
+#                   length of its window, then the window (last 32 KiB of uncompressed data, zlib compressed)
+_GZIP_INDEX_SUFFIX = '.gzidx'
+_GZIP_INDEX_MAGIC = b'EDGZIX02'
+_GZIP_INDEX_HEADER = struct.Struct('<8sQqqQQQI16s')
+_GZIP_INDEX_POINT = struct.Struct('<QBQQI')
+_GZIP_WINDOW_SIZE = 32 * 1024   # deflate's window: a back-reference reaches at most this far
+
+_libz_cache = []   # [the zlib C library (ctypes.CDLL), or None if it cannot be loaded]
+
+
+def _libz():
+    """
+    The zlib C library through ctypes, or None if it cannot be loaded. Python's zlib module cannot stop at
+    deflate block boundaries (Z_BLOCK) nor resume at a bit offset (inflatePrime()), as a zran index needs.
+    """
+    if not _libz_cache:
+        try:
+            import ctypes
+            import ctypes.util
+
+            lib = ctypes.CDLL(ctypes.util.find_library('z') or ctypes.util.find_library('zlib1') or 'libz.so.1')
+            lib.zlibVersion.restype = ctypes.c_char_p
+            for name in ('inflateInit2_', 'inflate', 'inflateEnd', 'inflateReset2', 'inflatePrime',
+                         'inflateSetDictionary'):
+                getattr(lib, name).restype = ctypes.c_int
+            _libz_cache.append(lib)
+        except (OSError, AttributeError):   # no zlib shared library, or one without these functions
+            _libz_cache.append(None)
+    return _libz_cache[0]
+
+
+class _Inflater:
+    """A zlib z_stream for inflate(), through ctypes; the parts of zlib's API that a zran index needs."""
+    Z_OK, Z_STREAM_END, Z_BUF_ERROR = 0, 1, -5
+    Z_NO_FLUSH, Z_BLOCK = 0, 5
+    _OUTPUT_SIZE = 256 * 1024   # at most this many uncompressed bytes per inflate()
+
+    def __init__(self, lib, window_bits: int):
+        import ctypes
+
+        class _ZStream(ctypes.Structure):
+            _fields_ = [('next_in', ctypes.c_void_p), ('avail_in', ctypes.c_uint), ('total_in', ctypes.c_ulong),
+                        ('next_out', ctypes.c_void_p), ('avail_out', ctypes.c_uint), ('total_out', ctypes.c_ulong),
+                        ('msg', ctypes.c_char_p), ('state', ctypes.c_void_p),
+                        ('zalloc', ctypes.c_void_p), ('zfree', ctypes.c_void_p), ('opaque', ctypes.c_void_p),
+                        ('data_type', ctypes.c_int), ('adler', ctypes.c_ulong), ('reserved', ctypes.c_ulong)]
+
+        self._ctypes = ctypes
+        self._lib = lib
+        self._strm = _ZStream()
+        self._input = None   # keeps the buffer next_in points into alive
+        self._output = ctypes.create_string_buffer(self._OUTPUT_SIZE)
+        self._check(lib.inflateInit2_(ctypes.byref(self._strm), window_bits, lib.zlibVersion(),
+                                      ctypes.sizeof(_ZStream)), 'inflateInit2')
+
+    def _check(self, ret: int, name: str) -> int:
+        if ret < 0 and ret != self.Z_BUF_ERROR:
+            message = self._strm.msg.decode('ascii', 'replace') if self._strm.msg else ''
+            raise zlib.error(f'{name}() failed ({ret}): {message}')
+        return ret
+
+    @property
+    def avail_in(self) -> int:
+        return self._strm.avail_in
+
+    @property
+    def data_type(self) -> int:
+        return self._strm.data_type
+
+    def feed(self, data: bytes) -> None:
+        """Makes `data`, after any input not consumed yet, the input of the next inflate()."""
+        data = self.pending() + data
+        self._input = self._ctypes.create_string_buffer(data, len(data))
+        self._strm.next_in = self._ctypes.addressof(self._input)
+        self._strm.avail_in = len(data)
+
+    def pending(self) -> bytes:
+        """The input not consumed yet."""
+        return self._ctypes.string_at(self._strm.next_in, self._strm.avail_in) if self._strm.avail_in else b''
+
+    def skip(self, size: int) -> None:
+        """Drops the next `size` bytes of input (at most avail_in)."""
+        size = min(size, self._strm.avail_in)
+        self._strm.next_in += size
+        self._strm.avail_in -= size
+
+    def inflate(self, flush: int) -> Tuple[int, bytes]:
+        """Returns (return code, uncompressed bytes)."""
+        self._strm.next_out = self._ctypes.addressof(self._output)
+        self._strm.avail_out = self._OUTPUT_SIZE
+        ret = self._check(self._lib.inflate(self._ctypes.byref(self._strm), flush), 'inflate')
+        return ret, self._output.raw[:self._OUTPUT_SIZE - self._strm.avail_out]
+
+    def reset(self, window_bits: int) -> None:
+        self._check(self._lib.inflateReset2(self._ctypes.byref(self._strm), window_bits), 'inflateReset2')
+
+    def prime(self, bits: int, value: int) -> None:
+        self._check(self._lib.inflatePrime(self._ctypes.byref(self._strm), bits, value), 'inflatePrime')
+
+    def set_dictionary(self, window: bytes) -> None:
+        self._check(self._lib.inflateSetDictionary(self._ctypes.byref(self._strm), window, len(window)),
+                    'inflateSetDictionary')
+
+    def close(self) -> None:
+        if self._lib is not None:
+            self._lib.inflateEnd(self._ctypes.byref(self._strm))
+            self._lib = None
+
+    def __del__(self):
+        self.close()
+
+
+class _GzipIndex:
+    """
+    Checkpoint index of a gzip file, as zlib's zran.c builds it: at a deflate block boundary about every
+    `span` uncompressed bytes, the compressed offset and bit offset, the uncompressed offset, the number of
+    b'\\n' before it, and the last 32 KiB of uncompressed data (the window; kept zlib compressed). Any range
+    of the uncompressed data can then be read by resuming decompression at the checkpoint before it,
+    not from the start. Multi-member (concatenated) gzip files and NUL padding are read as by the gzip
+    module; a truncated file raises EOFError, as it does.
+
+    Building it decompresses the whole file once; save() and load() keep it in a sidecar file.
+    Memory use is bounded: at most _GZIP_INDEX_MAX_POINTS checkpoints (beyond, every other one is dropped
+    and the span doubles), each at most 32 KiB (typically a few KiB), plus the last segment read (one span).
+    Needs the zlib C library (see _libz()).
+    """
+    _READ_SIZE = 64 * 1024   # compressed bytes read at a time
+
+    def __init__(self, filename: str, span: int = _GZIP_INDEX_SPAN, _build: bool = True):
+        self.filename = filename
+        self.span = span
+        self.checkpoints = []   # (compressed offset, bit offset, uncompressed offset, newlines before, window)
+        self.uncompressed_size = self.newlines = 0
+        self._segment = (-1, b'')   # the last decompressed segment, (checkpoint number, data)
+        self.digest = b'\0' * 16   # hash of the compressed file, for a provisional index
+        self._content_hash = None
+        if _build:
+            self._build()
+        self._offsets = [checkpoint[2] for checkpoint in self.checkpoints]
+
+    def _build(self) -> None:
+        inflater = _Inflater(_libz(), 31)   # 31: gzip header and trailer
+        compressed_offset = uncompressed_offset = newlines = 0
+        last_checkpoint = None
+        window = b''
+        member_ended = False
+        with open(self.filename, 'rb') as file:
+            self.indexed_ns = time.time_ns()   # before reading, so a change while reading makes a saved index untrusted
+            file_stat = os.fstat(file.fileno())
+            self.size, self.mtime_ns = file_stat.st_size, file_stat.st_mtime_ns
+            # a provisional index keeps the hash of what it indexed, as a line index does (see _verify_racy_index())
+            if self.indexed_ns - self.mtime_ns < _LINE_INDEX_RACY_NS:
+                self._content_hash = hashlib.blake2b(digest_size=16)
+            try:
+                while True:
+                    if not inflater.avail_in:
+                        data = self._read(file)
+                        if not data:
+                            break
+                        inflater.feed(data)
+                    avail_in = inflater.avail_in
+                    member_ended = False
+                    ret, data = inflater.inflate(_Inflater.Z_BLOCK)
+                    compressed_offset += avail_in - inflater.avail_in
+                    if data:
+                        uncompressed_offset += len(data)
+                        newlines += data.count(b'\n')
+                        window = (window + data)[-_GZIP_WINDOW_SIZE:]
+
+                    if ret == _Inflater.Z_STREAM_END:   # end of a gzip member; another one may follow
+                        member_ended = True
+                        skipped = self._next_member(inflater, file)
+                        if skipped is None:
+                            break
+                        compressed_offset += skipped
+                        inflater.reset(31)
+                        continue
+
+                    # at a block boundary (128), not after the last block (64), as in zran.c
+                    data_type = inflater.data_type
+                    if (data_type & 128 and not data_type & 64
+                            and (last_checkpoint is None or uncompressed_offset - last_checkpoint >= self.span)):
+                        self.checkpoints.append((compressed_offset, data_type & 7, uncompressed_offset, newlines,
+                                                 zlib.compress(window) if uncompressed_offset else b''))
+                        last_checkpoint = uncompressed_offset
+                        if len(self.checkpoints) > _GZIP_INDEX_MAX_POINTS:
+                            self.checkpoints = self.checkpoints[::2]
+                            self.span *= 2
+                            last_checkpoint = self.checkpoints[-1][2]
+            finally:
+                inflater.close()
+        if self._content_hash is not None:
+            self.digest = self._content_hash.digest()
+            self._content_hash = None
+        if not member_ended:
+            raise EOFError(f'{self.filename}: compressed file ended before the end-of-stream marker was reached')
+
+        self.uncompressed_size = uncompressed_offset
+        self.newlines = newlines
+
+    def _read(self, file) -> bytes:
+        """The next compressed bytes of `file`; hashed while building a provisional index."""
+        data = file.read(self._READ_SIZE)
+        if self._content_hash is not None:
+            self._content_hash.update(data)
+        return data
+
+    def _next_member(self, inflater: _Inflater, file) -> Optional[int]:
+        """
+        At the end of a gzip member: skips the NUL bytes that can pad a gzip file (as the gzip module does),
+        and returns how many, or None if the file ends there.
+        """
+        skipped = 0
+        while True:
+            if not inflater.avail_in:
+                data = self._read(file)
+                if not data:
+                    return None
+                inflater.feed(data)
+            pending = inflater.pending()
+            zeros = len(pending) - len(pending.lstrip(b'\0'))
+            inflater.skip(zeros)
+            skipped += zeros
+            if inflater.avail_in:
+                return skipped
+
+    def is_current(self) -> bool:
+        file_stat = os.stat(self.filename)
+        return (file_stat.st_size, file_stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def save(self, index_path: str) -> None:
+        """Writes the index to `index_path` (atomically)."""
+        temp_path = f'{index_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as index_file:
+            index_file.write(_GZIP_INDEX_HEADER.pack(_GZIP_INDEX_MAGIC, self.size, self.mtime_ns, self.indexed_ns,
+                                                     self.uncompressed_size, self.newlines, self.span,
+                                                     len(self.checkpoints), self.digest))
+            for compressed_offset, bits, uncompressed_offset, newlines, window in self.checkpoints:
+                index_file.write(_GZIP_INDEX_POINT.pack(compressed_offset, bits, uncompressed_offset, newlines,
+                                                        len(window)))
+                index_file.write(window)
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, filename: str, index_path: str) -> Optional['_GzipIndex']:
+        """
+        The index saved in `index_path` if it is up to date for `filename`, otherwise None. A provisional
+        index is verified against the file's content first, then marked trusted, as in _load_line_index().
+        """
+        try:
+            file_stat = os.stat(filename)
+            with open(index_path, 'rb') as index_file:
+                header = index_file.read(_GZIP_INDEX_HEADER.size)
+                if len(header) != _GZIP_INDEX_HEADER.size:
+                    return None
+                magic, size, mtime_ns, indexed_ns, uncompressed_size, newlines, span, num_points, digest = \
+                    _GZIP_INDEX_HEADER.unpack(header)
+                if magic != _GZIP_INDEX_MAGIC or (size, mtime_ns) != (file_stat.st_size, file_stat.st_mtime_ns):
+                    return None
+                if indexed_ns - mtime_ns < _LINE_INDEX_RACY_NS:
+                    indexed_ns = _verify_racy_index(filename, mtime_ns, digest)
+                    if indexed_ns is None:
+                        return None
+                    try:   # trusted from now on, without hashing the file again
+                        with open(index_path, 'r+b') as header_file:
+                            header_file.write(_GZIP_INDEX_HEADER.pack(magic, size, mtime_ns, indexed_ns,
+                                                                      uncompressed_size, newlines, span,
+                                                                      num_points, digest))
+                    except OSError:   # e.g. a read-only directory: verified again next time
+                        pass
+                index = cls(filename, span, _build=False)
+                index.size, index.mtime_ns, index.indexed_ns, index.digest = size, mtime_ns, indexed_ns, digest
+                index.uncompressed_size, index.newlines = uncompressed_size, newlines
+                for _ in range(num_points):
+                    *point, window_size = _GZIP_INDEX_POINT.unpack(index_file.read(_GZIP_INDEX_POINT.size))
+                    index.checkpoints.append((*point, index_file.read(window_size)))
+        except (OSError, struct.error):
+            return None
+        index._offsets = [checkpoint[2] for checkpoint in index.checkpoints]
+        return index
+
+    def segment(self, number: int) -> bytes:
+        """The uncompressed data from checkpoint `number` to the next one (or to the end)."""
+        if self._segment[0] != number:
+            compressed_offset, bits, uncompressed_offset, _, window = self.checkpoints[number]
+            end = self._offsets[number + 1] if number + 1 < len(self._offsets) else self.uncompressed_size
+            parts, length = [], 0
+            inflater = _Inflater(_libz(), -15)   # -15: raw deflate, from the middle of a member
+            raw = True
+            try:
+                with open(self.filename, 'rb') as file:
+                    # a block can start inside a byte: its first `bits` bits are the top bits of the byte before
+                    file.seek(compressed_offset - (1 if bits else 0))
+                    if bits:
+                        inflater.prime(bits, file.read(1)[0] >> (8 - bits))
+                    if window:
+                        inflater.set_dictionary(zlib.decompress(window))
+                    while length < end - uncompressed_offset:
+                        if not inflater.avail_in:
+                            data = file.read(self._READ_SIZE)
+                            if not data:
+                                break
+                            inflater.feed(data)
+                        ret, data = inflater.inflate(_Inflater.Z_NO_FLUSH)
+                        parts.append(data)
+                        length += len(data)
+                        if ret == _Inflater.Z_STREAM_END:
+                            # the end of a member; the next one has a gzip header. Raw deflate leaves the
+                            # 8-byte trailer unread (gzip mode, for the following members, reads it)
+                            while raw and inflater.avail_in < 8:
+                                data = file.read(self._READ_SIZE)
+                                if not data:
+                                    break
+                                inflater.feed(data)
+                            if raw:
+                                inflater.skip(8)
+                                raw = False
+                            if self._next_member(inflater, file) is None:
+                                break
+                            inflater.reset(31)
+            finally:
+                inflater.close()
+            self._segment = (number, b''.join(parts)[:end - uncompressed_offset])
+        return self._segment[1]
+
+    def read(self, start: int, end: int) -> bytes:
+        """Uncompressed bytes [start, end)."""
+        parts = []
+        number = bisect.bisect_right(self._offsets, start) - 1
+        while start < end and 0 <= number < len(self._offsets):
+            offset = self._offsets[number]
+            data = self.segment(number)
+            parts.append(data[start - offset:end - offset])
+            start = offset + len(data)
+            number += 1
+        return b''.join(parts)
+
+    def count_newlines(self, end: int) -> int:
+        """Number of b'\\n' in uncompressed bytes [0, end)."""
+        number = bisect.bisect_right(self._offsets, end) - 1
+        if number < 0:
+            return 0
+        _, _, offset, newlines, _ = self.checkpoints[number]
+        return newlines + self.read(offset, end).count(b'\n')
+
+
+class _GzipIndexReader:
+    """Read-only, seekable binary file object over the uncompressed data of a _GzipIndex, e.g. for _tail_offset()."""
+
+    def __init__(self, index: _GzipIndex):
+        self.index = index
+        self.pos = 0
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self.pos, os.SEEK_END: self.index.uncompressed_size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.index.uncompressed_size if size is None or size < 0 else self.pos + size
+        data = self.index.read(self.pos, end)
+        self.pos += len(data)
+        return data
+
+
+def _gzip_index(filename: str) -> Optional[_GzipIndex]:
+    """
+    The _GzipIndex of gzip file `filename`: kept in memory (the _GZIP_INDEXES_MAX most recently used), else
+    loaded from an up-to-date sidecar (see build_gzip_index()), else built (in memory only). It is rebuilt
+    when the file changes. None if the zlib C library is not available.
+    """
+    if _libz() is None:
+        return None
+    key = os.path.abspath(filename)
+    index = _gzip_indexes.get(key)
+    if index is None or not index.is_current():
+        index = _GzipIndex.load(filename, filename + _GZIP_INDEX_SUFFIX) or _GzipIndex(filename)
+        _gzip_indexes[key] = index
+    _gzip_indexes.move_to_end(key)
+    while len(_gzip_indexes) > _GZIP_INDEXES_MAX:
+        _gzip_indexes.popitem(last=False)
+    return index
+
+
+def build_gzip_index(filename: str,
+                     span: Optional[int] = _GZIP_INDEX_SPAN) -> str:
+    """
+    Builds and saves the checkpoint index of gzip file `filename`: a sidecar file `filename` + '.gzidx',
+    as zlib's zran.c does. About every `span` uncompressed bytes it records where a deflate block starts
+    (byte and bit offset), the number of newlines before it and the 32 KiB of uncompressed data before it
+    (compressed), so decompression can resume there instead of at the start of the file.
+
+    With an up-to-date index next to the file (the file's size and modification time are unchanged
+    since indexing), tail() and iter_tail() of the file decompress only its last span or so, and
+    iter_tail() counts the newlines of that span only. Without one, the first tail()
+    of the file builds the same index, in memory only. An index made within 2 seconds of the file's last
+    modification is provisional, as with build_line_index(): its first use after that checks the file's
+    content against a hash kept in the index (one read of the compressed file), then trusts it.
+    The index has at most 1,024 checkpoints (for a larger file the span is doubled as needed), of at most
+    32 KiB each, typically a few KiB: its size, on disk and in memory, is bounded whatever the file size.
+    Building costs about as much as decompressing the file once. Needs the zlib C library (ctypes).
+
+    Parameters:
+        filename:str - A string representing the name of the gzip file to index.
+        span:int - Optional. Minimum number of uncompressed bytes between checkpoints. Default is 4 MiB.
+
+    Returns:
+        str: the path of the index file.
+
+    Usage/Examples:
+        import ed_utils
+
+        ed_utils.build_gzip_index(r'logs/app.log.gz')   # returns 'logs/app.log.gz.gzidx'
+        ed_utils.tail(r'logs/app.log.gz', 100)
+
+    Raises:
+        TypeError: If `filename` is not a string, or `span` is not an integer.
+        ValueError: If `filename` is a blank string or not a gzip file, or `span` is not positive.
+        FileNotFoundError: If `filename` does not exist.
+        OSError: If the zlib C library cannot be loaded.
+        zlib.error: If `filename` is not valid gzip data.
+    """
+    if not isinstance(filename, str):
+        raise TypeError(f'filename must be a str; {type(filename) = }')
+
+    if filename.strip() == '':
+        raise ValueError('filename must be a non-blank string')
+
+    if not isinstance(span, int) or isinstance(span, bool):
+        raise TypeError(f'span must be an int; {type(span) = }')
+
+    if span <= 0:
+        raise ValueError(f'span must be positive; {span = }')
+
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f'{filename} does not exist')
+
+    if _compression(filename) != 'gzip':
+        raise ValueError(f'{filename} is not a gzip file')
+
+    if _libz() is None:
+        raise OSError('the zlib C library cannot be loaded (needed for a gzip index)')
+
+    index = _GzipIndex(filename, span)
+    index_path = filename + _GZIP_INDEX_SUFFIX
+    index.save(index_path)
+    _gzip_indexes[os.path.abspath(filename)] = index
+    _gzip_indexes.move_to_end(os.path.abspath(filename))
+    while len(_gzip_indexes) > _GZIP_INDEXES_MAX:
+        _gzip_indexes.popitem(last=False)
+    return index_path
+
+build_gzip_index.__version__ = build_gzip_index.version = '0.2'
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -317,6 +1216,8 @@ def grep(pattern: str,
          case_insensitive: Optional[bool] = False) -> None:
     """
     Search for lines matching a pattern in a file and print them.
+    To use the matching lines in a pipeline rather than print them, use iter_grep().
+    A gzip, bz2, xz or zstd compressed file (recognized by its first bytes) is decompressed as a stream.
 
     Parameters:
         pattern:str               The pattern to search for; can be a
@@ -345,6 +1246,44 @@ def grep(pattern: str,
         ed_utils.grep(pattern, file_path, include_line_number=True, case_insensitive=True)
     """
 
+    for line_number, line in iter_grep(pattern, file_path, case_insensitive=case_insensitive):
+        if include_line_number:
+            print(f"{line_number}: {line.rstrip()}")
+        else:
+            print(line.rstrip())
+
+grep.__version__ = grep.version = '0.2'
+
+
+def iter_grep(pattern: str,
+              file_path: str,
+              case_insensitive: Optional[bool] = False) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily yields (line_number, line) for the lines of a file matching a pattern.
+    Same matching as grep(), which prints these; memory use is one line regardless of file size.
+
+    Parameters:
+        pattern:str               The pattern to search for; can be a
+                                  simple string or a regular expression.
+        file_path:str             The path to the file to be searched.
+        case_insensitive:bool     Optional. If True, performs a case-insensitive search. Default is False.
+
+    Returns:
+        Iterator of (line_number, line) tuples; line_number starts at 1, line has no trailing newline.
+
+    Usage/Examples:
+        import ed_utils
+
+        for line_number, line in ed_utils.iter_grep(r'giraffe', 'animals.txt'):
+            print(line_number, line)
+
+        giraffe_lines = [line for _, line in ed_utils.iter_grep(r'giraffe', 'animals.txt')]
+
+    Raises:
+        TypeError: If `pattern` or `file_path` is not a string.
+        ValueError: If `pattern` or `file_path` is a blank string.
+        FileNotFoundError: If `file_path` does not exist.
+    """
     if not isinstance(pattern, str):
         raise TypeError(f'pattern must be a str; {type(pattern) = }')
 
@@ -359,19 +1298,506 @@ def grep(pattern: str,
 
     if not os.path.exists(file_path):
         raise FileNotFoundError(f'{file_path} does not exist')
-    
-    
+
     flags = re.IGNORECASE if case_insensitive else 0
 
-    with open(file_path, 'r') as file:
+    # validation above runs when iter_grep() is called, not on the first next()
+    return _iter_grep(re.compile(pattern, flags), file_path)
+
+def _iter_grep(regex: re.Pattern, file_path: str) -> Iterator[Tuple[int, str]]:
+    with _open_text(file_path, None) as file:
         for line_number, line in enumerate(file, start=1):
-            if re.search(pattern, line, flags=flags):
-                if include_line_number:
-                    print(f"{line_number}: {line.rstrip()}")
-                else:
-                    print(line.rstrip())
+            if regex.search(line):
+                yield line_number, line.rstrip('\n')
 
-grep.__version__ = grep.version = '0.1'
+iter_grep.__version__ = iter_grep.version = '0.1'
+
+
+import concurrent.futures   # for ProcessPoolExecutor()
+import mmap   # for mmap()
+
+def grep_files(pattern: str,
+               path: str,
+               recursive: Optional[bool] = False,
+               case_insensitive: Optional[bool] = False,
+               invert: Optional[bool] = False,
+               count_only: Optional[bool] = False,
+               files_only: Optional[bool] = False,
+               encoding: Optional[str] = 'utf-8',
+               workers: Optional[int] = None) -> Iterator[Any]:
+    """
+    Search for lines matching a pattern in all files of a directory, or all files matching a glob.
+    Like 'grep -r', with the -v, -c and -l options.
+
+    The pattern is compiled once. Each file is memory-mapped and searched as a whole by the regex
+    engine; only matching lines are located and decoded, so there is no Python-level loop over
+    lines. Files are searched in parallel worker processes; results are streamed file by file, in
+    sorted path order (the same for every run), and in line order within each file.
+    Line semantics are those of grep(): '^' and '$' match at line boundaries and a match
+    must lie within one line. Patterns with '\\A', '\\Z' or a lookaround ('(?=', '(?!', '(?<=', '(?<!')
+    would see past the line in the whole-file buffer, so they are searched line by line instead, as
+    grep() does: same results, but with a Python-level loop over the lines.
+    As files are searched as bytes, in files with '\r\n' line endings '$' matches after the '\r',
+    i.e. use r'\r?$' (grep() reads in text mode, where '\r\n' becomes '\n').
+
+    Parameters:
+        pattern:str               The pattern to search for; can be a
+                                  simple string or a regular expression.
+        path:str                  A directory, e.g. 'logs', or a glob whose wildcards are in the
+                                  last component only, e.g. 'logs/*.log'.
+        recursive:bool            Optional. Also search subdirectories, like 'grep -r'. Default is False.
+        case_insensitive:bool     Optional. If True, performs a case-insensitive search, like 'grep -i'.
+                                  Only ASCII letters are case folded. Default is False.
+        invert:bool               Optional. Select non-matching lines, like 'grep -v'. Default is False.
+        count_only:bool           Optional. Only count the selected lines per file, like 'grep -c'.
+                                  Lines are not decoded. Default is False.
+        files_only:bool           Optional. Only name the files with a selected line, like 'grep -l'.
+                                  The search of a file stops at its first selected line. Default is False.
+        encoding:str              Optional. Encoding of the files and the pattern. Default is 'utf-8'.
+        workers:int               Optional. Number of processes. Default is None, i.e. os.cpu_count().
+                                  1 searches in this process.
+
+    Returns:
+        Iterator of
+            (path, line_number, line) - by default; line_number starts at 1, line has no newline
+            (path, count)             - with count_only=True, for every file
+            path                      - with files_only=True
+
+    Usage/Examples:
+        import ed_utils
+
+        for path, line_number, line in ed_utils.grep_files(r'listing_id=\\d+', 'logs', recursive=True):
+            print(f'{path}:{line_number}: {line}')
+
+        counts = dict(ed_utils.grep_files(r'ERROR', 'logs/*.log', count_only=True))
+
+        files_without_done = list(ed_utils.grep_files(r'DONE', 'logs/*.log', invert=True, files_only=True))
+
+    Raises:
+        TypeError: If `pattern` or `path` is not a string.
+        ValueError: If `pattern` or `path` is a blank string, both `count_only` and `files_only` are set,
+                    `encoding` does not store ASCII as ASCII (e.g. 'utf-16'), or `workers` is not positive.
+        DirectoryNotFoundError: If the directory of `path` does not exist.
+    """
+    if not isinstance(pattern, str):
+        raise TypeError(f'pattern must be a str; {type(pattern) = }')
+
+    if pattern.strip() == '':
+        raise ValueError('pattern must be a non-blank string')
+
+    if not isinstance(path, str):
+        raise TypeError(f'path must be a str; {type(path) = }')
+
+    if path.strip() == '':
+        raise ValueError('path must be a non-blank string')
+
+    if count_only and files_only:
+        raise ValueError('count_only and files_only cannot both be True')
+
+    if not _is_ascii_compatible(encoding):
+        raise ValueError(f'encoding must store ASCII characters as ASCII bytes; {encoding = }')
+
+    if workers is not None and (not isinstance(workers, int) or workers <= 0):
+        raise ValueError(f'workers must be None or a positive int; {workers = }')
+
+    flags = re.IGNORECASE if case_insensitive else 0
+    per_line = _sees_past_line(pattern.encode(encoding))
+    if not per_line:
+        # MULTILINE, so '^' and '$' match at every line boundary of the whole-file buffer
+        flags |= re.MULTILINE
+    regex = re.compile(pattern.encode(encoding), flags)
+
+    mode = 'count' if count_only else 'files' if files_only else 'lines'
+    # sorted, so the results do not depend on the order the directory happens to be listed in
+    paths = sorted(entry.path for entry in _dir_or_glob_files(path, recursive))
+
+    return _grep_files(regex, paths, invert, mode, encoding, workers or os.cpu_count() or 1, per_line)
+
+def _grep_files(regex: re.Pattern, paths: Iterator[str], invert: bool, mode: str, encoding: str,
+                workers: int, per_line: bool) -> Iterator[Any]:
+    if workers == 1:
+        results = (_grep_file(p, regex, invert, mode, encoding, per_line) for p in paths)
+        executor = None
+    else:
+        # the compiled regex is pickled to each worker, where re's cache compiles it once per process
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        results = _bounded_map(executor, _grep_file_args,
+                               ((p, regex, invert, mode, encoding, per_line) for p in paths),
+                               window=workers * 4)
+    try:
+        for file_path, result in results:
+            if isinstance(result, OSError):
+                print(f'Error: {file_path}: {result}')
+            elif mode == 'count':
+                yield file_path, result
+            elif mode == 'files':
+                if result:
+                    yield file_path
+            else:
+                for line_number, line in result:
+                    yield file_path, line_number, line
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+grep_files.__version__ = grep_files.version = '0.3'
+
+
+def _grep_file_args(args: tuple) -> tuple:
+    return _grep_file(*args)
+
+def _grep_file(file_path: str, regex: re.Pattern, invert: bool, mode: str, encoding: str,
+               per_line: bool = False) -> tuple:
+    """
+    Searches one file; module level, so it can run in a ProcessPoolExecutor worker.
+    Returns (file_path, result): result is a list of (line_number, line), a count, or a bool (by `mode`),
+    or the OSError if the file could not be read. With `per_line`, each line is searched on its own.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:   # mmap() cannot map an empty file
+                return file_path, [] if mode == 'lines' else 0 if mode == 'count' else False
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                spans = _select_line_spans(buf, regex, invert, per_line)
+                if mode == 'files':
+                    return file_path, next(spans, None) is not None
+                if mode == 'count':
+                    return file_path, sum(1 for _ in spans)
+                return file_path, [(line_number, buf[start:end].rstrip(b'\r').decode(encoding, errors='replace'))
+                                   for line_number, start, end in spans]
+    except OSError as err:
+        return file_path, err
+
+
+def _select_line_spans(buf, regex: re.Pattern, invert: bool, per_line: bool = False) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yields (line_number, start, end) of the lines of `buf` that `regex` matches (or does not, if `invert`),
+    where buf[start:end] is the line without its b'\\n'. With `per_line`, each line is searched on its own
+    (see _search_each_line()), otherwise the whole buffer is (see _match_line_spans()).
+    """
+    size = len(buf)
+    line_number = 1   # number of the line starting at `pos`
+    pos = 0
+
+    for start, end in (_search_each_line if per_line else _match_line_spans)(buf, regex):
+        if invert:
+            while pos < start:
+                stop = buf.find(b'\n', pos, start)
+                yield line_number, pos, stop
+                line_number += 1
+                pos = stop + 1
+            line_number += 1   # the matching line
+        else:
+            line_number += _buffer_count(buf, b'\n', pos, start)
+            yield line_number, start, end
+            line_number += 1
+        pos = end + 1
+
+    if invert:
+        while pos < size:
+            stop = buf.find(b'\n', pos)
+            stop = size if stop == -1 else stop
+            yield line_number, pos, stop
+            line_number += 1
+            pos = stop + 1
+
+
+def _buffer_count(buf, sub: bytes, start: int, end: int, block_size: int = 16 * 1024 * 1024) -> int:
+    """buf.count(sub, start, end) for a buffer without .count(), such as mmap, copying one block at a time."""
+    count = 0
+    for pos in range(start, end, block_size):
+        count += buf[pos:min(pos + block_size, end)].count(sub)
+    return count
+
+
+def _match_line_spans(buf, regex: re.Pattern) -> Iterator[Tuple[int, int]]:
+    """
+    Yields (start, end) of each line of `buf` containing a match of `regex`, in order;
+    buf[start:end] is the line without its b'\\n'. `regex` should be compiled with re.MULTILINE.
+    """
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        match = regex.search(buf, pos)
+        if match is None:
+            return
+
+        match_start = match.start()
+        if match_start == size and buf[size - 1:size] == b'\n':   # empty match after the last line
+            return
+        start = max(pos, buf.rfind(b'\n', pos, match_start) + 1)
+        end = buf.find(b'\n', match_start)
+        end = size if end == -1 else end
+
+        # a match running past the end of its line (e.g. r'\s+' over b'\n') must also match within the line,
+        # where the line includes its b'\n', as for a line read from a file in text mode
+        if match.end() <= end + 1 or regex.search(buf, start, end + 1) is not None:
+            yield start, end
+
+        pos = end + 1
+
+
+def _search_each_line(buf, regex: re.Pattern) -> Iterator[Tuple[int, int]]:
+    """
+    Yields (start, end) of each line of `buf` containing a match of `regex`, searching each line (with its
+    b'\\n', as read from a file in text mode) as a string of its own, as grep() does. `regex` should be
+    compiled without re.MULTILINE.
+    """
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = buf.find(b'\n', pos)
+        end = size if end == -1 else end
+        # a slice, not search(buf, pos, end + 1): '\A' and lookbehinds must not see the previous line
+        if regex.search(buf[pos:end + 1]) is not None:
+            yield pos, end
+        pos = end + 1
+
+
+def _sees_past_line(pattern: bytes) -> bool:
+    """
+    Whether regex `pattern` may have '\\A', '\\Z' or a lookaround, which in a whole-file buffer match differently
+    than in a line of its own (they can see the start or end of the buffer, or the neighbouring lines).
+    Read from the pattern's text, without the re module's internals: an escaped backslash is skipped, and
+    anything else that looks like one of them counts (e.g. '[(?=]'), since searching line by line is always
+    correct, only slower.
+    """
+    pos = 0
+    while True:
+        pos = min((found for found in (pattern.find(b'\\', pos), pattern.find(b'(?', pos)) if found != -1),
+                  default=-1)
+        if pos == -1:
+            return False
+        if pattern.startswith(b'\\', pos):
+            if pattern[pos + 1:pos + 2] in (b'A', b'Z', b'z'):   # '\\z': '\\Z' in Python 3.14+
+                return True
+            pos += 2   # an escaped character, e.g. '\\\\' or '\\('
+        elif pattern[pos + 2:pos + 3] in (b'=', b'!') or pattern[pos + 2:pos + 4] in (b'<=', b'<!'):
+            return True
+        else:
+            pos += 2
+
+# -------------------------------------------------------------------------------------------------------
+
+from typing import List
+
+def grep_many(patterns: Iterable[str],
+              file_path: str,
+              include_line_number: Optional[bool] = False,
+              case_insensitive: Optional[bool] = False,
+              regex: Optional[bool] = False,
+              encoding: Optional[str] = 'utf-8') -> None:
+    """
+    Search a file for many patterns at once, in a single pass, and print the matching lines,
+    each prefixed with the patterns that hit it.
+    To use the matching lines in a pipeline rather than print them, use iter_grep_many().
+
+    Parameters:
+        patterns:Iterable[str]    The patterns to search for, e.g. dozens of listing IDs.
+                                  Literal strings, unless `regex` is True.
+        file_path:str             The path to the file to be searched.
+        include_line_number:bool  Optional. If True, includes the line numbers in the output. Default is False.
+        case_insensitive:bool     Optional. If True, performs a case-insensitive search (ASCII letters).
+                                  Default is False.
+        regex:bool                Optional. If True, the patterns are regular expressions. Default is False.
+        encoding:str              Optional. Encoding of the file and the patterns. Default is 'utf-8'.
+
+    Returns:
+        None.
+
+    Usage/Examples:
+        import ed_utils
+
+        listing_ids = ['L100234', 'L100872', 'L203311']
+
+        ed_utils.grep_many(listing_ids, 'logs/clicks.log')
+        # L100234: 2023-12-01 10:02:11 click listing=L100234 user=...
+        # L100872,L203311: 2023-12-01 10:02:15 compare listing=L100872 vs listing=L203311
+
+        ed_utils.grep_many(listing_ids, 'logs/clicks.log', include_line_number=True)
+    """
+    for line_number, line, hits in iter_grep_many(patterns, file_path, case_insensitive=case_insensitive,
+                                                  regex=regex, encoding=encoding):
+        if include_line_number:
+            print(f"{line_number}: {','.join(hits)}: {line.rstrip()}")
+        else:
+            print(f"{','.join(hits)}: {line.rstrip()}")
+
+grep_many.__version__ = grep_many.version = '0.1'
+
+
+def iter_grep_many(patterns: Iterable[str],
+                   file_path: str,
+                   case_insensitive: Optional[bool] = False,
+                   regex: Optional[bool] = False,
+                   encoding: Optional[str] = 'utf-8') -> Iterator[Tuple[int, str, List[str]]]:
+    """
+    Lazily yields (line_number, line, hits) for the lines of a file matching any of many patterns,
+    where hits lists the patterns found in the line, in order of their first occurrence.
+
+    The file is scanned once, whatever the number of patterns, by a single compiled regex over
+    the memory-mapped file (see grep_files()):
+        literal patterns - are merged into a trie-shaped regex, e.g. ['L1002', 'L1008', 'L21']
+                           becomes rb'L(?:100(?:2|8)|21)', so at each position of the file
+                           the regex engine follows one path of the trie, like an Aho-Corasick
+                           automaton, instead of trying each pattern in turn. The hits are exact,
+                           including overlapping patterns such as 'L1002' and 'L100'.
+        regex=True       - are combined into one alternation, which finds the matching lines; each
+                           pattern is then searched in those lines only, so the hits are every
+                           pattern found in the line, as for literal patterns (numbered
+                           backreferences inside the patterns are not supported). Patterns with
+                           '\\A', '\\Z' or a lookaround are matched line by line, as in grep().
+
+    Parameters:
+        patterns:Iterable[str]    The patterns to search for. Literal strings, unless `regex` is True.
+        file_path:str             The path to the file to be searched.
+        case_insensitive:bool     Optional. If True, performs a case-insensitive search (ASCII letters).
+                                  Default is False.
+        regex:bool                Optional. If True, the patterns are regular expressions. Default is False.
+        encoding:str              Optional. Encoding of the file and the patterns. Default is 'utf-8'.
+
+    Returns:
+        Iterator of (line_number, line, hits) tuples; line_number starts at 1, line has no trailing
+        newline, hits is a list of the patterns (as given) found in the line.
+
+    Usage/Examples:
+        import ed_utils
+
+        for line_number, line, hits in ed_utils.iter_grep_many(listing_ids, 'logs/clicks.log'):
+            ...
+
+        import collections
+        lines_per_id = collections.Counter(hit for _, _, hits in ed_utils.iter_grep_many(listing_ids, 'logs/clicks.log')
+                                           for hit in hits)
+
+    Raises:
+        TypeError: If `patterns` is a str or contains a non-str, or `file_path` is not a string.
+        ValueError: If `patterns` is empty or contains a blank string, `file_path` is a blank string,
+                    or `encoding` does not store ASCII as ASCII (e.g. 'utf-16').
+        FileNotFoundError: If `file_path` does not exist.
+    """
+    if isinstance(patterns, str) or not isinstance(patterns, Iterable):
+        raise TypeError(f'patterns must be an iterable of str, such as a list; {type(patterns) = }')
+
+    patterns = list(dict.fromkeys(patterns))   # unique, in the given order
+
+    if not patterns:
+        raise ValueError('patterns must contain at least one pattern')
+
+    if not all(isinstance(p, str) for p in patterns):
+        raise TypeError('patterns must all be str')
+
+    if any(p.strip() == '' for p in patterns):
+        raise ValueError('patterns must be non-blank strings')
+
+    if not isinstance(file_path, str):
+        raise TypeError(f'file_path must be a str; {type(file_path) = }')
+
+    if file_path.strip() == '':
+        raise ValueError('file_path must be a non-blank string')
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f'{file_path} does not exist')
+
+    if not _is_ascii_compatible(encoding):
+        raise ValueError(f'encoding must store ASCII characters as ASCII bytes; {encoding = }')
+
+    flags = re.MULTILINE | (re.IGNORECASE if case_insensitive else 0)
+    per_line = False
+
+    if regex:
+        encoded = [p.encode(encoding) for p in patterns]
+        combined = b'|'.join(b'(?:%s)' % p for p in encoded)
+        per_line = _sees_past_line(combined)
+        if per_line:   # see grep_files()
+            flags &= ~re.MULTILINE
+        scanner = re.compile(combined, flags)
+        regexes = [re.compile(p, flags) for p in encoded]
+
+        def _hits(line: bytes) -> List[str]:
+            # every pattern, not just those winning the alternation: 'ERR' is also in 'ERROR'.
+            # In order of their first match, the shorter first at the same position, as for literal patterns
+            firsts = []
+            for i, pattern_regex in enumerate(regexes):
+                m = pattern_regex.search(line)
+                if m is not None:
+                    firsts.append((m.start(), m.end(), i))
+            return [patterns[i] for _, _, i in sorted(firsts)]
+    else:
+        # key -> pattern as given; keys are lower case when case-insensitive
+        by_key = {}
+        for p in patterns:
+            key = p.encode(encoding)
+            by_key.setdefault(key.lower() if case_insensitive else key, p)
+
+        trie = _trie_regex(list(by_key))
+        scanner = re.compile(trie, flags)
+        # a lookahead matches at every start position, also inside or overlapping an earlier hit
+        starts = re.compile(b'(?=(' + trie + b'))', flags)
+        lengths = sorted({len(key) for key in by_key})
+
+        def _hits(line: bytes) -> List[str]:
+            found = {}
+            for m in starts.finditer(line):
+                longest = m.group(1).lower() if case_insensitive else m.group(1)
+                # the longest pattern at this position, and any other pattern that is a prefix of it
+                for length in lengths:
+                    if length > len(longest):
+                        break
+                    key = longest[:length]
+                    if key in by_key:
+                        found.setdefault(by_key[key])
+            return list(found)
+
+    return _iter_grep_many(file_path, scanner, _hits, encoding, per_line)
+
+def _iter_grep_many(file_path: str, scanner: re.Pattern, hits, encoding: str,
+                    per_line: bool) -> Iterator[Tuple[int, str, List[str]]]:
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:   # mmap() cannot map an empty file
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for line_number, start, end in _select_line_spans(buf, scanner, invert=False, per_line=per_line):
+                raw = buf[start:end + 1]   # with its b'\n', as the scan saw it
+                yield line_number, raw.rstrip(b'\r\n').decode(encoding, errors='replace'), hits(raw)
+
+iter_grep_many.__version__ = iter_grep_many.version = '0.2'
+
+
+def _trie_regex(words: List[bytes]) -> bytes:
+    """
+    Returns a regex (bytes) matching exactly the literal `words`, shaped as their trie, e.g.
+    [b'L1002', b'L1008', b'L21'] -> rb'L(?:100(?:2|8)|21)'. At a position it matches the longest word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[None] = True   # a word ends here
+
+    # children before their parent, with an explicit stack: a long word would exceed the recursion limit
+    regexes = {}   # id(node) -> regex of the words below it
+    stack = [(trie, False)]
+    while stack:
+        node, children_done = stack.pop()
+        children = sorted((byte, child) for byte, child in node.items() if byte is not None)
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in children)
+            continue
+
+        branches = [re.escape(bytes([byte])) + regexes.pop(id(child)) for byte, child in children]
+        if not branches:
+            regexes[id(node)] = b''
+        elif len(branches) == 1 and None not in node:
+            regexes[id(node)] = branches[0]
+        else:
+            group = b'(?:' + b'|'.join(branches) + b')'
+            # '?': a shorter word ends here, greedy prefers longer
+            regexes[id(node)] = group + b'?' if None in node else group
+
+    return regexes[id(trie)]
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -448,6 +1874,9 @@ def head(filename: str,
          encoding: Optional[str]='utf-8') -> None:
     """
     Prints the first `num_lines` lines (or less) from `filename`.
+    To use the lines in a pipeline rather than print them, use iter_head().
+    A gzip, bz2, xz or zstd compressed file (recognized by its first bytes) is decompressed as a stream,
+    only as far as the lines printed.
 
     Parameters:
         filename:str - A string representing the name of the file to read.
@@ -476,38 +1905,96 @@ def head(filename: str,
         ValueError: If `filename` is a blank string or `num_lines` is less than or equal to 0.
         FileNotFoundError: If `filename` does not exist.
     """
+    for _, line in iter_head(filename, num_lines, encoding):
+        print(line.rstrip())
 
-    if not isinstance(filename, str):
-        raise TypeError(f'filename must be a str; {type(filename) = }')
+head.__version__ = head.version = '0.3'
 
-    if filename.strip() == '':
-        raise ValueError('filename must be a non-blank string')
 
-    if not isinstance(num_lines, int):
-        raise TypeError(f'num_lines must be an int; {type(num_lines) = }')
+def iter_head(filename: str,
+              num_lines: Optional[int]=10,
+              encoding: Optional[str]='utf-8') -> Iterator[Tuple[int, str]]:
+    """
+    Lazily yields (line_number, line) for the first `num_lines` lines (or less) of `filename`.
+    Same lines as head(), which prints these; memory use is one line regardless of file size.
 
-    if num_lines <= 0:
-        raise ValueError('num_lines must be a positive integer')
+    Parameters:
+        filename:str - A string representing the name of the file to read.
+        num_lines:int - An optional integer representing the number of lines to yield. Default is 10.
+        encoding:str - An optional encoding. Default is 'utf-8'.
 
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f'{filename} does not exist')
+    Returns:
+        Iterator of (line_number, line) tuples; line_number starts at 1, line has no trailing newline.
 
-    with open(filename, 'r', encoding=encoding) as file:
-        for i in range(num_lines):
+    Usage/Examples:
+        import ed_utils
+
+        header = next(ed_utils.iter_head(r'data/Mall_Customers.csv'))[1]   # first line only
+
+        for line_number, line in ed_utils.iter_head(r'data/Mall_Customers.csv', 15):
+            print(line_number, line)
+
+    Raises:
+        TypeError: If `filename` is not a string or `num_lines` is not an integer.
+        ValueError: If `filename` is a blank string or `num_lines` is less than or equal to 0.
+        FileNotFoundError: If `filename` does not exist.
+    """
+    _validate_file_lines(filename, num_lines)
+
+    return _iter_head(filename, num_lines, encoding)
+
+def _iter_head(filename: str, num_lines: int, encoding: str) -> Iterator[Tuple[int, str]]:
+    index = _usable_line_index(filename, encoding)
+    if index is not None:   # read exactly the bytes of the lines
+        stop = min(num_lines, index.num_lines)
+        yield from enumerate(_read_indexed_lines(filename, index, 0, stop, encoding), start=1)
+        return
+
+    # a compressed file is decompressed only as far as the lines read
+    with _open_text(filename, encoding) as file:
+        for line_number in range(1, num_lines + 1):
             line = file.readline()
             if not line:
                 break
-            print(line.rstrip())
+            yield line_number, line.rstrip('\n')
+
+iter_head.__version__ = iter_head.version = '0.1'
+
+
+def _validate_file_lines(filename: str, num_lines: int) -> None:
+    """Shared argument checks of head(), tail(), iter_head(), iter_tail()."""
+    if not isinstance(filename, str):
+        raise TypeError(f'filename must be a str; {type(filename) = }')
+
+    if filename.strip() == '':
+        raise ValueError('filename must be a non-blank string')
+
+    if not isinstance(num_lines, int):
+        raise TypeError(f'num_lines must be an int; {type(num_lines) = }')
+
+    if num_lines <= 0:
+        raise ValueError('num_lines must be a positive integer')
 
-head.__version__ = head.version = '0.2'
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f'{filename} does not exist')
 
 # -------------------------------------------------------------------------------------------------------
 
+import io   # for StringIO()
+
 def tail(filename: str,
               num_lines: Optional[int]=10,
-              encoding: Optional[str]='utf-8') -> None:
+              encoding: Optional[str]='utf-8',
+              follow: Optional[bool]=False,
+              timeout: Optional[float]=None) -> Union['FollowTail', None]:
     """
     Prints the last `num_lines` lines (or less) from `filename`.
+    To use the lines in a pipeline rather than print them, use iter_tail().
+    A gzip, bz2, xz or zstd compressed file (recognized by its first bytes) is read decompressed; for gzip,
+    a checkpoint index lets calls decompress only the end of the file: the sidecar saved by build_gzip_index(),
+    or else one built on the first call (kept in memory, at most 8 files, until the file changes).
+    With follow=True, like the unix 'tail -f', returns an iterator that yields those lines and then
+    each new line as it is appended to `filename`.
 
     Parameters:
         filename:str - A string representing the name of the file to read.
@@ -516,9 +2003,13 @@ def tail(filename: str,
                     On Windows, the default encoding is usually 'cp1252', while on Linux or macOS,
                     it's typically 'utf-8'. However, it's always better to explicitly specify the
                     encoding to avoid any unexpected behavior caused by encoding mismatches.
+        follow:bool - Optional. If True, keep the file open and yield appended lines. Default is False.
+        timeout:float - Optional, only with follow=True. Stop following after `timeout` seconds without
+                    new data. Default is None, i.e. follow until the iterator is closed.
 
     Returns:
         None.
+        FollowTail if follow=True; an iterator of str lines with .stats() for lines-per-second throughput.
 
     Usage/Examples:
         import ed_utils
@@ -531,50 +2022,205 @@ def tail(filename: str,
         ed_utils.tail(r'data/Mall_Customers.csv', 15)   # returns last 15 lines of file
         ed_utils.tail(r'data/Mall_Customers.csv', 15, encoding='cp1252')   # returns last 15 lines of file, with encoding
 
+        with ed_utils.tail(r'logs/scoring.log', follow=True) as follower:   # like tail -f
+            for line in follower:
+                print(line)
+
     Raises:
         TypeError: If `filename` is not a string or `num_lines` is not an integer.
         ValueError: If `filename` is a blank string or `num_lines` is less than or equal to 0.
         FileNotFoundError: If `filename` does not exist.
     """
 
-    if not isinstance(filename, str):
-        raise TypeError(f'filename must be a str; {type(filename) = }')
-
-    if filename.strip() == '':
-        raise ValueError('filename must be a non-blank string')
-
-    if not isinstance(num_lines, int):
-        raise TypeError(f'num_lines must be an int; {type(num_lines) = }')
+    _validate_file_lines(filename, num_lines)
 
-    if num_lines <= 0:
-        raise ValueError('num_lines must be a positive integer')
-
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f'{filename} does not exist')
+    if follow:
+        return FollowTail(filename, num_lines, encoding, timeout=timeout)
 
     try:
-        with open(filename, 'r', encoding=encoding) as file:
-            lines = file.readlines()
-            for line in lines[-num_lines:]:
-                print(line.rstrip())
+        for line in _tail_lines(filename, num_lines, encoding):
+            print(line.rstrip())
     except UnicodeDecodeError:
         print(f'Error: {filename} has non-UTF-8 encoding')
 
-tail.__version__ = tail.version = '0.2'
+tail.__version__ = tail.version = '0.7'
+
+
+def _tail_lines(filename: str, num_lines: int, encoding: str) -> Iterator[str]:
+    """The lines tail() prints, unnumbered: only the last `num_lines` lines are read, whatever the file size."""
+    return (line for _, line in _iter_tail(filename, num_lines, encoding, number_lines=False))
+
+
+def iter_tail(filename: str,
+              num_lines: Optional[int]=10,
+              encoding: Optional[str]='utf-8') -> Iterator[Tuple[int, str]]:
+    """
+    Lazily yields (line_number, line) for the last `num_lines` lines (or less) of `filename`.
+    Same lines as tail(), which prints these.
+
+    Only the last `num_lines` lines are read and decoded (see _tail_offset()), so memory use
+    depends on `num_lines`, not on file size. Numbering them needs the number of lines before them:
+    with an up-to-date line index (see build_line_index()) or a gzip checkpoint index it is known,
+    otherwise the newlines before them are counted in fixed-size binary blocks, without decoding,
+    so time grows with the file size. tail(), which prints the lines without numbers, does not count.
+    Compressed files: see tail().
+
+    Parameters:
+        filename:str - A string representing the name of the file to read.
+        num_lines:int - An optional integer representing the number of lines to yield. Default is 10.
+        encoding:str - An optional encoding. Default is 'utf-8'.
+
+    Returns:
+        Iterator of (line_number, line) tuples; line_number starts at 1, line has no trailing newline.
+
+    Usage/Examples:
+        import ed_utils
+
+        for line_number, line in ed_utils.iter_tail(r'data/Mall_Customers.csv', 15):
+            print(line_number, line)
+
+    Raises:
+        TypeError: If `filename` is not a string or `num_lines` is not an integer.
+        ValueError: If `filename` is a blank string or `num_lines` is less than or equal to 0.
+        FileNotFoundError: If `filename` does not exist.
+        UnicodeDecodeError: If the last lines cannot be decoded with `encoding` (raised on iteration).
+    """
+    _validate_file_lines(filename, num_lines)
+
+    return _iter_tail(filename, num_lines, encoding)
+
+def _iter_tail(filename: str, num_lines: int, encoding: str,
+               number_lines: bool = True) -> Iterator[Tuple[Optional[int], str]]:
+    """iter_tail(); with number_lines=False, line_number is None and the lines before the last ones are not counted."""
+    index = _usable_line_index(filename, encoding)
+    if index is not None:   # seek directly to the first line; its number is known
+        start = max(0, index.num_lines - num_lines)
+        lines = _read_indexed_lines(filename, index, start, index.num_lines, encoding)
+        for line_number, line in enumerate(lines, start=start + 1):
+            yield (line_number if number_lines else None), line
+        return
+
+    compression = _compression(filename)
+    # the checkpoint index (a sidecar, or built on the first call) decompresses just the end of the file
+    gzip_index = _gzip_index(filename) if compression == 'gzip' else None
+    if gzip_index is not None:
+        file = _GzipIndexReader(gzip_index)
+        offset = _tail_offset(file, num_lines)
+        first_line_number = gzip_index.count_newlines(offset) + 1 if number_lines else None
+        file.seek(offset)
+        text = file.read().decode(encoding)
+    elif compression is not None:
+        # other formats (or gzip without the zlib C library) cannot seek: decompress it all as a stream, keeping only the last lines
+        with _open_decompressed(filename, compression) as file:
+            newlines, data = _stream_tail(file, num_lines)
+        first_line_number = newlines + 1
+        text = data.decode(encoding)
+    else:
+        # binary mode, so only the bytes of the last `num_lines` lines are ever read and decoded
+        with open(filename, 'rb') as file:
+            offset = _tail_offset(file, num_lines)
+            # counting the lines before the last ones reads the whole start of the file
+            first_line_number = _count_newlines(file, offset) + 1 if number_lines else None
+            file.seek(offset)
+            text = file.read().decode(encoding)
+
+    # universal newlines, same line splitting as a file opened in text mode
+    lines = io.StringIO(text, newline=None).readlines()
+    if not number_lines:
+        for line in lines[-num_lines:]:
+            yield None, line.rstrip('\n')
+        return
+    first_line_number += max(0, len(lines) - num_lines)
+    for line_number, line in enumerate(lines[-num_lines:], start=first_line_number):
+        yield line_number, line.rstrip('\n')
+
+iter_tail.__version__ = iter_tail.version = '0.3'
+
+
+_TAIL_BLOCK_SIZE = 64 * 1024   # bytes read per backwards step by _tail_offset()
+
+def _tail_offset(file, num_lines: int, block_size: int = _TAIL_BLOCK_SIZE) -> int:
+    """
+    Returns the byte offset in binary `file` where its last `num_lines` lines start.
+
+    Seeks to the end of the file and reads fixed-size blocks backwards, counting b'\\n',
+    until `num_lines` line starts are found or the start of the file is reached.
+    A newline as the very last byte terminates the last line; it does not start a new one.
+    Memory use is one block; time depends on `num_lines`, not on the size of the file.
+    """
+    end = file.seek(0, os.SEEK_END)
+    pos = end
+    newlines = 0
+
+    while pos > 0:
+        read_size = min(block_size, pos)
+        pos -= read_size
+        file.seek(pos)
+        block = file.read(read_size)
+
+        idx = len(block)
+        while True:
+            idx = block.rfind(b'\n', 0, idx)
+            if idx == -1:
+                break
+            if pos + idx == end - 1:   # trailing newline of the file
+                continue
+            newlines += 1
+            if newlines == num_lines:
+                return pos + idx + 1
+
+    return 0
+
+
+def _count_newlines(file, end: int, block_size: int = _TAIL_BLOCK_SIZE * 16) -> int:
+    """Returns the number of b'\\n' in the first `end` bytes of binary `file`, reading fixed-size blocks."""
+    file.seek(0)
+    count = 0
+    remaining = end
+    while remaining > 0:
+        block = file.read(min(block_size, remaining))
+        if not block:
+            break
+        count += block.count(b'\n')
+        remaining -= len(block)
+    return count
 
 # -------------------------------------------------------------------------------------------------------
 
+import codecs   # for lookup()
+import concurrent.futures   # for ProcessPoolExecutor()
+import mmap   # for mmap()
+
 def wc(filename: str,
-       encoding: Optional[str]='utf-8') -> Tuple[int, int, int]:
+       encoding: Optional[str]='utf-8',
+       unit: Optional[str]='chars',
+       workers: Optional[int]=None,
+       cache: Optional['MetadataCache']=None) -> Tuple[int, int, int]:
     """
     Calculates the number of lines, words, and characters in a file.
 
+    The file is memory-mapped and split into byte ranges that end on a newline; the ranges are
+    counted without Python-level per-line work and the per-range counts are summed. Large files
+    (at least 64 MiB by default) are counted in a process pool. ASCII text is counted without
+    decoding; with unit='bytes' nothing is decoded at all.
+    A gzip, bz2, xz or zstd compressed file (recognized by its first bytes) is counted as it is
+    decompressed, in blocks; the counts are those of the decompressed content.
+
     Parameters:
         filename (str): Path of the file.
         encoding (str, optional): File encoding. Default is 'utf-8'.
                     On Windows, the default encoding is usually 'cp1252', while on Linux or macOS,
                     it's typically 'utf-8'. However, it's always better to explicitly specify the
                     encoding to avoid any unexpected behavior caused by encoding mismatches.
+        unit (str, optional): What the third count is. Default is 'chars'.
+                    'chars' - characters after decoding with `encoding`, as in a file opened in
+                              text mode ('\\r\\n' counts as 1 character)
+                    'bytes' - bytes of the file; nothing is decoded and words are split on ASCII
+                              whitespace only, like 'wc -c -w' in the C locale
+        workers (int, optional): Number of processes. Default is None, i.e. 1 for files smaller
+                    than 64 MiB, otherwise os.cpu_count().
+        cache (MetadataCache, optional): Return the counts from this cache if the file is unchanged
+                    since they were cached, otherwise count and cache them. Default is None.
 
     Returns:
         Tuple[int, int, int]: Tuple containing line_count, word_count, char_count
@@ -587,10 +2233,13 @@ def wc(filename: str,
         print(ed_utils.wc.__annotations__)   # type hints/annotations
 
         ed_utils.wc(r'data/Mall_Customers.csv')   # returns (201, 205, 3780)
+        ed_utils.wc(r'data/listings.csv', unit='bytes')   # no decoding
+        ed_utils.wc(r'data/listings.csv', workers=8)   # 8 processes
 
     Raises:
         TypeError: If 'filename' is not a string.
-        ValueError: If 'filename' is a blank string.
+        ValueError: If 'filename' is a blank string, 'unit' is not 'chars' or 'bytes',
+                    or 'workers' is not a positive int.
         FileNotFoundError: If 'filename' does not exist.
         IOError: If there is an error opening the file.
     """
@@ -601,24 +2250,740 @@ def wc(filename: str,
     if not filename.strip():
         raise ValueError('filename must be a non-blank string')
 
+    if unit not in ('chars', 'bytes'):
+        raise ValueError(f"unit must be 'chars' or 'bytes'; {unit = }")
+
+    if workers is not None and (not isinstance(workers, int) or workers <= 0):
+        raise ValueError(f'workers must be None or a positive int; {workers = }')
+
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f'{filename} does not exist')
+
+    if cache is not None:
+        return cache.wc(filename, encoding, unit, lambda: wc(filename, encoding, unit, workers))
+
+    compression = _compression(filename)
+    if compression is not None:
+        return _wc_compressed(filename, compression, encoding, unit)
+
+    try:
+        # line endings are only found byte-wise in encodings where ASCII is stored as ASCII
+        if not _is_ascii_compatible(encoding):
+            return _wc_text(filename, encoding, unit)
+
+        index = _load_line_index(filename)   # see build_line_index()
+        if index is not None:
+            if unit == 'bytes':
+                return index.line_count, index.byte_word_count, index.size
+            if index.encoding == codecs.lookup(encoding).name:
+                return index.line_count, index.word_count, index.char_count
+
+        size = os.path.getsize(filename)
+
+        if workers is None:
+            workers = 1 if size < _WC_PARALLEL_MIN_SIZE else (os.cpu_count() or 1)
+
+        if workers == 1 or size == 0:
+            return _wc_file(filename, size, encoding, unit)
+
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # a few ranges per worker, to even out the load
+            range_size = max(_WC_CHUNK_SIZE, -(-size // (workers * 4)))
+            ranges = list(_wc_aligned_ranges(mm, 0, size, range_size))
+            last_byte = mm[size - 1:size]
+
+        starts, ends = zip(*ranges)
+        n = len(ranges)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, n)) as executor:
+            counts = list(executor.map(_wc_range, [filename] * n, starts, ends, [encoding] * n, [unit] * n))
+        line_count, word_count, char_count = (sum(c) for c in zip(*counts))
+    except IOError as err:
+        raise IOError(f'Error reading file: {err}')
+
+    if last_byte not in (b'\n', b'\r'):   # a last line without a line ending
+        line_count += 1
+
+    return line_count, word_count, char_count
+
+
+wc.__version__ = wc.version = '0.5'
+
+
+_WC_CHUNK_SIZE = 16 * 1024 * 1024   # bytes counted at a time
+_WC_PARALLEL_MIN_SIZE = 64 * 1024 * 1024   # smaller files are counted in this process
+
+# UTF-8 of the non-ASCII whitespace that str.split() splits on:
+# U+0085, U+00A0, U+1680, U+2000..U+200A, U+2028, U+2029, U+202F, U+205F, U+3000
+_WC_UTF8_NON_ASCII_WHITESPACE = (b'\xc2\x85', b'\xc2\xa0', b'\xe1\x9a\x80', b'\xe2\x80',
+                                 b'\xe2\x81\x9f', b'\xe3\x80\x80')
+
+
+def _is_ascii_compatible(encoding: str) -> bool:
+    sample = ' \t\r\nAZaz09'
+    try:
+        return sample.encode(encoding) == sample.encode('ascii')
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _wc_aligned_ranges(mm, start: int, end: int, range_size: int) -> Iterator[Tuple[int, int]]:
+    """Yields (start, end) byte ranges of about `range_size` bytes, each ending just after a b'\\n'."""
+    while start < end:
+        stop = mm.find(b'\n', min(start + range_size, end) - 1, end)
+        stop = end if stop == -1 else stop + 1
+        yield start, stop
+        start = stop
+
+
+def _wc_file(filename: str, size: int, encoding: str, unit: str) -> Tuple[int, int, int]:
+    """
+    wc() of one file in this process, without argument checks; `encoding` must be ASCII compatible.
+    `size` (e.g. from a DirEntry) only chooses between one read() and memory-mapped ranges.
+    """
+    if size <= _WC_CHUNK_SIZE:
+        with open(filename, 'rb') as file:
+            data = file.read()
+        line_count, word_count, char_count = _wc_bytes(data, encoding, unit)
+        last_byte = data[-1:]
+    else:
+        line_count, word_count, char_count = _wc_range(filename, 0, size, encoding, unit)
+        with open(filename, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            last_byte = file.read(1)
+
+    # the last line is counted by its line ending; a last line without one still counts
+    if last_byte not in (b'', b'\n', b'\r'):
+        line_count += 1
+
+    return line_count, word_count, char_count
+
+
+def _wc_range(filename: str, start: int, end: int, encoding: str, unit: str) -> Tuple[int, int, int]:
+    """
+    Counts line endings, words and chars/bytes in bytes [start, end) of `filename`.
+    Module level, so it can run in a ProcessPoolExecutor worker.
+    """
+    line_count = word_count = char_count = 0
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for a, b in _wc_aligned_ranges(mm, start, end, _WC_CHUNK_SIZE):
+            lines, words, chars = _wc_bytes(mm[a:b], encoding, unit)
+            line_count += lines
+            word_count += words
+            char_count += chars
+    return line_count, word_count, char_count
+
+
+def _wc_bytes(data: bytes, encoding: str, unit: str) -> Tuple[int, int, int]:
+    """
+    Counts line endings, words and chars/bytes in `data`, with the results of text mode:
+    '\\n', '\\r\\n' and '\\r' each end a line and count as 1 char; words are str.split() words.
+    `data` must not split a line ending or a multi-byte character, i.e. it ends on a b'\\n'.
+    """
+    has_cr = b'\r' in data
+    crlf = data.count(b'\r\n') if has_cr else 0
+    line_count = data.count(b'\n') + (data.count(b'\r') - crlf if has_cr else 0)
+
+    if unit == 'bytes':
+        return line_count, _count_ascii_words(data, str_whitespace=False), len(data)
+
+    if data.isascii():
+        return line_count, _count_ascii_words(data, str_whitespace=True), len(data) - crlf
+
+    text = data.decode(encoding)   # also validates, as reading in text mode does
+    if (codecs.lookup(encoding).name == 'utf-8'
+            and not any(ws in data for ws in _WC_UTF8_NON_ASCII_WHITESPACE)):
+        word_count = _count_ascii_words(data, str_whitespace=True)   # multi-byte chars are never whitespace
+    else:
+        word_count = len(text.split())
+
+    return line_count, word_count, len(text) - crlf
+
+
+def _count_ascii_words(data: bytes, str_whitespace: bool) -> int:
+    """
+    Number of runs of non-whitespace bytes, i.e. len(data.split()) without building the list.
+    Whitespace is b' \\t\\n\\r\\x0b\\x0c' as for bytes.split(); with `str_whitespace` also
+    b'\\x1c'..b'\\x1f', the other ASCII characters that str.split() splits on.
+    """
+    if not data:
+        return 0
+    arr = np.frombuffer(data, dtype=np.uint8)
+    # uint8 arithmetic wraps around, so (arr - lo) < n is lo <= arr < lo + n
+    is_space = (arr - np.uint8(9)) < 5   # \t \n \x0b \x0c \r
+    if str_whitespace:
+        is_space |= (arr - np.uint8(28)) < 5   # \x1c..\x1f and ' '
+    else:
+        is_space |= arr == 32
+    return int(not is_space[0]) + int(np.count_nonzero(is_space[:-1] & ~is_space[1:]))
+
+
+def _wc_compressed(filename: str, compression: str, encoding: str, unit: str) -> Tuple[int, int, int]:
+    """
+    wc() of the decompressed content of `filename`, streamed in blocks of about _WC_CHUNK_SIZE that are cut
+    after their last b'\n'. With unit='bytes', the third count is the number of decompressed bytes.
+    """
+    line_count = word_count = char_count = 0
+
+    if not _is_ascii_compatible(encoding):   # e.g. 'utf-16', line by line in text mode like _wc_text()
+        with io.TextIOWrapper(_open_decompressed(filename, compression), encoding=encoding) as file:
+            for line in file:
+                line_count += 1
+                word_count += len(line.split())
+                char_count += len(line)
+        if unit == 'bytes':
+            with _open_decompressed(filename, compression) as file:
+                char_count = sum(len(block) for block in iter(lambda: file.read(_WC_CHUNK_SIZE), b''))
+        return line_count, word_count, char_count
+
+    rest = b''
+    last_byte = b''
+    with _open_decompressed(filename, compression) as file:
+        while True:
+            block = file.read(_WC_CHUNK_SIZE)
+            if not block:
+                break
+            last_byte = block[-1:]
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:   # no line ending yet, keep reading
+                rest += block
+                continue
+            chunk_lines, chunk_words, chunk_chars = _wc_bytes(rest + block[:cut], encoding, unit)
+            line_count += chunk_lines
+            word_count += chunk_words
+            char_count += chunk_chars
+            rest = block[cut:]
+
+    if rest:
+        chunk_lines, chunk_words, chunk_chars = _wc_bytes(rest, encoding, unit)
+        line_count += chunk_lines
+        word_count += chunk_words
+        char_count += chunk_chars
+
+    # the last line is counted by its line ending; a last line without one still counts
+    if last_byte not in (b'', b'\n', b'\r'):
+        line_count += 1
+
+    return line_count, word_count, char_count
+
+
+def _wc_text(filename: str, encoding: str, unit: str) -> Tuple[int, int, int]:
+    """Line by line text mode counting, for encodings such as 'utf-16' that _wc_bytes() cannot handle."""
+    line_count = word_count = char_count = 0
+
+    with open(filename, 'r', encoding=encoding) as file:
+        for line in file:
+            line_count += 1
+            word_count += len(line.split())
+            char_count += len(line)
+
+    if unit == 'bytes':
+        char_count = os.path.getsize(filename)
+
+    return line_count, word_count, char_count
+
+# -------------------------------------------------------------------------------------------------------
+
+import collections   # for deque()
+import fnmatch   # for translate()
+import glob   # for has_magic()
+import itertools   # for islice()
+import time   # for perf_counter()
+
+def wc_batch(path: str,
+             encoding: Optional[str]='utf-8',
+             unit: Optional[str]='chars',
+             recursive: Optional[bool]=False,
+             max_workers: Optional[int]=None) -> Tuple[Any, dict]:
+    """
+    wc() for every file in a directory, or every file matching a glob, counted concurrently.
+
+    Meant for many small files (e.g. 100k partition files), where calling wc() in a loop is
+    dominated by per-call overhead: the directory is enumerated once with os.scandir(), the size
+    comes from the DirEntry, arguments are checked once, and the files are counted in a bounded
+    thread pool.
+    Only part of the work releases the GIL: the open/stat/read system calls, and numpy's word counting
+    of large buffers. The per-file Python code, bytes.count() and decoding hold it, so the threads
+    mostly overlap waiting on I/O (cold cache, network filesystems) rather than count in parallel.
+    E.g. for 20,000 files of 1 KB in the page cache, on 1 CPU: about 15,000 files/s with 1 thread,
+    about 19,000 with 4 or 8.
+    With recursive=True, symlinks to directories are not followed, and subdirectories that cannot be
+    read (PermissionError) are skipped.
+
+    Parameters:
+        path (str): A directory, e.g. 'data/partitions', or a glob whose wildcards are in the
+                    last component only, e.g. 'data/partitions/*.csv'.
+        encoding (str, optional): File encoding. Default is 'utf-8'.
+        unit (str, optional): 'chars' or 'bytes', as for wc(). Default is 'chars'.
+        recursive (bool, optional): Also count the files in subdirectories (matching the same glob).
+                    Default is False.
+        max_workers (int, optional): Number of threads. Default is None, i.e. min(32, os.cpu_count() + 4).
+
+    Returns:
+        Tuple[pandas.DataFrame, dict]:
+            table - one row per file, sorted by path, with columns
+                    'path', 'lines', 'words', unit ('chars' or 'bytes') and 'error'
+                    (None, or the message if the file could not be counted)
+            totals - dict with 'files', 'lines', 'words', unit, 'errors', 'seconds', 'files_per_second'
+
+    Usage/Examples:
+        import ed_utils
+
+        table, totals = ed_utils.wc_batch(r'data/partitions')
+        table, totals = ed_utils.wc_batch(r'data/partitions/*.csv', recursive=True)
+        print(f"{totals['files']:,} files at {totals['files_per_second']:,.0f} files/s")
+
+    Raises:
+        TypeError: If 'path' is not a string.
+        ValueError: If 'path' is a blank string, or 'unit' is not 'chars' or 'bytes'.
+        DirectoryNotFoundError: If the directory of 'path' does not exist.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        print(f"The 'pandas' module is not available. You might need to install it. 'pip install pandas'")
+        return
+
+    if not isinstance(path, str):
+        raise TypeError(f'path must be a string; {type(path) = }')
+
+    if not path.strip():
+        raise ValueError('path must be a non-blank string')
+
+    if unit not in ('chars', 'bytes'):
+        raise ValueError(f"unit must be 'chars' or 'bytes'; {unit = }")
+
+    entries = _dir_or_glob_files(path, recursive)
+
+    start = time.perf_counter()
+
+    ascii_compatible = _is_ascii_compatible(encoding)
+
+    def _count(entry: os.DirEntry) -> tuple:
+        try:
+            if ascii_compatible:
+                counts = _wc_file(entry.path, entry.stat().st_size, encoding, unit)
+            else:
+                counts = _wc_text(entry.path, encoding, unit)
+            return (entry.path, *counts, None)
+        except (OSError, UnicodeError) as err:
+            return (entry.path, 0, 0, 0, str(err))
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(_bounded_map(executor, _count, entries, window=max_workers * 64))
+
+    table = pd.DataFrame(rows, columns=['path', 'lines', 'words', unit, 'error'])
+    table = table.sort_values('path', ignore_index=True)
+
+    seconds = time.perf_counter() - start
+    totals = {
+        'files': len(table),
+        'lines': int(table['lines'].sum()),
+        'words': int(table['words'].sum()),
+        unit: int(table[unit].sum()),
+        'errors': int(table['error'].notna().sum()),
+        'seconds': seconds,
+        'files_per_second': len(table) / seconds if seconds > 0 else 0.0,
+    }
+
+    return table, totals
+
+wc_batch.__version__ = wc_batch.version = '0.2'
+
+
+def _dir_or_glob_files(path: str, recursive: bool) -> Iterator[os.DirEntry]:
+    """
+    Yields the DirEntry of each regular file in directory `path`, or matching glob `path`
+    (wildcards in the last component only), optionally also in subdirectories.
+    The directory is checked now; it is listed lazily as the iterator is consumed.
+    """
+    if glob.has_magic(path):
+        dir_path, name_pattern = os.path.split(path)
+        dir_path = dir_path or '.'
+    else:
+        dir_path, name_pattern = path, '*'
+
+    if not os.path.isdir(dir_path):
+        raise DirectoryNotFoundError(f"The path '{dir_path}' does not exist.")
+
+    # the glob is compiled once, not re-parsed per file by fnmatch.fnmatch()
+    name_match = re.compile(fnmatch.translate(name_pattern)).match
+    return _scandir_files(dir_path, name_match, recursive)
+
+
+def _scandir_files(dir_path: str, name_match, recursive: bool) -> Iterator[os.DirEntry]:
+    """
+    Yields the DirEntry of each regular file under `dir_path` whose name satisfies `name_match`.
+    Symlinks to directories are not followed (a link to a parent would never end), as in tree();
+    subdirectories that cannot be read are skipped.
+    """
+    stack = [dir_path]
+    while stack:
+        path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except PermissionError:
+            if path == dir_path:
+                raise
+            continue
+        with it:
+            for entry in it:
+                if entry.is_file():
+                    if name_match(entry.name):
+                        yield entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+
+
+def _bounded_map(executor: concurrent.futures.Executor, fn, iterable, window: int) -> Iterator[Any]:
+    """
+    Like executor.map(fn, iterable), but with at most `window` tasks submitted at a time,
+    so a huge (or lazy) iterable is never turned into a huge list of futures. Results are in order.
+    """
+    iterator = iter(iterable)
+    futures = collections.deque(executor.submit(fn, item) for item in itertools.islice(iterator, window))
+    while futures:
+        yield futures.popleft().result()
+        for item in itertools.islice(iterator, 1):
+            futures.append(executor.submit(fn, item))
+
+# -------------------------------------------------------------------------------------------------------
+
+import hashlib   # for blake2b()
+import struct   # for the line index header
+import time   # for time_ns()
+
+# Line index sidecar, 'data.csv' -> 'data.csv.lidx' (or, in an index directory, 'data.csv.<hash of its path>.lidx'):
+#     header  - magic, then size and st_mtime_ns of the data file when indexed (to detect changes),
+#               the time it was indexed (time_ns(), before reading it), its wc() counts (line_count,
+#               word_count, char_count for unit='chars', and word_count for unit='bytes'), the
+#               encoding they were counted with, and for a provisional index the hash of the content
+#     offsets - little-endian uint64 byte offset of the start of each line,
+#               followed by the size of the file, so line i is bytes offsets[i]:offsets[i + 1]
+_LINE_INDEX_SUFFIX = '.lidx'
+_LINE_INDEX_MAGIC = b'EDLIDX03'
+_LINE_INDEX_HEADER = struct.Struct('<8sQqqQQQQ16s16s')
+# an index made within this long of the file's mtime is provisional: a rewrite of the same size within
+# the same mtime tick (up to 2 s, e.g. FAT) would go unnoticed by size and mtime alone; as MetadataCache's
+# racy_seconds. See _verify_racy_index()
+_LINE_INDEX_RACY_NS = 2_000_000_000
+
+
+def _content_digest(file) -> bytes:
+    """The blake2b hash (16 bytes) of the content of binary file object `file`, read from where it is."""
+    return hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16)).digest()
+
+
+def _verify_racy_index(filename: str, mtime_ns: int, digest: bytes) -> Optional[int]:
+    """
+    For a provisional index of `filename` (made within _LINE_INDEX_RACY_NS of its mtime, `mtime_ns`), as git
+    rechecks its racily clean entries: once that long has passed since the mtime, compares the file's content
+    with `digest`, the hash of what was indexed. A write since then would have changed the mtime, so a match
+    makes the index trusted for good. Returns the time to record as the index's indexed_ns, or None if the
+    index cannot be trusted (yet: still within the mtime tick; or at all: the content changed).
+    """
+    verified_ns = time.time_ns()   # before reading, as when indexing
+    if verified_ns - mtime_ns < _LINE_INDEX_RACY_NS:
+        return None
+    with open(filename, 'rb') as file:
+        if _content_digest(file) != digest or os.fstat(file.fileno()).st_mtime_ns != mtime_ns:
+            return None
+    return verified_ns
+
+
+def _line_index_path(filename: str, index_dir: Optional[str] = None) -> str:
+    """The path of the line index of `filename`: next to it, or in `index_dir`."""
+    if index_dir is None:
+        return filename + _LINE_INDEX_SUFFIX
+    # the hash of the absolute path keeps files of the same name in different directories apart
+    digest = hashlib.blake2b(os.fsencode(os.path.abspath(filename)), digest_size=8).hexdigest()
+    return os.path.join(index_dir, f'{os.path.basename(filename)}.{digest}{_LINE_INDEX_SUFFIX}')
+
+
+class _LineIndex:
+    """A loaded line index: the header fields and the offsets as a read-only np.memmap."""
+
+    def __init__(self, size, mtime_ns, line_count, word_count, char_count, byte_word_count, encoding, offsets):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.line_count = line_count   # as wc() counts lines, i.e. also lone '\r' line endings
+        self.word_count = word_count
+        self.char_count = char_count
+        self.byte_word_count = byte_word_count
+        self.encoding = encoding
+        self.offsets = offsets
+
+    @property
+    def num_lines(self) -> int:
+        """Number of b'\\n' separated lines."""
+        return len(self.offsets) - 1
+
+    @property
+    def universal(self) -> bool:
+        """True if the lines are also those of text mode (universal newlines), i.e. there is no lone '\\r'."""
+        return self.num_lines == self.line_count
+
+
+def build_line_index(filename: str,
+                     encoding: Optional[str] = 'utf-8',
+                     index_dir: Optional[str] = None) -> str:
+    """
+    Builds and saves the line index of `filename`: a sidecar file `filename` + '.lidx' (or a file in
+    `index_dir`) with the byte offset of the start of every line, as an array of uint64, and the wc()
+    counts of the file.
+
+    With an up-to-date index next to the file (the file's size and modification time are unchanged
+    since indexing), lines() seeks directly to any line, head() and tail() read just the bytes of their
+    lines, iter_tail() numbers its lines without counting newlines, and wc() answers
+    instantly. An index in `index_dir` (e.g. for a read-only or shared data directory) is only used by
+    lines(index_dir=...).
+    An index made within 2 seconds of the file's last modification (e.g. right after writing the file)
+    is provisional, since the file could be rewritten with the same size within the same mtime tick:
+    its first use at least 2 seconds after that modification checks the file's content against a hash
+    kept in the index (one read of the file), and from then on it is trusted like any other.
+    An index is never updated implicitly, except by lines(build_index=True); rebuild it after the file
+    changes. Building costs about as much as one wc() of the file; the index takes 8 bytes per line.
+
+    Parameters:
+        filename:str - A string representing the name of the file to index.
+        encoding:str - An optional encoding, used for the character and word counts. Default is 'utf-8'.
+        index_dir:str - Optional. Directory to save the index in (created if needed). Default is None,
+                    i.e. next to `filename`.
+
+    Returns:
+        str: the path of the index file.
+
+    Usage/Examples:
+        import ed_utils
+
+        ed_utils.build_line_index(r'data/listings.csv')   # returns 'data/listings.csv.lidx'
+        ed_utils.lines(r'data/listings.csv', 5_000_000, 5_000_100)
+        ed_utils.wc(r'data/listings.csv')   # from the index
+
+        ed_utils.build_line_index(r'/shared/data/listings.csv', index_dir='line_indexes')
+        ed_utils.lines(r'/shared/data/listings.csv', 5_000_000, 5_000_100, index_dir='line_indexes')
+
+    Raises:
+        TypeError: If `filename` is not a string.
+        ValueError: If `filename` is a blank string, or `encoding` does not store ASCII as ASCII (e.g. 'utf-16').
+        FileNotFoundError: If `filename` does not exist.
+    """
+    if not isinstance(filename, str):
+        raise TypeError(f'filename must be a str; {type(filename) = }')
+
+    if filename.strip() == '':
+        raise ValueError('filename must be a non-blank string')
+
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f'{filename} does not exist')
+
+    if not _is_ascii_compatible(encoding):
+        raise ValueError(f'encoding must store ASCII characters as ASCII bytes; {encoding = }')
+
+    if index_dir is not None:
+        os.makedirs(index_dir, exist_ok=True)
+    index_path = _line_index_path(filename, index_dir)
+    temp_path = f'{index_path}.{os.getpid()}.tmp'
+
+    line_count = word_count = char_count = byte_word_count = 0
+
+    with open(filename, 'rb') as file, open(temp_path, 'wb') as index_file:
+        indexed_ns = time.time_ns()   # before reading, so a change while reading makes the index untrusted
+        file_stat = os.fstat(file.fileno())
+        size = file_stat.st_size
+        # a provisional index keeps the hash of what it indexed, to be verified later (_verify_racy_index())
+        content_hash = (hashlib.blake2b(digest_size=16)
+                        if indexed_ns - file_stat.st_mtime_ns < _LINE_INDEX_RACY_NS else None)
+        index_file.write(b'\0' * _LINE_INDEX_HEADER.size)   # filled in at the end
+
+        if size > 0:
+            index_file.write(np.zeros(1, dtype='<u8').tobytes())   # the first line starts at 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end in _wc_aligned_ranges(mm, 0, size, _WC_CHUNK_SIZE):
+                    chunk = mm[start:end]
+                    if content_hash is not None:
+                        content_hash.update(chunk)
+
+                    # a line starts after every b'\n', except after the last byte of the file
+                    starts = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10) + (start + 1)
+                    if end == size and chunk.endswith(b'\n'):
+                        starts = starts[:-1]
+                    index_file.write(starts.astype('<u8').tobytes())
+
+                    chunk_lines, chunk_words, chunk_chars = _wc_bytes(chunk, encoding, 'chars')
+                    line_count += chunk_lines
+                    word_count += chunk_words
+                    char_count += chunk_chars
+                    byte_word_count += _count_ascii_words(chunk, str_whitespace=False)
+
+                if mm[size - 1:size] not in (b'\n', b'\r'):   # a last line without a line ending
+                    line_count += 1
+
+        index_file.write(np.array([size], dtype='<u8').tobytes())
+
+        index_file.seek(0)
+        index_file.write(_LINE_INDEX_HEADER.pack(_LINE_INDEX_MAGIC, size, file_stat.st_mtime_ns, indexed_ns,
+                                                 line_count, word_count, char_count, byte_word_count,
+                                                 codecs.lookup(encoding).name.encode('ascii')[:16],
+                                                 b'\0' * 16 if content_hash is None else content_hash.digest()))
+
+    os.replace(temp_path, index_path)   # atomic, readers never see a half-written index
+    return index_path
+
+build_line_index.__version__ = build_line_index.version = '0.3'
+
+
+def _load_line_index(filename: str, index_dir: Optional[str] = None, racy_ok: bool = False) -> Optional[_LineIndex]:
+    """
+    Returns the line index of `filename` (next to it, or in `index_dir`) if it has one that is up to date,
+    otherwise None. A provisional index (made within _LINE_INDEX_RACY_NS of the file's mtime) is used if
+    `racy_ok`, or once verified against the file's content, and then marked trusted.
+    """
+    index_path = _line_index_path(filename, index_dir)
+    try:
+        file_stat = os.stat(filename)
+        with open(index_path, 'rb') as index_file:
+            header = index_file.read(_LINE_INDEX_HEADER.size)
+        if len(header) != _LINE_INDEX_HEADER.size:
+            return None
+        magic, size, mtime_ns, indexed_ns, line_count, word_count, char_count, byte_word_count, encoding, digest = \
+            _LINE_INDEX_HEADER.unpack(header)
+        if magic != _LINE_INDEX_MAGIC or size != file_stat.st_size or mtime_ns != file_stat.st_mtime_ns:
+            return None
+        if indexed_ns - mtime_ns < _LINE_INDEX_RACY_NS and not racy_ok:
+            verified_ns = _verify_racy_index(filename, mtime_ns, digest)
+            if verified_ns is None:
+                return None
+            try:   # trusted from now on, without hashing the file again
+                with open(index_path, 'r+b') as index_file:
+                    index_file.write(_LINE_INDEX_HEADER.pack(magic, size, mtime_ns, verified_ns, line_count, word_count,
+                                                             char_count, byte_word_count, encoding, digest))
+            except OSError:   # e.g. a read-only index directory: verified again next time
+                pass
+        offsets = np.memmap(index_path, dtype='<u8', mode='r', offset=_LINE_INDEX_HEADER.size)
+    except (OSError, ValueError):
+        return None
+
+    return _LineIndex(size, mtime_ns, line_count, word_count, char_count, byte_word_count,
+                      encoding.rstrip(b'\0').decode('ascii'), offsets)
+
+
+def _usable_line_index(filename: str, encoding: str) -> Optional[_LineIndex]:
+    """
+    The up-to-date line index of `filename`, if its lines are those that head() and tail() read in text mode
+    with `encoding`; otherwise None.
+    """
+    index = _load_line_index(filename)
+    if index is None or not index.universal or not _is_ascii_compatible(encoding):
+        return None
+    return index
+
+
+def _read_indexed_lines(filename: str, index: _LineIndex, start: int, stop: int, encoding: str) -> List[str]:
+    """Lines [start, stop) of `filename` (0-based, b'\\n' separated), with one seek and one read."""
+    if start >= stop:
+        return []
+    begin, end = int(index.offsets[start]), int(index.offsets[stop])
+    with open(filename, 'rb') as file:
+        file.seek(begin)
+        data = file.read(end - begin)
+    return [line.rstrip('\r') for line in data.decode(encoding).split('\n')[:stop - start]]
+
+
+def lines(filename: str,
+          start: int,
+          stop: Optional[int] = None,
+          encoding: Optional[str] = 'utf-8',
+          build_index: Optional[bool] = False,
+          index_dir: Optional[str] = None) -> List[str]:
+    """
+    Returns lines start, start + 1, ..., stop - 1 of `filename`, like lines_list[start:stop]
+    (0-based, stop excluded, negative values count from the end), without trailing newlines.
+
+    With an up-to-date line index of the file (see build_line_index()), seeks directly to the first
+    line and reads only the requested bytes, whatever the size of the file. Without one, the file is
+    read up to line `stop` (the last lines, lines(filename, -n), are found from the end; other negative
+    values need one pass to count the lines), unless build_index=True: then the index is built and
+    saved first, next to the file or in `index_dir`, and later calls seek directly.
+    Lines are separated by '\\n' (a '\\r' before it is removed).
+
+    Parameters:
+        filename:str - A string representing the name of the file to read.
+        start:int - Index of the first line.
+        stop:int - Optional. Index after the last line. Default is None, i.e. to the end of the file.
+        encoding:str - An optional encoding. Default is 'utf-8'.
+        build_index:bool - Optional. If True, build and save the line index if there is no up-to-date one.
+                    Default is False, i.e. nothing is written.
+        index_dir:str - Optional. Directory of the line index, e.g. for a read-only or shared data directory.
+                    Default is None, i.e. next to `filename`.
+
+    Returns:
+        List[str] of the lines, possibly empty.
+
+    Usage/Examples:
+        import ed_utils
+
+        ed_utils.lines(r'data/listings.csv', 5_000_000, 5_000_100)   # 100 lines
+        ed_utils.lines(r'data/listings.csv', 0, 1)   # [header line]
+        ed_utils.lines(r'data/listings.csv', -5)   # last 5 lines
+        ed_utils.lines(r'data/listings.csv', 5_000_000, 5_000_100, build_index=True)   # indexed once, then direct
+
+    Raises:
+        TypeError: If `filename` is not a string, or `start` or `stop` is not an int.
+        ValueError: If `filename` is a blank string.
+        FileNotFoundError: If `filename` does not exist.
+    """
+    if not isinstance(filename, str):
+        raise TypeError(f'filename must be a str; {type(filename) = }')
+
+    if filename.strip() == '':
+        raise ValueError('filename must be a non-blank string')
+
+    if not isinstance(start, int) or not (stop is None or isinstance(stop, int)):
+        raise TypeError(f'start and stop must be int; {type(start) = }, {type(stop) = }')
+
     if not os.path.exists(filename):
         raise FileNotFoundError(f'{filename} does not exist')
 
-    line_count = word_count = char_count = 0
+    index = _load_line_index(filename, index_dir)
+    if index is None and build_index:
+        build_line_index(filename, encoding, index_dir)
+        # just made from the file as it is now, so usable for this call even if not yet trusted later
+        index = _load_line_index(filename, index_dir, racy_ok=True)
 
-    try:
-        with open(filename, 'r', encoding=encoding) as file:
-            for line in file:
-                line_count += 1
-                word_count += len(line.split())
-                char_count += len(line)
-    except IOError as err:
-        raise IOError(f'Error reading file: {err}')
+    if index is None:
+        return _read_unindexed_lines(filename, start, stop, encoding)
 
-    return line_count, word_count, char_count
+    start, stop, _ = slice(start, stop).indices(index.num_lines)
+
+    return _read_indexed_lines(filename, index, start, stop, encoding)
 
+lines.__version__ = lines.version = '0.2'
 
-wc.__version__ = wc.version = '0.4'
+
+def _read_unindexed_lines(filename: str, start: int, stop: Optional[int], encoding: str) -> List[str]:
+    """lines() without a line index: same lines, reading the file up to `stop` (or its last lines from the end)."""
+    with open(filename, 'rb') as file:
+        if start < 0 and stop is None:
+            file.seek(_tail_offset(file, -start))
+            data = file.read()
+            raw_lines = data.split(b'\n') if data else []
+            if data.endswith(b'\n'):   # the trailing newline ends the last line, it does not start one
+                raw_lines.pop()
+        else:
+            if start < 0 or (stop is not None and stop < 0):
+                size = file.seek(0, os.SEEK_END)
+                num_lines = 0
+                if size > 0:
+                    file.seek(size - 1)
+                    last_byte = file.read(1)
+                    num_lines = _count_newlines(file, size) + (last_byte != b'\n')
+                start, stop, _ = slice(start, stop).indices(num_lines)
+                file.seek(0)
+            raw_lines = [line.rstrip(b'\n') for line in itertools.islice(file, start, stop)]
+    return [line.decode(encoding).rstrip('\r') for line in raw_lines]
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -633,6 +2998,11 @@ import platform   # for ____() - part of Python's stdlib
 from typing import Optional, Union
 import os
 import datetime
+import fnmatch   # for translate()
+import glob   # for has_magic()
+import re   # for compile()
+import stat   # for S_ISDIR()
+import time   # for monotonic()
 
 # use HTML for Jupyter Notebook output
 from IPython.display import HTML, display
@@ -652,18 +3022,39 @@ file_or_dir_path = "./"   # cwd - current working directory
 
 
 def ls_l(file_or_dir_path: Optional[str] = './',
-         output: Optional[str] = 'jupyter') -> Union[str, None]:
+         output: Optional[str] = 'jupyter',
+         recursive: Optional[bool] = False,
+         sort: Optional[str] = 'name',
+         reverse: Optional[bool] = False,
+         limit: Optional[int] = None,
+         page: Optional[int] = 1,
+         cache: Optional['MetadataCache'] = None) -> Union[str, None]:
     """
     ls_l mimics the unix 'ls -l'
-    Currently only accepts a directory name or a single file name.
-    So it currently does not support wildcards, no any other ls options such a recursion, etc.
+    Accepts a directory name, a single file name, or a glob (wildcards in the last component only,
+    e.g. 'data/*.csv'), optionally recursive like 'ls -lR'.
+
+    Directories are listed lazily, one at a time, and only the entries of the requested page are
+    formatted, so the first page of a huge directory (or tree) comes back without formatting the rest.
+    In Jupyter, output is paginated: the page is displayed as soon as it is complete, and its footer
+    (entries a-b of n) is updated while the remaining entries are counted.
 
     Parameters:
-        file_or_dir_path: str  optional file or directory path, default is cwd
+        file_or_dir_path: str  optional file or directory path, or glob, default is cwd
         output: str            optional, default is 'jupyter'
                                'text' (any case) - simple text with color decorations is supported
                                'html' (any case) - html with color decorations (via CSS)
                                'jupyter' (any case) - 'html', but displayed in the Jupyter output cell
+        recursive: bool        optional, list subdirectories too, each under a 'path:' header, like ls -R,
+                               default is False
+        sort: str              optional, 'name', 'size' (largest first), 'mtime' (newest first)
+                               or None (directory order), default is 'name'
+        reverse: bool          optional, reverse the sort order, default is False
+        limit: int             optional, entries per page, default is None, i.e. all entries for 'text'
+                               and 'html', and pages of 1,000 entries for 'jupyter'
+        page: int              optional, which page of `limit` entries, starting at 1, default is 1
+        cache: MetadataCache   optional, take the listings of unchanged directories from this cache;
+                               the entries shown are still stat'ed, default is None
     Usage/Examples:
         ls_l()                        - long directory of cwd to the Jupyter Notebook otuput cell
         ls_l('../')                   - long directory of cwd to the Jupyter Notebook otuput cell
@@ -672,6 +3063,8 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         ls_l('/users/ebujak')         - long directory of /users/ebujak to the Jupyter Notebook otuput cell
         ls_l('data')                  - long directory of data to the Jupyter Notebook otuput cell
         ls_l('data', output='text')   - long directory of data as a str
+        ls_l('data/*.csv', sort='size') - the .csv files in data, largest first
+        ls_l('data', recursive=True, limit=100, page=3) - entries 201-300 of data and its subdirectories
         ls_l.__annotations__          - type hints/annotations
         print(ls_l.__doc__)           - docstring
         help(ls_l)
@@ -680,6 +3073,8 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         TypeError   'file_or_dir_path' is not str
         TypeError   'output' is not str
         ValueError  'output' not in ('text', 'html', 'jupyter')
+        ValueError  'sort' not in ('name', 'size', 'mtime', None)
+        ValueError  'limit' or 'page' is not None or an int >= 1
     """
     # get the name of the operating system
     os_name = platform.system()
@@ -702,11 +3097,15 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         print(f"Detected OS: {os_name}. The 'termcolor' module is not available. You might need to install it. 'pip install termcolor'")
         return
 
-    try:
-        import xattr   # for xattr.listxattr() method - only on unix-like OS
-    except ImportError:
-        print(f"Detected OS: {os_name}. The 'xattr' module is not available. You might need to install it. 'pip install xattr'")
-        return
+    if hasattr(os, 'listxattr'):   # Linux, no module needed
+        listxattr = os.listxattr
+    else:
+        try:
+            import xattr   # for xattr.listxattr() method - only on unix-like OS
+        except ImportError:
+            print(f"Detected OS: {os_name}. The 'xattr' module is not available. You might need to install it. 'pip install xattr'")
+            return
+        listxattr = xattr.listxattr
     
     try:
         import pwd   # for pwd.getpwuid(owner).pw_name - part of Python's stdlib
@@ -734,6 +3133,16 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         raise ValueError(
             f"output must be in ('text', 'html', 'jupyter'), {output = }")
 
+    if sort not in ('name', 'size', 'mtime', None):
+        raise ValueError(
+            f"sort must be in ('name', 'size', 'mtime', None), {sort = }")
+
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError(f'limit must be None or an int >= 1, {limit = }')
+
+    if not isinstance(page, int) or page < 1:
+        raise ValueError(f'page must be an int >= 1, {page = }')
+
     # helper function to print filesize using engineering prefixes for powers of 10**3, 10**6, 10**9, ...
     def get_file_size(size):
         if size < 1024:
@@ -747,26 +3156,18 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         size /= 1024
         return f"{size:6.1f}G"
 
-    output_HTML_str = ''
-    line_print = ''
-
     now = datetime.datetime.now()
 
-    if os.path.isdir(file_or_dir_path):
-        # it is a directory
-        dir_path = file_or_dir_path
-        filenames = sorted(os.listdir(file_or_dir_path))
-    else:
-        # it is a single file
-        dir_path = ''
-        # this will be a list of the one filename
-        filenames = [''.join(file_or_dir_path)]
+    # permission strings of all 512 modes, for files and for directories, looked up by the low 9 mode bits
+    file_permissions, dir_permissions = _ls_l_permission_tables(colored("x", "blue"))
 
-    # print(f'{filenames = }')
+    # owner and group names, looked up once per uid/gid
+    owner_names = {}
+    group_names = {}
+    mtime_strs = {}
 
-    for filename in filenames:
-        file_path = os.path.join(dir_path, filename)
-        file_stat = os.stat(file_path)
+    def _format_entry(filename: str, file_path: str, file_stat: os.stat_result) -> Tuple[str, str]:
+        '''Returns the (text, HTML) lines of one entry.'''
         file_size = file_stat.st_size
 
         # if the file is more than 1 year old:
@@ -781,91 +3182,45 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         time_diff = now - dt
 
         # Check if the difference is greater than or equal to one year
-        if time_diff >= datetime.timedelta(days=365):
-            file_mtime = dt.strftime('%b %_d  %Y')
-        else:
-            file_mtime = dt.strftime('%b %_d %H:%M')
+        # (strftime() is slow, files modified in the same minute share the string)
+        older_than_a_year = time_diff >= datetime.timedelta(days=365)
+        mtime_key = (int(file_stat.st_mtime) // 60, older_than_a_year)
+        file_mtime = mtime_strs.get(mtime_key)
+        if file_mtime is None:
+            if older_than_a_year:
+                file_mtime = dt.strftime('%b %_d  %Y')
+            else:
+                file_mtime = dt.strftime('%b %_d %H:%M')
+            mtime_strs[mtime_key] = file_mtime
 
         file_mode = file_stat.st_mode
+        is_dir_flag = stat.S_ISDIR(file_mode)   # what os.path.isdir() checks, from the stat already made
 
-        permission_string = ""
-
-        if os.path.isdir(file_path):
-            permission_string += "d"
-            is_dir_flag = True
-        else:
-            permission_string += "-"
-            is_dir_flag = False
-        
-    #     if os.path.isdir(file_path):
-    #         permission_string += 'd'
-    #         file = f"<span style='color:blue'>{file}/</span>"
-    #     elif os.path.isfile(file_path):
-    #         permission_string += '-'
-    # # TypeError: lstat: path should be string, bytes or os.PathLike, not int
-    # #     elif os.path.islink(mode):
-    # #         permission_string += 'l'
-    #     else:
-    #         permission_string += '?'
-
-        # convert file_mode to a 9-bit binary string
-        file_mode_str = f"{file_mode:09b}"
-
-        for i, bit in enumerate(file_mode_str[-9:]):
-            if i == 0:
-                permission_string += "r" if bit == "1" else "-"
-            elif i == 1:
-                permission_string += "w" if bit == "1" else "-"
-            elif i == 2:
-                if os.path.isdir(file_path):
-                    permission_string += colored("x",
-                                                 "blue") if bit == "1" else "-"
-                else:
-                    permission_string += "x" if bit == "1" else "-"
-            elif i == 3:
-                permission_string += "r" if bit == "1" else "-"
-            elif i == 4:
-                permission_string += "w" if bit == "1" else "-"
-            elif i == 5:
-                if os.path.isdir(file_path):
-                    permission_string += colored("x",
-                                                 "blue") if bit == "1" else "-"
-                else:
-                    permission_string += "x" if bit == "1" else "-"
-            elif i == 6:
-                permission_string += "r" if bit == "1" else "-"
-            elif i == 7:
-                permission_string += "w" if bit == "1" else "-"
-            elif i == 8:
-                if os.path.isdir(file_path):
-                    permission_string += colored("x",
-                                                 "blue") if bit == "1" else "-"
-                else:
-                    permission_string += "-"  # "x" bit is not applicable for non-executable files
+        # 'd' or '-', then rwx for owner, group, other ("x" is blue for directories; the other "x" bit is
+        # not applicable for non-executable files)
+        permission_string = (dir_permissions if is_dir_flag else file_permissions)[file_mode & 0o777]
 
         # extended attributes on file or directory
-        permission_string += "@" if len(xattr.listxattr(file_path)
-                                        ) > 0 else " "
-        # permission_string += "@" if has_xattr(file_path) else " "
-
-        nlinks = file_stat.st_nlink
-
-        owner = file_stat.st_uid
-        group = file_stat.st_gid
-        owner_name = ""
-        group_name = ""
-
         try:
-            import pwd
-            owner_name = pwd.getpwuid(owner).pw_name
-        except ImportError:
-            owner_name = owner
+            permission_string += "@" if len(listxattr(file_path)) > 0 else " "
+        except OSError:   # e.g. the filesystem does not support extended attributes
+            permission_string += " "
 
-        try:
-            import grp
-            group_name = grp.getgrgid(group).gr_name
-        except ImportError:
-            group_name = group
+        owner_name = owner_names.get(file_stat.st_uid)
+        if owner_name is None:
+            try:
+                owner_name = pwd.getpwuid(file_stat.st_uid).pw_name
+            except KeyError:   # no such user any more, show the uid like ls does
+                owner_name = str(file_stat.st_uid)
+            owner_names[file_stat.st_uid] = owner_name
+
+        group_name = group_names.get(file_stat.st_gid)
+        if group_name is None:
+            try:
+                group_name = grp.getgrgid(file_stat.st_gid).gr_name
+            except KeyError:
+                group_name = str(file_stat.st_gid)
+            group_names[file_stat.st_gid] = group_name
 
         if is_dir_flag:
             nlinks = '---'  # TEMPORARY
@@ -876,15 +3231,7 @@ def ls_l(file_or_dir_path: Optional[str] = './',
         # line = f"{permission_string} {nlinks:2d} {owner_name} {group_name} \
         # {get_file_size(file_size):>10} {file_mtime}"
         # raw filesize
-        line = f"{permission_string} {nlinks:3} {owner_name}  {group_name}  "
-
-        # if is_dir_flag:
-        #     line += f"{file_size:>8}"
-        # else:
-        #     line += f"{file_size:>8}"
-        line += f"{file_size:>8}"
-
-        line += f" {file_mtime}"
+        line = f"{permission_string} {nlinks:3} {owner_name}  {group_name}  {file_size:>8} {file_mtime}"
 
         # for directories: ---------------------------------------------------
         # place a black trailing "/" - some ls utilities do not place trailing "/" on dirctories since it is colored blue
@@ -892,29 +3239,147 @@ def ls_l(file_or_dir_path: Optional[str] = './',
 
         # to stdout (for terminal output)
         # and
-        # build up HTML string (for Jupyter Notebook or an HTML file or ...)
+        # HTML (for Jupyter Notebook or an HTML file or ...)
         if is_dir_flag:
-            line_print += line + ' ' + colored(filename, 'blue') + '/\n'
-            output_HTML_str += line + ' ' + '<span style="color:blue">' + \
-                filename + '</span>' + '/' + '<br>'
-        else:
-            line_print += line + ' ' + filename + '\n'
-            output_HTML_str += line + ' ' + filename + '</span>' + '<br>'
+            return (f"{line} {colored(filename, 'blue')}/\n",
+                    f'{line} <span style="color:blue">{filename}</span>/<br>')
+        return (f"{line} {filename}\n",
+                f"{line} {filename}</span><br>")
+
+    def _page_html(page_lines: List[Tuple[str, str]], footer: str = '') -> str:
+        html = f"<pre style='font-family: monospace'>{''.join(html for _, html in page_lines)}</pre>"
+        return html + f"<div style='font-family: monospace; color:gray'>{footer}</div>" if footer else html
+
+    # the entries are listed lazily: only those on the requested page are stat'ed (unless sorting needs it)
+    # and formatted, and with output='jupyter' the page is shown as soon as it is complete
+    if output == 'jupyter' and limit is None:
+        limit = _LS_L_JUPYTER_PAGE_SIZE
+    first = (page - 1) * limit if limit is not None else 0
+    last = first + limit if limit is not None else None
+
+    page_lines = []   # (text line, HTML line) per entry (and section header), joined once at the end
+    section = None
+    count = 0
+    shown = False
+    handle = None   # the display of the page in the Jupyter output cell, updated while the scan goes on
+    last_update = 0.0
+
+    for section_path, filename, file_path, entry in _ls_l_scan(file_or_dir_path, recursive, sort, reverse, cache):
+        if count >= first and (last is None or count < last):
+            if recursive and section_path != section:
+                section = section_path
+                if page_lines:
+                    page_lines.append(('\n', '<br>'))
+                page_lines.append((f'{section_path}:\n', f'{section_path}:<br>'))
+            page_lines.append(_format_entry(filename, file_path, entry.stat() if entry else os.stat(file_path)))
+        count += 1
+
+        if last is not None and count >= last:
+            if output != 'jupyter':
+                break   # the rest is not needed for the page
+            if not shown or (handle is not None and time.monotonic() - last_update > 1):
+                # show the page now, keep counting the entries for the footer
+                footer = f'entries {first + 1:,}-{last:,} of {count:,}+ ... still listing'
+                if not shown:
+                    # no handle (None) outside of IPython, where the display cannot be updated
+                    handle = display(HTML(_page_html(page_lines, footer)), display_id=True)
+                    shown = True
+                else:
+                    handle.update(HTML(_page_html(page_lines, footer)))
+                last_update = time.monotonic()
 
     # print(line_print)
     if output == 'text':
-        return(line_print)
+        return ''.join(text for text, _ in page_lines)
     
-    output_HTML_str = f"<pre style='font-family: monospace'>{output_HTML_str}</pre>"
-
     if output == 'html':
-        return(output_HTML_str)
+        return _page_html(page_lines)
     
     if output == 'jupyter':
-        display(HTML(output_HTML_str))
+        footer = ''
+        if count > limit or page > 1:
+            pages = (count + limit - 1) // limit
+            if first < count:
+                footer = f'entries {first + 1:,}-{min(last, count):,} of {count:,} (page {page:,} of {pages:,})'
+            else:
+                footer = f'no entries on page {page:,}: {count:,} entries, {pages:,} page(s)'
+        if not shown:
+            display(HTML(_page_html(page_lines, footer)))
+        elif handle is not None:
+            handle.update(HTML(_page_html(page_lines, footer)))
+        return
+
+ls_l.__version__ = ls_l.version = '0.7'
+
+
+_LS_L_JUPYTER_PAGE_SIZE = 1_000   # entries per page displayed by ls_l(output='jupyter') without a limit
+
+
+def _ls_l_scan(file_or_dir_path: str,
+               recursive: bool,
+               sort: Optional[str],
+               reverse: bool,
+               cache: Optional['MetadataCache'] = None) -> Iterator[Tuple[Optional[str], str, str, Optional[os.DirEntry]]]:
+    """
+    Yields (directory path or None, name, path, DirEntry or None) for the entries that ls_l() lists, in order.
+    A directory is listed one at a time (through `cache` if one is given), so the first entries are yielded
+    before the whole tree is scanned.
+    """
+    if glob.has_magic(file_or_dir_path):
+        dir_path, name_pattern = os.path.split(file_or_dir_path)
+        dir_path = dir_path or '.'
+        # the glob is compiled once, not re-parsed per entry by fnmatch.fnmatch()
+        name_match = re.compile(fnmatch.translate(name_pattern)).match
+    elif os.path.isdir(file_or_dir_path):
+        dir_path, name_match = file_or_dir_path, None
+    else:
+        # it is a single file
+        yield None, file_or_dir_path, file_or_dir_path, None
         return
 
-ls_l.__version__ = ls_l.version = '0.5'
+    # like ls -S and ls -t, the largest and the newest come first; reverse=True flips the order
+    sort_key = {
+        'name': lambda entry: entry.name,
+        'size': lambda entry: (-entry.stat().st_size, entry.name),
+        'mtime': lambda entry: (-entry.stat().st_mtime, entry.name),
+        None: None,
+    }[sort]
+
+    def _ordered(entries: List[os.DirEntry]) -> List[os.DirEntry]:
+        if sort_key is not None:
+            entries.sort(key=sort_key, reverse=reverse)
+        elif reverse:
+            entries.reverse()
+        return entries
+
+    stack = [dir_path]
+    while stack:
+        dir_path = stack.pop()
+        entries = _scandir_list(dir_path, cache)
+
+        # only the entries matching the glob are sorted, i.e. stat'ed for sort='size' or 'mtime'
+        for entry in _ordered(entries if name_match is None else [e for e in entries if name_match(e.name)]):
+            yield dir_path, entry.name, entry.path, entry
+
+        if recursive:   # ls -R: the subdirectories follow, in the same order; symbolic links are not followed
+            subdirs = _ordered([entry for entry in entries if entry.is_dir(follow_symlinks=False)])
+            stack.extend(entry.path for entry in reversed(subdirs))
+
+
+def _ls_l_permission_tables(x_dir: str) -> Tuple[List[str], List[str]]:
+    """
+    The ls_l() permission strings ('-rw-r--r--' style) of the 512 values of the low 9 mode bits,
+    for files and for directories (whose "x" is `x_dir`, e.g. colored blue).
+    For files, the "x" bit of other is always shown as "-".
+    """
+    def _triad(bits: int, x: str) -> str:
+        return ("r" if bits & 4 else "-") + ("w" if bits & 2 else "-") + (x if bits & 1 else "-")
+
+    file_permissions = ["-" + _triad(mode >> 6, "x") + _triad(mode >> 3 & 7, "x") + _triad(mode & 6, "x")
+                        for mode in range(512)]
+    dir_permissions = ["d" + _triad(mode >> 6, x_dir) + _triad(mode >> 3 & 7, x_dir) + _triad(mode & 7, x_dir)
+                       for mode in range(512)]
+    return file_permissions, dir_permissions
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -1116,9 +3581,107 @@ get_memory_info.__version__ = get_memory_info.version = '0.1'
 
 # -------------------------------------------------------------------------------------------------------
 
-def five_number_summary(lst: list[Numeric]) -> tuple[Numeric, Numeric, Numeric, Numeric, Numeric]:
+import numpy as np   # for partition(), asarray()
+
+def _numeric_1d_array(values, name: str) -> np.ndarray:
+    '''values (numpy.ndarray, pandas.Series, ...) as a 1-D numpy.ndarray without copying, checking its dtype once.'''
+    array = np.asarray(values)
+    if array.dtype.kind not in 'biuf':
+        raise TypeError(f"{name} must have a bool, int, uint or float dtype; {array.dtype = }")
+    if array.ndim != 1:
+        raise ValueError(f"{name} must be 1-dimensional; {array.ndim = }")
+    return array
+
+
+def _hinge_positions(n: int) -> list[tuple[int, int]]:
+    '''
+    For sorted values x of length n >= 2, the positions (i, j) of min, Q1, Q2, Q3, max as computed by
+    five_number_summary(): each is (x[i] + x[j]) / 2, or x[i] when i == j.
+    n can also be an integer ndarray (e.g. one length per column), giving arrays of positions.
+    '''
+    def _median_positions(start: int, length: int) -> tuple[int, int]:
+        mid = start + length // 2
+        return mid - (length % 2 == 0), mid   # even length: the two middle values
+
+    half = n // 2   # the lower half is x[:half], the upper half is x[n - half:]
+    return [(0, 0), _median_positions(0, half), _median_positions(0, n),
+            _median_positions(n - half, half), (n - 1, n - 1)]
+
+
+def _select_hinge_values(work: np.ndarray, n: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    '''
+    The values (x[i], x[j]) at the _hinge_positions(n) of the sorted values of `work`, along its last axis
+    (1-D, or 2-D with one series of n values per row). `work` is reordered in place.
+
+    Selection, not sorting: one partition at the median, then one in each part, in place (a partition
+    with several kth at once is much slower); the other value of a pair is the max of the part before it.
+    '''
+    _, (i1, j1), (i2, j2), (i3, j3), _ = _hinge_positions(n)
+
+    def _pair(part: np.ndarray, i: int, j: int) -> tuple[np.ndarray, np.ndarray]:
+        x_j = part[..., j]   # part is partitioned at j, so part[..., :j] holds the j smaller values
+        return (part[..., :j].max(axis=-1) if i != j else x_j), x_j
+
+    work.partition(j2, axis=-1)
+    q2 = _pair(work, i2, j2)
+
+    low = work[..., :j2]   # views: the lower half is low, the upper half is at the end of high
+    high = work[..., j2:]
+    low.partition(j1, axis=-1)
+    q1 = _pair(low, i1, j1)
+    high.partition(j3 - j2, axis=-1)
+    q3 = _pair(high, i3 - j2, j3 - j2)
+
+    minimum = low[..., :j1 + 1].min(axis=-1)
+    maximum = high[..., j3 - j2:].max(axis=-1)
+    return [(minimum, minimum), q1, q2, q3, (maximum, maximum)]
+
+
+def _five_number_summary_select(values: np.ndarray) -> tuple[Numeric, Numeric, Numeric, Numeric, Numeric]:
+    '''five_number_summary() of a 1-D array by selecting only the needed order statistics.'''
+    work = np.array(values)   # the one copy, reordered in place
+
+    summary = []
+    for (x_i, x_j), (i, j) in zip(_select_hinge_values(work, len(work)), _hinge_positions(len(work))):
+        x_i = x_i.item()   # Python int/float, so the arithmetic is that of the 'sort' method
+        summary.append(x_i if i == j else (x_i + x_j.item()) / 2)
+    return tuple(summary)
+
+
+def five_number_summary(lst: Union[list[Numeric], np.ndarray, 'pd.Series'],
+                        method: Optional[str] = 'sort') -> tuple[Numeric, Numeric, Numeric, Numeric, Numeric]:
     '''Returns the 5-number summary of lst, i.e. (min, Q1, Q2, Q3, max)
-    Q2 is the median'''
+    Q2 is the median
+    Q1 and Q3 are Tukey's hinges: the medians of the lower and upper halves (without the median itself
+    when len(lst) is odd)
+
+    lst can be a list, or a 1-D numpy.ndarray or pandas.Series, whose dtype (bool, int, uint, float) is
+    checked instead of each element
+
+    method: 'sort'   - sort a copy of lst, then split it into halves (default)
+            'select' - selection (np.partition()) of just the order statistics needed, in linear time,
+                       without sorting or copying halves; same results, returned as Python int/float
+    '''
+    if method not in ('sort', 'select'):
+        raise ValueError(f"method must be 'sort' or 'select'; {method = }")
+
+    if isinstance(lst, list):
+        if len(lst) <= 1:
+            raise ValueError("input list must be of length >= 2")
+
+        if not all(isinstance(e, (int, float)) for e in lst):
+            raise TypeError("elements in lst must be int or float")
+
+        if method == 'select':
+            return _five_number_summary_select(np.asarray(lst))
+    else:
+        values = _numeric_1d_array(lst, 'lst')
+        if len(values) <= 1:
+            raise ValueError("input list must be of length >= 2")
+
+        if method == 'select':
+            return _five_number_summary_select(values)
+        lst = values.tolist()   # Python int/float, like a list input
     
     def _list_split(lst):   # <--------- moved inside to be an inner/nested function,
                             # <--------- aka nested function
@@ -1138,12 +3701,6 @@ def five_number_summary(lst: list[Numeric]) -> tuple[Numeric, Numeric, Numeric,
 
         return median, low_lst, high_lst
 
-    if len(lst) <= 1: 
-        raise ValueError("input list must be of length >= 2")
-
-    if not all(isinstance(e, (int, float)) for e in lst):
-        raise TypeError("elements in lst must be int or float")
-   
     lst = sorted(lst)
 
     Q2, low_lst, high_lst = _list_split(lst)                            
@@ -1170,23 +3727,146 @@ assert five_number_summary([1, 2, 3, 7, 8, 8, 11, 15, 17]) == (1, 2.5, 8, 13, 17
 assert five_number_summary([1, 1, 1, 1]) == (1, 1, 1, 1, 1), \
                 "[1,1,1,1] failed 5-number summary"
 
-five_number_summary.__version__ = five_number_summary.version = '0.1'
+assert five_number_summary([1, 2, 3, 7, 8, 8, 11, 15, 17], method='select') == (1, 2.5, 8, 13, 17), \
+                "failed 5-number summary (select)"
+assert five_number_summary([1, 1, 1, 1], method='select') == (1, 1, 1, 1, 1), \
+                "[1,1,1,1] failed 5-number summary (select)"
+
+five_number_summary.__version__ = five_number_summary.version = '0.2'
 
 # -------------------------------------------------------------------------------------------------------
 
-import numpy as np   # for numpy.quantile() method, .number
+import mmap   # for madvise()
+import numpy as np   # for numpy.quantile() method, .number, histogram(), memmap
 from typing import Union
 Numeric = Union[float, int, complex, np.number]
 
-def five_number_summary2(lst: list[Numeric]) -> tuple[Numeric, Numeric, Numeric, Numeric, Numeric]:
+_QUANTILE_CHUNK_SIZE = 1 << 22   # values per chunk (32 MiB of float64) when reading a np.memmap
+_QUANTILE_BINS = 1 << 16   # histogram bins per refinement pass
+_QUANTILE_GATHER = 1 << 20   # at most this many candidate values are read into memory at once
+
+
+def _lerp(a: float, b: float, t: float) -> np.float64:
+    '''Linear interpolation between a and b, computed like numpy.quantile() does.'''
+    a, b = np.float64(a), np.float64(b)
+    if t == 0:
+        return a
+    return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+
+
+def _chunked_order_statistics(values: np.ndarray, ranks: list[int], chunk_size: int) -> Optional[dict[int, float]]:
+    '''
+    The values at the 0-based ranks of the sorted values of the 1-D array `values` (e.g. a np.memmap),
+    reading it chunk by chunk, never all of it, and never writing to it; None if there are NaNs.
+
+    For each rank, a range [lo, hi] known to hold it is narrowed by a histogram pass over the values
+    in the range, until the values in the range are few enough to be gathered and partitioned.
+    '''
+    mapping = values
+    while mapping is not None and not isinstance(mapping, mmap.mmap):
+        mapping = getattr(mapping, 'base', None)   # a np.memmap's (or its view's) base chain ends at its mmap
+    if mapping is not None and (getattr(values, 'mode', None) != 'r' or not hasattr(mapping, 'madvise')):
+        mapping = None
+    if mapping is not None:
+        mapping_address = np.frombuffer(mapping, dtype=np.uint8).ctypes.data
+
+    def _chunks():
+        for start in range(0, len(values), chunk_size):
+            view = values[start:start + chunk_size]
+            yield np.asarray(view, dtype=float)
+            if mapping is not None:
+                # read-only mapping: drop the chunk's pages, so the resident set stays about one chunk
+                begin = view.ctypes.data - mapping_address
+                aligned = begin - begin % mmap.PAGESIZE
+                mapping.madvise(mmap.MADV_DONTNEED, aligned, begin + view.nbytes - aligned)
+
+    minimum, maximum = np.inf, -np.inf
+    for chunk in _chunks():
+        chunk_min = chunk.min()
+        if np.isnan(chunk_min):
+            return None
+        minimum, maximum = min(minimum, chunk_min), max(maximum, chunk.max())
+
+    found = {rank: value for rank, value in ((0, minimum), (len(values) - 1, maximum)) if rank in ranks}
+    # per rank: [lo, hi, number of values < lo, number of values in [lo, hi]]
+    ranges = {rank: [minimum, maximum, 0, len(values)] for rank in ranks if rank not in found}
+
+    def _too_narrow(lo: float, hi: float) -> bool:   # for _QUANTILE_BINS distinct bin edges
+        return not (np.diff(np.linspace(lo, hi, _QUANTILE_BINS + 1)) > 0).all()
+
+    while ranges:
+        gather = {rank: r for rank, r in ranges.items() if r[3] <= _QUANTILE_GATHER or _too_narrow(r[0], r[1])}
+        refine = {rank: r for rank, r in ranges.items() if rank not in gather}
+
+        # ranks sharing a range share its pass
+        shared = {(r[0], r[1]) for r in gather.values()}
+        gathered = {bounds: [] for bounds in shared}
+        histograms = {(r[0], r[1]): np.zeros(_QUANTILE_BINS, dtype=np.int64) for r in refine.values()}
+        if any(lo != hi for lo, hi in shared) or histograms:
+            for chunk in _chunks():
+                for (lo, hi), parts in gathered.items():
+                    if lo != hi:
+                        parts.append(chunk[(chunk >= lo) & (chunk <= hi)])
+                for (lo, hi), counts in histograms.items():
+                    counts += np.histogram(chunk[(chunk >= lo) & (chunk <= hi)], bins=_QUANTILE_BINS,
+                                           range=(lo, hi))[0]
+
+        for rank, (lo, hi, below, _) in gather.items():
+            if lo == hi:
+                found[rank] = lo
+            else:
+                candidates = np.concatenate(gathered[(lo, hi)])
+                found[rank] = np.partition(candidates, rank - below)[rank - below]
+
+        ranges = {}
+        for rank, (lo, hi, below, _) in refine.items():
+            counts = histograms[(lo, hi)]
+            edges = np.histogram_bin_edges([], bins=_QUANTILE_BINS, range=(lo, hi))
+            cumulative = below + np.cumsum(counts)
+            b = int(np.searchsorted(cumulative, rank, side='right'))   # the bin holding the rank
+            # bins are [edge, next edge), the last one [edge, hi]
+            new_hi = hi if b == _QUANTILE_BINS - 1 else min(np.nextafter(edges[b + 1], -np.inf), hi)
+            ranges[rank] = [edges[b], new_hi, int(cumulative[b] - counts[b]), int(counts[b])]
+    return found
+
+
+def five_number_summary2(lst: Union[list[Numeric], np.ndarray, 'pd.Series'],
+                         chunk_size: Optional[int] = None) -> tuple[Numeric, Numeric, Numeric, Numeric, Numeric]:
     '''Returns the 5-number summary of lst, i.e. (min, Q1, Q2, Q3, max)
-    Q2 is the median'''
+    Q2 is the median
+
+    lst can be a list (of int, float or numpy scalars), or a 1-D numpy.ndarray, np.memmap or pandas.Series,
+    whose dtype (bool, int, uint, float) is checked instead of each element; an array is used as is,
+    not converted to a list
 
-    if len(lst) <= 1: 
-        raise ValueError("input list must be of length >= 2")
+    A np.memmap (e.g. a 10 GB array on disk) is read in chunks of chunk_size values (default 4M), so only
+    a few chunks are in memory at a time: exact quantiles are found by narrowing histogram passes, then
+    selecting among the few remaining values. chunk_size also makes an in-memory array be read in chunks.
+    '''
+    if isinstance(lst, list):
+        if len(lst) <= 1:
+            raise ValueError("input list must be of length >= 2")
 
-    if not all(isinstance(e, (int, float)) for e in lst):
-        raise TypeError("elements in lst must be int or float")   
+        if not all(isinstance(e, (int, float, np.integer, np.floating, np.bool_)) for e in lst):
+            raise TypeError("elements in lst must be int or float")
+    else:
+        values = _numeric_1d_array(lst, 'lst')
+        if len(values) <= 1:
+            raise ValueError("input list must be of length >= 2")
+
+        if isinstance(lst, np.memmap) or chunk_size is not None:
+            if isinstance(lst, np.memmap):
+                values = lst   # np.asarray() drops the np.memmap (and its mode)
+            # like numpy.quantile(): the q quantile is at (virtual) position q * (n - 1), between the values
+            # at ranks int(p) and int(p) + 1
+            positions = [q * (len(values) - 1) for q in (0, 0.25, 0.5, 0.75, 1)]
+            ranks = sorted({int(p) for p in positions} | {int(p) + 1 for p in positions if p != int(p)})
+            order_statistics = _chunked_order_statistics(values, ranks, chunk_size or _QUANTILE_CHUNK_SIZE)
+            if order_statistics is None:
+                return (np.float64(np.nan),) * 5   # NaNs, like numpy.quantile()
+            return tuple(_lerp(order_statistics[int(p)], order_statistics.get(int(p) + 1, 0), p - int(p))
+                         for p in positions)
+        lst = values
 
     # note that np.quantile() returns a list
     # this function, five_number_summary2() returns a tuple
@@ -1204,7 +3884,305 @@ assert five_number_summary2([1, 2, 3, 7, 8, 8, 11, 15, 17]) == ( 1.,  3.,  8., 1
 assert five_number_summary2([1, 1, 1, 1]) == (1, 1, 1, 1, 1), \
                 "[1,1,1,1] failed 5-number summary"
 
-five_number_summary2.__version__ = five_number_summary2.version = '0.1'
+five_number_summary2.__version__ = five_number_summary2.version = '0.2'
+
+# -------------------------------------------------------------------------------------------------------
+
+import numpy as np   # for sort(), partition(), quantile()
+import warnings   # for catch_warnings()
+
+def five_number_summary_frame(df: 'pd.DataFrame',
+                              method: Optional[str] = 'hinge') -> 'pd.DataFrame':
+    '''Returns the 5-number summary (min, Q1, Q2, Q3, max) of every numeric column of df, as a DataFrame
+    with one row per column: count (of non-NaN values), min, Q1, Q2, Q3, max
+
+    The numeric columns are taken as one 2-D float array and summarized together along one axis,
+    not column by column; NaNs are ignored (a column with fewer than 2 values gets NaNs)
+
+    method: 'hinge'  - Tukey's hinges, like five_number_summary() (default); selected with np.partition()
+                       over all columns at once, or one np.sort() if there are NaNs
+            'linear' - numpy's linear interpolation, like five_number_summary2(); one np.quantile()
+                       over all columns, or np.nanquantile() if there are NaNs
+
+    Usage/Examples:
+        five_number_summary_frame(df)
+        five_number_summary_frame(df[['price', 'clicks']], method='linear')
+    '''
+    import pandas as pd
+
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df must be a pandas.DataFrame; {type(df) = }")
+
+    if method not in ('hinge', 'linear'):
+        raise ValueError(f"method must be 'hinge' or 'linear'; {method = }")
+
+    numeric = df.select_dtypes(include='number')
+    # one 2-D block, columns x rows: pandas stores a block column by column, so this is usually a view,
+    # and each column's values are contiguous for the reductions along axis 1
+    values = numeric.to_numpy(dtype=float).T
+    nan_mask = np.isnan(values)
+    has_nan = nan_mask.any()
+    counts = values.shape[1] - nan_mask.sum(axis=1)
+    columns = ['min', 'Q1', 'Q2', 'Q3', 'max']
+
+    if values.shape[1] < 2 or values.shape[0] == 0:
+        summary = np.full((values.shape[0], 5), np.nan)
+    elif method == 'linear':
+        quantile = np.nanquantile if has_nan else np.quantile
+        with warnings.catch_warnings():   # an all-NaN column is NaN, no warning needed
+            warnings.simplefilter('ignore', RuntimeWarning)
+            summary = quantile(values, [0, 0.25, 0.5, 0.75, 1], axis=1).T
+    else:
+        if has_nan:
+            # NaNs sort last, so each column's values are its first counts[c] values
+            ordered = np.sort(values, axis=1)
+            positions = _hinge_positions(np.maximum(counts, 2))   # per column; columns with < 2 values masked below
+            rows = np.arange(values.shape[0])
+            pairs = [(ordered[rows, i], ordered[rows, j]) for i, j in positions]
+        else:
+            # a copy, since the selection reorders it in place
+            pairs = _select_hinge_values(values.copy(), values.shape[1])
+        summary = np.column_stack([(x_i + x_j) / 2 for x_i, x_j in pairs])
+
+    summary[counts < 2] = np.nan
+    result = pd.DataFrame(summary, index=numeric.columns, columns=columns)
+    result.insert(0, 'count', counts)
+    return result
+
+five_number_summary_frame.__version__ = five_number_summary_frame.version = '0.1'
+
+# -------------------------------------------------------------------------------------------------------
+
+import numpy as np   # for sort(), bincount()
+
+def grouped_five_number_summary(values: Union[np.ndarray, 'pd.Series', list[Numeric]],
+                                keys: Union[np.ndarray, 'pd.Series', 'pd.DataFrame', list],
+                                method: Optional[str] = 'hinge') -> 'pd.DataFrame':
+    '''Returns the 5-number summary (min, Q1, Q2, Q3, max) of values for every group of keys, as a DataFrame
+    with one row per group (sorted by key): count (of non-NaN values), min, Q1, Q2, Q3, max
+
+    values: 1-D array-like of a bool, int, uint or float dtype
+    keys:   the group of each value: a 1-D array-like (e.g. df['city']), or several of them as a DataFrame
+            or a list of 1-D array-likes (e.g. df[['city', 'property_type']]); rows with a missing key
+            or a NaN value are ignored
+
+    One sort for all groups instead of a groupby loop: keys are factorized to group numbers, one sort
+    orders the values by group, then by value, and every group's order statistics are picked at once
+    from its offset in the sorted values. A group with fewer than 2 values gets NaNs.
+
+    method: 'hinge'  - Tukey's hinges, like five_number_summary() (default)
+            'linear' - numpy's linear interpolation, like five_number_summary2()
+
+    Usage/Examples:
+        grouped_five_number_summary(df['clicks'], df['city'])
+        grouped_five_number_summary(df['clicks'], df[['city', 'property_type']], method='linear')
+    '''
+    import pandas as pd
+
+    if method not in ('hinge', 'linear'):
+        raise ValueError(f"method must be 'hinge' or 'linear'; {method = }")
+
+    values = _numeric_1d_array(values, 'values')
+    if isinstance(keys, pd.DataFrame):
+        keys = pd.MultiIndex.from_frame(keys)
+    elif isinstance(keys, (list, tuple)) and keys and all(np.ndim(key) == 1 for key in keys):
+        keys = pd.MultiIndex.from_arrays(keys)
+    elif not isinstance(keys, (pd.Series, pd.Index, np.ndarray)):
+        keys = np.asarray(keys)
+    if len(keys) != len(values):
+        raise ValueError(f"values and keys must have the same length; {len(values) = }, {len(keys) = }")
+
+    codes, groups = pd.factorize(keys, sort=True)   # missing keys get code -1
+    if not isinstance(groups, pd.Index):
+        groups = pd.Index(groups, name=getattr(keys, 'name', None))
+
+    values = values.astype(float, copy=False)
+    keep = (codes >= 0) & ~np.isnan(values)
+    if not keep.all():
+        values, codes = values[keep], codes[keep]
+
+    # one sort by group, then by value: complex numbers sort by real, then imaginary part, so sorting
+    # codes + 1j * values needs no index array (np.lexsort() is an indirect sort, over twice as slow)
+    pairs = np.empty(len(values), dtype=np.complex128)
+    pairs.real = codes
+    pairs.imag = values
+    pairs.sort()
+    ordered = pairs.imag
+    counts = np.bincount(codes, minlength=len(groups))
+    starts = np.cumsum(counts) - counts   # each group's offset in ordered
+    columns = ['min', 'Q1', 'Q2', 'Q3', 'max']
+
+    if len(ordered) == 0:
+        summary = np.full((len(groups), 5), np.nan)
+    else:
+        n = np.maximum(counts, 2)   # groups with < 2 values are masked below
+        last = len(ordered) - 1
+
+        def _at(positions: np.ndarray) -> np.ndarray:
+            return ordered[np.minimum(starts + positions, last)]
+
+        if method == 'linear':
+            summary = []
+            for q in (0, 0.25, 0.5, 0.75, 1):
+                position = q * (n - 1)
+                below = np.floor(position).astype(np.int64)
+                fraction = position - below
+                low, high = _at(below), _at(np.minimum(below + 1, n - 1))
+                summary.append(low + (high - low) * fraction)
+        else:
+            summary = [(_at(i) + _at(j)) / 2 for i, j in _hinge_positions(n)]
+        summary = np.column_stack(summary)
+
+    summary[counts < 2] = np.nan
+    result = pd.DataFrame(summary, index=groups, columns=columns)
+    result.insert(0, 'count', counts)
+    return result
+
+grouped_five_number_summary.__version__ = grouped_five_number_summary.version = '0.1'
+
+# -------------------------------------------------------------------------------------------------------
+
+import numpy as np   # for column comparisons
+from typing import Callable, Iterable, Iterator
+
+def _iqr_columns(df: 'pd.DataFrame', columns: Optional[Union[str, List[str]]]) -> List[str]:
+    '''columns (default: the numeric columns of df) as a list.'''
+    if columns is None:
+        return df.select_dtypes(include='number').columns.tolist()
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _sketch_quartiles(sketch: 'KLLSketch', method: str) -> Tuple[float, float]:
+    '''Q1 and Q3 of the values of sketch by method, as five_number_summary_frame() computes them on all the values.'''
+    n = sketch.count
+    if n < 2:
+        return np.nan, np.nan
+    if method == 'hinge':
+        _, (i1, j1), _, (i3, j3), _ = _hinge_positions(n)
+        x_i1, x_j1, x_i3, x_j3 = sketch._order_statistics([i1, j1, i3, j3])
+        return (x_i1 + x_j1) / 2, (x_i3 + x_j3) / 2
+
+    # numpy's linear interpolation: position q * (n - 1), between the values at its floor and ceiling
+    positions = np.array([0.25, 0.75]) * (n - 1)
+    below = np.floor(positions).astype(np.int64)
+    x_below = sketch._order_statistics(below)
+    x_above = sketch._order_statistics(np.minimum(below + 1, n - 1))
+    q1, q3 = x_below + (positions - below) * (x_above - x_below)
+    return q1, q3
+
+
+def iqr_fences(data: Union['pd.DataFrame', Iterable['pd.DataFrame'], Callable[[], Iterable['pd.DataFrame']]],
+               columns: Optional[Union[str, List[str]]] = None,
+               k: float = 1.5,
+               method: Optional[str] = 'hinge',
+               sketch_k: int = 200) -> 'pd.DataFrame':
+    '''Returns Tukey's fences of columns of data, as a DataFrame with one row per column:
+    Q1, Q3, IQR (= Q3 - Q1), lower (= Q1 - k * IQR), upper (= Q3 + k * IQR)
+
+    data:    a DataFrame, whose quartiles come from five_number_summary_frame() (method 'hinge' or
+             'linear'), for all columns at once;
+             or chunks of one: a list of DataFrames, an iterator (e.g. pd.read_csv(..., chunksize=...)), or
+             a function returning one; read in one pass into a KLLSketch per column (of accuracy sketch_k),
+             so memory does not grow with the number of rows; Q1 and Q3 follow the same method, from the
+             sketch's order statistics: exact while a column has at most sketch_k values, approximate
+             (within the sketch's rank_error) beyond
+    columns: a column name, a list of them, or None for all numeric columns
+    method:  'hinge' (Tukey's hinges, default) or 'linear' (numpy's linear interpolation)
+
+    A column with fewer than 2 values gets NaN fences, as in five_number_summary_frame().
+    '''
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        summary = five_number_summary_frame(data[_iqr_columns(data, columns)], method=method)
+        q1, q3 = summary['Q1'], summary['Q3']
+    else:
+        if method not in ('hinge', 'linear'):
+            raise ValueError(f"method must be 'hinge' or 'linear'; {method = }")
+        sketches = {}
+        for chunk in (data() if callable(data) else data):
+            if not sketches:
+                sketches = {column: KLLSketch(k=sketch_k) for column in _iqr_columns(chunk, columns)}
+            for column, sketch in sketches.items():
+                sketch.update(chunk[column].to_numpy(dtype=float))
+        if not sketches:
+            raise ValueError("data has no chunks")
+        quartiles = [_sketch_quartiles(sketch, method) for sketch in sketches.values()]
+        q1, q3 = (pd.Series(values, index=list(sketches)) for values in zip(*quartiles))
+
+    fences = pd.DataFrame({'Q1': q1, 'Q3': q3, 'IQR': q3 - q1})
+    fences['lower'] = fences['Q1'] - k * fences['IQR']
+    fences['upper'] = fences['Q3'] + k * fences['IQR']
+    return fences
+
+iqr_fences.__version__ = iqr_fences.version = '0.2'
+
+
+def _iqr_outliers_frame(df: 'pd.DataFrame', fences: 'pd.DataFrame', output: str):
+    '''iqr_outliers() of one DataFrame, given its fences.'''
+    import pandas as pd
+
+    # one 2-D float block compared with the fences broadcast along its rows; NaNs are never outliers
+    values = df[fences.index].to_numpy(dtype=float)
+    outside = (values < fences['lower'].to_numpy()) | (values > fences['upper'].to_numpy())
+    if output == 'columns':
+        return pd.DataFrame(outside, index=df.index, columns=fences.index)
+
+    mask = outside.any(axis=1)
+    if output == 'filter':
+        return df[~mask]
+    return pd.Series(mask, index=df.index, name='outlier')
+
+
+def iqr_outliers(data: Union['pd.DataFrame', Iterable['pd.DataFrame'], Callable[[], Iterable['pd.DataFrame']]],
+                 columns: Optional[Union[str, List[str]]] = None,
+                 k: float = 1.5,
+                 output: Optional[str] = 'mask',
+                 fences: Optional['pd.DataFrame'] = None,
+                 method: Optional[str] = 'hinge',
+                 sketch_k: int = 200) -> Union['pd.Series', 'pd.DataFrame', Iterator[Union['pd.Series', 'pd.DataFrame']]]:
+    '''Flags the outliers of columns of data by Tukey's fences: values below Q1 - k * IQR or above Q3 + k * IQR
+
+    The fences of all columns are computed at once by iqr_fences() (or given as fences, e.g. from an
+    earlier iqr_fences() call), and every row is compared with them by broadcasting, with no per-row Python.
+
+    data:    a DataFrame;
+             or chunks of one (see iqr_fences()): fences come from a first pass over the chunks (or are
+             given), then the chunks are flagged in a second, streaming pass, and a generator of one result
+             per chunk is returned; an iterator can only be read once, so either give fences, or a list of
+             chunks or a function returning the chunks (e.g. lambda: pd.read_csv(..., chunksize=...))
+    columns: a column name, a list of them, or None for all numeric columns
+    output:  'mask'    - boolean Series, True for rows with an outlier in any of the columns (default)
+             'columns' - boolean DataFrame, True for each outlier value
+             'filter'  - data without the rows with an outlier
+    method, sketch_k: see iqr_fences()
+
+    Usage/Examples:
+        iqr_outliers(df, ['price', 'clicks'])
+        df_clean = iqr_outliers(df, 'clicks', k=3, output='filter')
+
+        chunks = lambda: pd.read_csv('clicks.csv', chunksize=1_000_000)
+        for clean in iqr_outliers(chunks, 'clicks', output='filter'):
+            ...
+    '''
+    import pandas as pd
+
+    if output not in ('mask', 'columns', 'filter'):
+        raise ValueError(f"output must be 'mask', 'columns' or 'filter'; {output = }")
+
+    if fences is None:
+        if not isinstance(data, pd.DataFrame) and not callable(data) and iter(data) is data:
+            raise ValueError("an iterator of chunks can only be read once: give fences, "
+                             "or a list of chunks or a function returning the chunks")
+        fences = iqr_fences(data, columns, k=k, method=method, sketch_k=sketch_k)
+    elif columns is not None:
+        fences = fences.loc[[columns] if isinstance(columns, str) else list(columns)]
+
+    if isinstance(data, pd.DataFrame):
+        return _iqr_outliers_frame(data, fences, output)
+    return (_iqr_outliers_frame(chunk, fences, output) for chunk in (data() if callable(data) else data))
+
+iqr_outliers.__version__ = iqr_outliers.version = '0.1'
 
 # -------------------------------------------------------------------------------------------------------
 
@@ -1814,6 +4792,668 @@ DummyContextManager.__version__ = DummyContextManager.version = '0.2'
 
 # -------------------------------------------------------------------------------------------------------
 
+import collections   # for deque()
+import select   # for select() on the inotify file descriptor
+import time   # for monotonic(), sleep()
+
+
+class _Inotify:
+    """
+    Minimal inotify(7) watch on one directory via ctypes (Linux only).
+    Used by FollowTail to sleep until something in the directory of the followed file changes.
+    """
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+
+    def __init__(self, dir_path: str):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1() failed')
+
+        mask = (self.IN_MODIFY | self.IN_ATTRIB | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM
+                | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE)
+        if libc.inotify_add_watch(self.fd, os.fsencode(dir_path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch() failed for {dir_path}')
+
+    def wait(self, timeout: float) -> bool:
+        """Blocks until an event arrives or `timeout` seconds pass; returns True if there were events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):   # drain; the events only mean "look again"
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FollowTail:
+    """
+    Iterator that follows a growing file, like the unix 'tail -f'.
+    Created by ed_utils.tail(filename, follow=True).
+
+    First yields the last `num_lines` lines of the file, then keeps the file open and yields each
+    new line (without its line ending) as it is appended. Only the newly appended bytes are read
+    on each wake-up; the file is never re-read from the start.
+
+    Waiting for new data uses inotify on Linux and falls back to polling with an adaptive interval
+    (starting at `min_interval`, doubling up to `max_interval` while the file is idle).
+    Truncation (file shrinks) restarts reading at the beginning of the file.
+    Rotation (a new file appears under `filename`) finishes the old file, including a last line without
+    a trailing newline, then follows the new one; until the new file can be opened, the old one is kept.
+    A last line without a trailing newline is also yielded when the follow ends on `timeout`.
+    Undecodable bytes are replaced rather than ending the follow.
+
+    Notes:
+        Uses context manager protocol of classes
+        with __enter__() and __exit__() methods
+
+    Usage/Example:
+        import ed_utils
+
+        with ed_utils.tail('logs/scoring.log', follow=True) as follower:
+            for line in follower:
+                print(line)
+                if 'DONE' in line:
+                    break
+            print(follower.stats())   # lines, seconds, lines_per_second, rotations, ...
+
+        # stop on its own after 30 idle seconds
+        for line in ed_utils.tail('logs/scoring.log', follow=True, timeout=30):
+            print(line)
+    """
+
+    _READ_SIZE = 1024 * 1024   # bytes read per wake-up
+
+    def __init__(self,
+                 filename: str,
+                 num_lines: int = 10,
+                 encoding: str = 'utf-8',
+                 timeout: Optional[float] = None,
+                 min_interval: float = 0.05,
+                 max_interval: float = 1.0):
+        self.filename = filename
+        self.encoding = encoding
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.lines = 0
+        self.bytes = 0
+        self.rotations = 0
+        self.truncations = 0
+        self._start = time.monotonic()
+        self._last_data = self._start
+        self._interval = min_interval
+        self._pending = collections.deque()
+        self._partial = b''
+
+        self._file = open(filename, 'rb')
+        self._file.seek(_tail_offset(self._file, num_lines))
+
+        self._inotify = None
+        try:
+            self._inotify = _Inotify(os.path.dirname(os.path.abspath(filename)))
+        except (OSError, AttributeError):   # not Linux, no libc symbol, or out of watches
+            self._inotify = None
+        self.backend = 'inotify' if self._inotify is not None else 'polling'
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            if self._pending:
+                return self._pending.popleft()
+
+            if self._file is None:
+                raise StopIteration
+
+            if self._read_available():
+                continue
+
+            if self._reopen_if_rotated_or_truncated():
+                continue
+
+            now = time.monotonic()
+            if self.timeout is not None and now - self._last_data >= self.timeout:
+                self._flush_partial()   # the last line had no trailing newline
+                self.close()
+                continue
+
+            self._wait()
+
+    def _read_available(self) -> bool:
+        """Reads newly appended bytes into complete lines; returns True if any bytes were read."""
+        data = self._file.read(self._READ_SIZE)
+        if not data:
+            return False
+
+        self.bytes += len(data)
+        self._last_data = time.monotonic()
+        self._interval = self.min_interval
+
+        *complete, self._partial = (self._partial + data).split(b'\n')
+        for raw in complete:
+            self._pending.append(raw.rstrip(b'\r').decode(self.encoding, errors='replace'))
+        self.lines += len(complete)
+        return True
+
+    def _reopen_if_rotated_or_truncated(self) -> bool:
+        """At EOF: detects truncation or rotation of `filename`; returns True if reading restarted."""
+        current = os.fstat(self._file.fileno())
+        if current.st_size < self._file.tell():
+            self.truncations += 1
+            self._file.seek(0)
+            self._partial = b''
+            return True
+
+        try:
+            on_disk = os.stat(self.filename)
+        except FileNotFoundError:   # rotated away, new file not created yet
+            return False
+
+        if (on_disk.st_dev, on_disk.st_ino) != (current.st_dev, current.st_ino):
+            try:
+                new_file = open(self.filename, 'rb')
+            except FileNotFoundError:   # renamed again since the stat; retried on the next wake-up
+                return False
+            self.rotations += 1
+            self._flush_partial()   # last line of the old file had no trailing newline
+            self._file.close()
+            self._file = new_file
+            return True
+
+        return False
+
+    def _flush_partial(self) -> None:
+        """Queues the bytes after the last newline as a line of their own."""
+        if self._partial:
+            self._pending.append(self._partial.rstrip(b'\r').decode(self.encoding, errors='replace'))
+            self.lines += 1
+            self._partial = b''
+
+    def _wait(self) -> None:
+        if self.timeout is not None:
+            remaining = max(0.0, self.timeout - (time.monotonic() - self._last_data))
+        else:
+            remaining = self.max_interval
+
+        if self._inotify is not None:
+            # max_interval is still a safety net, e.g. for network filesystems without events
+            self._inotify.wait(min(self.max_interval, remaining))
+        else:
+            time.sleep(min(self._interval, remaining))
+            self._interval = min(self._interval * 2, self.max_interval)
+
+    @property
+    def lines_per_second(self) -> float:
+        """Throughput since the follow started."""
+        elapsed = time.monotonic() - self._start
+        return self.lines / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> dict:
+        """Returns lines, bytes, seconds, lines_per_second, rotations, truncations and backend."""
+        return {
+            'lines': self.lines,
+            'bytes': self.bytes,
+            'seconds': time.monotonic() - self._start,
+            'lines_per_second': self.lines_per_second,
+            'rotations': self.rotations,
+            'truncations': self.truncations,
+            'backend': self.backend,
+        }
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> bool:
+        self.close()
+        return False
+
+FollowTail.__version__ = FollowTail.version = '0.2'
+
+# -------------------------------------------------------------------------------------------------------
+
+import os   # for stat(), scandir()
+import sqlite3   # for the on-disk cache
+from typing import List, Optional, Tuple, Union
+import threading   # for Lock()
+import time   # for time()
+
+class _CachedDirEntry:
+    """
+    Stand-in for os.DirEntry for an entry listed from a MetadataCache: name, path and is_dir() come from
+    the cache; stat() is made (once) on demand.
+    """
+    __slots__ = ('name', 'path', '_is_dir', '_is_dir_no_follow', '_stat')
+
+    def __init__(self, dir_path: str, name: str, flags: int):
+        self.name = name
+        self.path = os.path.join(dir_path, name)
+        self._is_dir = bool(flags & 1)
+        self._is_dir_no_follow = bool(flags & 2)
+        self._stat = None
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._is_dir if follow_symlinks else self._is_dir_no_follow
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if not follow_symlinks:
+            return os.lstat(self.path)
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+class MetadataCache:
+    """
+    Opt-in on-disk (SQLite) cache of filesystem metadata for tree(), ls_l() and wc(), which take it as
+    their `cache` argument, e.g. for the same large data directories listed and counted again and again.
+
+    Two kinds of entries are kept, each keyed by absolute path and checked on every use:
+        directory listings - the names of the entries of a directory and whether they are directories,
+                             valid while the directory's mtime and inode are unchanged (adding, removing
+                             or renaming an entry changes the directory's mtime); an unchanged directory
+                             costs one stat instead of listing it, and only changed directories are rescanned
+        wc() counts        - per file, encoding and unit, valid while the file's size, mtime and inode
+                             are unchanged
+    An entry whose mtime is within `racy_seconds` of now is not stored, since a change within the same
+    mtime tick would go unnoticed.
+    Paths and names are stored as bytes (os.fsencode()), so names that are not valid UTF-8 are cached
+    as they are.
+    The cache uses its own file: an existing SQLite database with other tables is refused (ValueError),
+    never modified. A cache file from an older version of MetadataCache is emptied.
+
+    Usage/Examples:
+        import ed_utils
+
+        cache = ed_utils.MetadataCache('data_cache.sqlite')
+        ed_utils.tree('data', cache=cache)
+        ed_utils.ls_l('data', recursive=True, cache=cache)
+        ed_utils.wc('data/listings.csv', cache=cache)
+        cache.stats()   # {'hits': ..., 'misses': ..., 'hit_rate': ..., ...}
+
+        with ed_utils.MetadataCache() as cache:   # closed at the end
+            ...
+    """
+    _APPLICATION_ID = 0x45445543   # PRAGMA application_id of a MetadataCache database, b'EDUC'
+    _SCHEMA_VERSION = 2   # PRAGMA user_version of the database
+    _TABLES = ('ed_utils_listings', 'ed_utils_wc_counts')
+
+    def __init__(self, filename: str = 'ed_utils_cache.sqlite', racy_seconds: float = 2.0):
+        self.filename = filename
+        self.racy_seconds = racy_seconds
+        self.listing_hits = self.listing_misses = 0
+        self.wc_hits = self.wc_misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        try:
+            self._create_tables()
+        except (sqlite3.DatabaseError, ValueError):
+            self.close()
+            raise
+
+    def _create_tables(self) -> None:
+        """
+        Creates the cache's tables. Only a new (empty) database or one made by MetadataCache is used:
+        the tables of any other SQLite database are never changed.
+        """
+        with self._db:
+            tables = {name for name, in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                                         "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'")}
+            if self._db.execute('PRAGMA application_id').fetchone()[0] != self._APPLICATION_ID:
+                if tables:
+                    raise ValueError(f'{self.filename} is not a MetadataCache database (it has tables '
+                                     f'{sorted(tables)}); use another filename')
+                self._db.execute(f'PRAGMA application_id = {self._APPLICATION_ID}')
+            elif tables - set(self._TABLES):
+                raise ValueError(f'{self.filename} has tables MetadataCache does not own: '
+                                 f'{sorted(tables - set(self._TABLES))}; use another filename')
+            if self._db.execute('PRAGMA user_version').fetchone()[0] < self._SCHEMA_VERSION:
+                # an older schema of the cache's own tables; its entries are dropped, not converted
+                for table in self._TABLES:
+                    self._db.execute(f'DROP TABLE IF EXISTS {table}')
+                self._db.execute(f'PRAGMA user_version = {self._SCHEMA_VERSION}')
+            self._db.execute('CREATE TABLE IF NOT EXISTS ed_utils_listings '
+                             '(path BLOB PRIMARY KEY, mtime_ns INTEGER, ino INTEGER, names BLOB, flags BLOB)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS ed_utils_wc_counts '
+                             '(path BLOB, encoding TEXT, unit TEXT, size INTEGER, mtime_ns INTEGER, ino INTEGER, '
+                             'lines INTEGER, words INTEGER, chars INTEGER, PRIMARY KEY (path, encoding, unit))')
+
+    def _is_racy(self, mtime_ns: int) -> bool:
+        return time.time() - mtime_ns / 1e9 < self.racy_seconds
+
+    def scandir(self, dir_path: str) -> List[Union[os.DirEntry, _CachedDirEntry]]:
+        """
+        The entries of directory `dir_path`, like list(os.scandir(dir_path)): from the cache if the
+        directory is unchanged, otherwise listed (and cached).
+        """
+        dir_stat = os.stat(dir_path)
+        key = os.fsencode(os.path.abspath(dir_path))
+        with self._lock:
+            row = self._db.execute('SELECT mtime_ns, ino, names, flags FROM ed_utils_listings WHERE path = ?',
+                                   (key,)).fetchone()
+        if row is not None and row[:2] == (dir_stat.st_mtime_ns, dir_stat.st_ino):
+            self.listing_hits += 1
+            names, flags = row[2], row[3]
+            # names are b'\0' separated; no file name contains b'\0'
+            return [_CachedDirEntry(dir_path, os.fsdecode(name), flag)
+                    for name, flag in zip(names.split(b'\0') if names else [], flags)]
+
+        self.listing_misses += 1
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        if not self._is_racy(dir_stat.st_mtime_ns):
+            flags = bytes(entry.is_dir() | entry.is_dir(follow_symlinks=False) << 1 for entry in entries)
+            with self._lock, self._db:
+                self._db.execute('INSERT OR REPLACE INTO ed_utils_listings VALUES (?, ?, ?, ?, ?)',
+                                 (key, dir_stat.st_mtime_ns, dir_stat.st_ino,
+                                  b'\0'.join(os.fsencode(entry.name) for entry in entries), flags))
+        return entries
+
+    def wc(self, filename: str, encoding: str, unit: str, count) -> Tuple[int, int, int]:
+        """The wc() counts of `filename`: from the cache if the file is unchanged, otherwise count() (and cached)."""
+        file_stat = os.stat(filename)   # before counting, so a change while counting is seen next time
+        key = (os.fsencode(os.path.abspath(filename)), encoding, unit)
+        with self._lock:
+            row = self._db.execute('SELECT size, mtime_ns, ino, lines, words, chars FROM ed_utils_wc_counts '
+                                   'WHERE path = ? AND encoding = ? AND unit = ?', key).fetchone()
+        if row is not None and row[:3] == (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino):
+            self.wc_hits += 1
+            return row[3:]
+
+        self.wc_misses += 1
+        counts = count()
+        if not self._is_racy(file_stat.st_mtime_ns):
+            with self._lock, self._db:
+                self._db.execute('INSERT OR REPLACE INTO ed_utils_wc_counts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 key + (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino) + tuple(counts))
+        return counts
+
+    @property
+    def hits(self) -> int:
+        return self.listing_hits + self.wc_hits
+
+    @property
+    def misses(self) -> int:
+        return self.listing_misses + self.wc_misses
+
+    def stats(self) -> dict:
+        """Returns hits, misses, hit_rate, the hits and misses per kind of entry, and the number of entries stored."""
+        with self._lock:
+            listings = self._db.execute('SELECT COUNT(*) FROM ed_utils_listings').fetchone()[0]
+            wc_counts = self._db.execute('SELECT COUNT(*) FROM ed_utils_wc_counts').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'listing_hits': self.listing_hits,
+            'listing_misses': self.listing_misses,
+            'wc_hits': self.wc_hits,
+            'wc_misses': self.wc_misses,
+            'listings': listings,
+            'wc_counts': wc_counts,
+        }
+
+    def clear(self) -> None:
+        """Removes all entries and resets the statistics."""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM ed_utils_listings')
+            self._db.execute('DELETE FROM ed_utils_wc_counts')
+        self.listing_hits = self.listing_misses = 0
+        self.wc_hits = self.wc_misses = 0
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> bool:
+        self.close()
+        return False
+
+MetadataCache.__version__ = MetadataCache.version = '0.3'
+
+# -------------------------------------------------------------------------------------------------------
+
+import math   # for ceil()
+import struct   # for the to_bytes() header
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np   # for sort(), cumsum(), searchsorted()
+
+class KLLSketch:
+    """
+    Streaming, mergeable quantile sketch (KLL: Karnin, Lang and Liberty, 2016) for data that does not fit
+    in memory, e.g. an approximate five-number summary of a click history read in chunks.
+
+    Values are added in chunks with update(); the sketch keeps a bounded number of them (about 3 * k,
+    whatever the length of the stream) in levels, where a value at level h stands for 2**h values of the
+    stream. A full level is sorted and every other value (from a random first one) moves up one level.
+
+    Quantiles are approximate: the rank of a returned value is within about rank_error * count of the
+    requested rank (rank_error is about 1.3% for the default k=200, with high probability); min and max
+    are exact. Give either k, or epsilon (the wanted rank_error) to pick k.
+
+    Sketches built separately (e.g. in worker processes, sent back with to_bytes() or pickle) are
+    combined with merge(), and have the same error bound as one sketch of all the values.
+
+    Usage/Examples:
+        import ed_utils
+        import pandas as pd
+
+        sketch = ed_utils.KLLSketch(epsilon=0.005)
+        for chunk in pd.read_csv('clicks.csv', usecols=['clicks'], chunksize=1_000_000):
+            sketch.update(chunk['clicks'])
+        sketch.five_number_summary()   # (min, Q1, Q2, Q3, max)
+        sketch.quantiles([0.1, 0.9])
+
+        # in each worker:  return ed_utils.KLLSketch().update(part).to_bytes()
+        total = ed_utils.KLLSketch()
+        for data in results:
+            total.merge(ed_utils.KLLSketch.from_bytes(data))
+    """
+    _C = 2 / 3   # each level below the top has at most 2/3 the capacity of the one above it
+    _MIN_CAPACITY = 2
+    _HEADER = struct.Struct('<4sIQddI')   # magic, k, count, min, max, number of levels
+    _MAGIC = b'KLL1'
+
+    def __init__(self, k: Optional[int] = 200, epsilon: Optional[float] = None, seed: Optional[int] = None):
+        if epsilon is not None:
+            if not 0 < epsilon < 1:
+                raise ValueError(f"epsilon must be between 0 and 1; {epsilon = }")
+            # inverse of rank_error, the empirical bound of the Apache DataSketches KLL sketch
+            k = math.ceil((2.296 / epsilon) ** (1 / 0.9723))
+        if not isinstance(k, int) or k < 8:
+            raise ValueError(f"k must be an int >= 8; {k = }")
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Normalized rank error (as a fraction of count) of the quantiles, at 99% confidence."""
+        return 2.296 / self.k ** 0.9723
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, count={self.count}, retained={self.retained})"
+
+    @property
+    def retained(self) -> int:
+        """Number of values kept by the sketch."""
+        return sum(len(level) for level in self._levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - 1 - level
+        return max(math.ceil(self.k * self._C ** depth), self._MIN_CAPACITY)
+
+    def _compress(self) -> None:
+        # compact the lowest full level until the sketch is within its total capacity
+        while self.retained > sum(self._capacity(h) for h in range(len(self._levels))):
+            for h, level in enumerate(self._levels):
+                if len(level) >= self._capacity(h):
+                    break
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+
+            kept = level[:len(level) % 2]   # with an odd number of values, one stays at this level
+            level = np.sort(level[len(kept):])
+            promoted = level[self._rng.integers(2)::2]
+            self._levels[h] = kept
+            self._levels[h + 1] = np.concatenate((self._levels[h + 1], promoted))
+
+    def update(self, values: Union[float, Sequence[float], np.ndarray, 'pd.Series']) -> 'KLLSketch':
+        """
+        Adds a value or a chunk of values (list, numpy.ndarray, pandas.Series) of a bool, int, uint or
+        float dtype; NaNs are ignored. Returns the sketch.
+        """
+        values = _numeric_1d_array(np.atleast_1d(values), 'values').astype(float, copy=False)
+        values = values[~np.isnan(values)]   # also a copy, so the caller's array is never kept
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate((self._levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Adds the values summarized by other (a KLLSketch with the same k) to this sketch. Returns the sketch."""
+        if not isinstance(other, KLLSketch):
+            raise TypeError(f"other must be a KLLSketch; {type(other) = }")
+        if other.k != self.k:
+            raise ValueError(f"cannot merge sketches with different k; {self.k = }, {other.k = }")
+        if other.count == 0:
+            return self
+
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, level in enumerate(other._levels):
+            self._levels[h] = np.concatenate((self._levels[h], level))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """
+        Approximate quantiles of the values, for each q in qs (0 <= q <= 1): the smallest retained value
+        whose (weighted) rank reaches q * count. q=0 and q=1 give the exact min and max.
+        """
+        if self.count == 0:
+            raise ValueError("the sketch is empty")
+        qs = np.asarray(qs, dtype=float)
+        if np.any((qs < 0) | (qs > 1)):
+            raise ValueError(f"quantiles must be between 0 and 1; {qs = }")
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        ranks = np.cumsum(weights[order])   # ranks[-1] == count
+        positions = np.searchsorted(ranks, qs * self.count, side='left')
+        result = values[np.minimum(positions, len(values) - 1)]
+        result[qs == 0] = self.min
+        result[qs == 1] = self.max
+        return result.tolist()
+
+    def _order_statistics(self, positions: Sequence[int]) -> np.ndarray:
+        """
+        Approximate values at the 0-based positions of the sorted values: the smallest retained value whose
+        (weighted) rank reaches position + 1; exact while nothing has been compacted (count <= k).
+        """
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        ranks = np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, np.asarray(positions, dtype=np.int64) + 1, side='left')
+        return values[order][np.minimum(positions, len(values) - 1)]
+
+    def quantile(self, q: float) -> float:
+        """Approximate q quantile of the values (0 <= q <= 1)."""
+        return self.quantiles([q])[0]
+
+    def five_number_summary(self) -> Tuple[float, float, float, float, float]:
+        """Returns the approximate 5-number summary of the values, i.e. (min, Q1, Q2, Q3, max); min and max are exact."""
+        if self.count < 2:
+            raise ValueError("the sketch must have >= 2 values")
+        return tuple(self.quantiles([0, 0.25, 0.5, 0.75, 1]))
+
+    def to_bytes(self) -> bytes:
+        """The sketch serialized as bytes; see from_bytes()."""
+        lengths = [len(level) for level in self._levels]
+        return b''.join([self._HEADER.pack(self._MAGIC, self.k, self.count, self.min, self.max, len(lengths)),
+                         np.asarray(lengths, dtype='<u8').tobytes()]
+                        + [level.astype('<f8', copy=False).tobytes() for level in self._levels])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: Optional[int] = None) -> 'KLLSketch':
+        """A sketch from the bytes of to_bytes()."""
+        magic, k, count, min_, max_, n_levels = cls._HEADER.unpack_from(data)
+        if magic != cls._MAGIC:
+            raise ValueError("data is not a serialized KLLSketch")
+        offset = cls._HEADER.size
+        lengths = np.frombuffer(data, dtype='<u8', count=n_levels, offset=offset)
+        offset += 8 * n_levels
+
+        sketch = cls(k=k, seed=seed)
+        sketch.count, sketch.min, sketch.max = count, min_, max_
+        sketch._levels = []
+        for length in lengths.tolist():
+            sketch._levels.append(np.frombuffer(data, dtype='<f8', count=length, offset=offset).astype(float))
+            offset += 8 * length
+        return sketch
+
+KLLSketch.__version__ = KLLSketch.version = '0.1'
+
+# -------------------------------------------------------------------------------------------------------
+
 from typing import Any
 
 def inspector(obj: Any, verbose:bool = False) -> tuple[list[str], list[str], list[str], str, str]:
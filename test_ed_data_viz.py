@@ -0,0 +1,95 @@
+"""
+Tests for ed_data_viz.py
+
+python -m pytest -q test_ed_data_viz.py
+"""
+import os
+
+import matplotlib
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+import ed_data_viz
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'price': rng.normal(100, 15, 1_000)})
+
+
+@pytest.mark.parametrize('close', [False, True])
+def test_plot_histogram_warm_cache_returns_fig_ax(df, tmp_path, close):
+    cache = ed_data_viz.RenderCache(str(tmp_path / 'cache'))
+    file_path = str(tmp_path / 'price.png')
+
+    cold_fig, _ = ed_data_viz.plot_histogram('price', df, file_path=file_path, cache=cache, close=True)
+    fig, ax = ed_data_viz.plot_histogram('price', df, file_path=file_path, cache=cache, close=close)
+
+    assert cache.stats()['hits'] == 1
+    assert isinstance(fig, plt.Figure) and isinstance(ax, plt.Axes)
+    assert ax.figure is fig
+    assert fig is not cold_fig
+    image = ax.get_images()[0].get_array()
+    assert image.shape[:2] == plt.imread(file_path).shape[:2]
+    ax.set_title('warm')   # the returned axes is usable
+    assert plt.fignum_exists(fig.number) != close
+    plt.close('all')
+
+
+def test_plot_bar_categorical_warm_cache_returns_fig_ax(tmp_path):
+    cache = ed_data_viz.RenderCache(str(tmp_path / 'cache'))
+    file_path = str(tmp_path / 'counts.png')
+    counts = {'a': 3, 'b': 5, 'c': 2}
+
+    ed_data_viz.plot_bar_categorical(counts, file_path=file_path, cache=cache, close=True)
+    fig, ax = ed_data_viz.plot_bar_categorical(counts, file_path=file_path, cache=cache)
+
+    assert cache.stats()['hits'] == 1
+    assert ax.figure is fig and len(ax.get_images()) == 1
+    plt.close('all')
+
+
+def test_vector_file_path_is_not_cached(df, tmp_path):
+    cache = ed_data_viz.RenderCache(str(tmp_path / 'cache'))
+    file_path = str(tmp_path / 'price.svg')
+
+    for _ in range(2):
+        fig, ax = ed_data_viz.plot_histogram('price', df, file_path=file_path, cache=cache, close=True)
+        assert not ax.get_images()   # rendered, not read back from the cache
+
+    assert cache.stats()['hits'] == 0
+    plt.close('all')
+
+
+@pytest.mark.parametrize('values', [np.array([-100, 0, 100, 50], dtype=np.int8),
+                                    np.array([-2**62, 0, 2**62], dtype=np.int64),
+                                    np.array([-2**63, 2**63 - 1], dtype=np.int64)])
+@pytest.mark.parametrize('bins', [10, 'auto'])
+def test_binned_counts_integer_span_does_not_overflow(values, bins):
+    edges, counts = ed_data_viz._binned_counts(values, bins)
+    assert counts.tolist() == np.histogram(values, bins=edges)[0].tolist()
+    fig, ax = ed_data_viz.plot_histogram_(pd.Series(values), close=True)
+    assert ax is not None
+
+
+def test_plot_features_cache_respects_max_categories(tmp_path):
+    cache = ed_data_viz.RenderCache(str(tmp_path / 'cache'))
+    df = pd.DataFrame({'city': [f'c{i % 12}' for i in range(120)], 'price': np.arange(120.0)})
+
+    first = ed_data_viz.plot_features(df, str(tmp_path / 'run1'), cache=cache, workers=1)
+    assert first.set_index('feature')['kind'].to_dict() == {'city': 'bar', 'price': 'histogram'}
+
+    second = ed_data_viz.plot_features(df, str(tmp_path / 'run2'), cache=cache, workers=1, max_categories=5)
+    assert second.set_index('feature')['kind'].to_dict() == {'city': 'skipped', 'price': 'histogram'}
+    assert not os.path.exists(tmp_path / 'run2' / 'city.png')
+    plt.close('all')
+
+
+def test_plot_features_rejects_zero_workers(df, tmp_path):
+    with pytest.raises(ValueError):
+        ed_data_viz.plot_features(df, str(tmp_path), workers=0)
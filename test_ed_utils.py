@@ -0,0 +1,364 @@
+"""
+Tests for ed_utils.py
+
+python -m pytest -q test_ed_utils.py
+"""
+import gzip
+import os
+import random
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ed_utils
+
+
+# -------------------------------------------------------------------------------------------------------
+# tail
+
+def test_iter_tail_numbers_lines_tail_does_not_count(tmp_path, monkeypatch, capsys):
+    filename = str(tmp_path / 'data.txt')
+    with open(filename, 'w') as file:
+        file.write(''.join(f'line {i}\n' for i in range(1, 1_001)))
+
+    assert list(ed_utils.iter_tail(filename, 2)) == [(999, 'line 999'), (1_000, 'line 1000')]
+
+    def no_counting(*args):
+        raise AssertionError('tail() must not count the lines before the last ones')
+
+    monkeypatch.setattr(ed_utils, '_count_newlines', no_counting)
+    ed_utils.tail(filename, 2)
+    assert capsys.readouterr().out == 'line 999\nline 1000\n'
+
+
+# -------------------------------------------------------------------------------------------------------
+# line index
+
+def test_provisional_line_index_is_verified_then_trusted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ed_utils, '_LINE_INDEX_RACY_NS', 200_000_000)
+    filename = str(tmp_path / 'fresh.txt')
+    with open(filename, 'w') as file:
+        file.write(''.join(f'{i}\n' for i in range(1_000)))
+
+    ed_utils.build_line_index(filename)   # right after writing: provisional
+    assert ed_utils._load_line_index(filename) is None
+    time.sleep(0.25)
+    assert ed_utils._load_line_index(filename).num_lines == 1_000   # verified against the content
+    with open(filename + '.lidx', 'rb') as index_file:
+        header = ed_utils._LINE_INDEX_HEADER.unpack(index_file.read(ed_utils._LINE_INDEX_HEADER.size))
+    assert header[3] - header[2] >= ed_utils._LINE_INDEX_RACY_NS   # marked trusted
+    assert ed_utils.lines(filename, -2) == ['998', '999']
+
+
+def test_provisional_line_index_rejects_same_size_rewrite(tmp_path, monkeypatch):
+    monkeypatch.setattr(ed_utils, '_LINE_INDEX_RACY_NS', 200_000_000)
+    filename = str(tmp_path / 'fresh.txt')
+    with open(filename, 'w') as file:
+        file.write('a\nb\n')
+    ed_utils.build_line_index(filename)
+    file_stat = os.stat(filename)
+    with open(filename, 'w') as file:   # same size, same mtime
+        file.write('ab\n\n')
+    os.utime(filename, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+
+    time.sleep(0.25)
+    assert ed_utils._load_line_index(filename) is None
+    assert ed_utils.lines(filename, 0) == ['ab', '']
+
+
+# -------------------------------------------------------------------------------------------------------
+# compressed files
+
+def _lines(count: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return b''.join(b'%d %s\n' % (i, b'x' * rng.randint(0, 80)) for i in range(count))
+
+
+def _write(path, data: bytes, mtime_age: float = 10.0) -> str:
+    """Writes data to path, with an mtime `mtime_age` seconds ago (so an index of it is not racy)."""
+    path.write_bytes(data)
+    past = time.time() - mtime_age
+    os.utime(path, (past, past))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_cached_gzip_indexes():
+    ed_utils._gzip_indexes.clear()
+    yield
+    ed_utils._gzip_indexes.clear()
+
+
+needs_libz = pytest.mark.skipif(ed_utils._libz() is None, reason='zlib C library not available')
+
+
+@needs_libz
+@pytest.mark.parametrize('members', [1, 4])
+def test_gzip_index_reads_like_gzip(tmp_path, members):
+    data = _lines(100_000)
+    parts = [data[i * len(data) // members:(i + 1) * len(data) // members] for i in range(members)]
+    filename = _write(tmp_path / 'data.gz', b''.join(gzip.compress(part, compresslevel=6) for part in parts))
+
+    index = ed_utils._GzipIndex(filename, span=1 << 16)
+    assert index.uncompressed_size == len(data)
+    assert index.newlines == data.count(b'\n')
+    assert len(index.checkpoints) > members
+    rng = random.Random(1)
+    for _ in range(50):
+        start = rng.randrange(len(data) + 1)
+        end = min(len(data), start + rng.randrange(1 << 18))
+        assert index.read(start, end) == data[start:end]
+        assert index.count_newlines(start) == data[:start].count(b'\n')
+
+
+@needs_libz
+def test_gzip_index_skips_nul_padding(tmp_path):
+    data = _lines(20_000)
+    half = len(data) // 2
+    filename = _write(tmp_path / 'padded.gz',
+                      gzip.compress(data[:half]) + b'\0' * 100 + gzip.compress(data[half:]) + b'\0' * 4096)
+    assert gzip.open(filename).read() == data
+
+    index = ed_utils._GzipIndex(filename, span=1 << 14)
+    assert index.read(0, len(data)) == data
+    assert [line for _, line in ed_utils.iter_tail(filename, 2)] == data.decode().splitlines()[-2:]
+
+
+@needs_libz
+def test_gzip_index_truncated_file_raises_like_gzip(tmp_path):
+    filename = _write(tmp_path / 'truncated.gz', gzip.compress(_lines(20_000))[:-1000])
+    with pytest.raises(EOFError):
+        gzip.open(filename).read()
+    with pytest.raises(EOFError):
+        list(ed_utils.iter_tail(filename, 2))
+
+
+@needs_libz
+def test_gzip_index_sidecar_reload(tmp_path):
+    data = _lines(50_000)
+    filename = _write(tmp_path / 'data.gz', gzip.compress(data))
+
+    index_path = ed_utils.build_gzip_index(filename, span=1 << 16)
+    assert index_path == filename + '.gzidx'
+    built = ed_utils._gzip_indexes[os.path.abspath(filename)]
+
+    ed_utils._gzip_indexes.clear()
+    loaded = ed_utils._gzip_index(filename)
+    assert loaded is not built
+    assert loaded.checkpoints == built.checkpoints
+    assert loaded.read(len(data) - 1000, len(data)) == data[-1000:]
+
+    # a changed file makes the sidecar stale
+    _write(tmp_path / 'data.gz', gzip.compress(data + b'more\n'))
+    assert ed_utils._GzipIndex.load(filename, index_path) is None
+    assert [line for _, line in ed_utils.iter_tail(filename, 1)] == ['more']
+
+
+def test_bz2_magic_needs_block_header(tmp_path):
+    filename = _write(tmp_path / 'plain.txt', b'BZh is a plain text line\nsecond\n')
+    assert ed_utils._compression(filename) is None
+    assert list(ed_utils.iter_head(filename, 5)) == [(1, 'BZh is a plain text line'), (2, 'second')]
+
+    import bz2
+    for data in (b'', b'compressed\n'):
+        assert ed_utils._compression(_write(tmp_path / 'data.bz2', bz2.compress(data))) == 'bz2'
+
+
+@needs_libz
+def test_provisional_gzip_index_sidecar_is_verified_then_trusted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ed_utils, '_LINE_INDEX_RACY_NS', 200_000_000)
+    data = _lines(10_000)
+    filename = str(tmp_path / 'fresh.gz')
+    with open(filename, 'wb') as file:
+        file.write(gzip.compress(data))
+
+    index_path = ed_utils.build_gzip_index(filename)   # right after writing: provisional
+    assert ed_utils._GzipIndex.load(filename, index_path) is None
+    time.sleep(0.25)
+    loaded = ed_utils._GzipIndex.load(filename, index_path)   # verified against the content
+    assert loaded is not None and loaded.indexed_ns - loaded.mtime_ns >= ed_utils._LINE_INDEX_RACY_NS
+    assert loaded.read(0, len(data)) == data
+
+    with open(filename, 'wb') as file:
+        file.write(gzip.compress(data, mtime=0))
+    ed_utils.build_gzip_index(filename)   # provisional again
+    file_stat = os.stat(filename)
+    with open(filename, 'wb') as file:   # same size, same mtime, other content
+        file.write(gzip.compress(data, mtime=1))
+    os.utime(filename, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+    time.sleep(0.25)
+    assert ed_utils._GzipIndex.load(filename, index_path) is None
+
+
+# -------------------------------------------------------------------------------------------------------
+# wc_batch
+
+def test_wc_batch_recursive_does_not_follow_directory_symlinks(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.txt').write_text('one two\n')
+    (tmp_path / 'sub' / 'b.txt').write_text('three\nfour\n')
+    os.symlink(tmp_path, tmp_path / 'sub' / 'loop')   # a link back to a parent
+
+    table, totals = ed_utils.wc_batch(str(tmp_path), recursive=True)
+    assert sorted(os.path.relpath(path, tmp_path) for path in table['path']) == ['a.txt', os.path.join('sub', 'b.txt')]
+    assert totals['lines'] == 3
+
+
+def test_wc_batch_recursive_skips_unreadable_subdirectories(tmp_path, monkeypatch):
+    (tmp_path / 'locked').mkdir()
+    (tmp_path / 'locked' / 'c.txt').write_text('x\n')
+    (tmp_path / 'a.txt').write_text('a\n')
+    scandir = os.scandir
+
+    def scandir_denied(path):
+        if os.path.basename(path) == 'locked':
+            raise PermissionError(13, 'Permission denied', path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', scandir_denied)
+    table, totals = ed_utils.wc_batch(str(tmp_path), recursive=True)
+    assert list(table['path']) == [str(tmp_path / 'a.txt')] and totals['files'] == 1
+
+
+# -------------------------------------------------------------------------------------------------------
+# grep
+
+def test_iter_grep_many_regex_reports_every_pattern(tmp_path):
+    filename = str(tmp_path / 'log.txt')
+    with open(filename, 'w') as file:
+        file.write('an ERROR here\nnothing\nERR only\nfoo bar\nbar foo\n')
+
+    literal = list(ed_utils.iter_grep_many(['ERROR', 'ERR'], filename))
+    assert literal == [(1, 'an ERROR here', ['ERR', 'ERROR']), (3, 'ERR only', ['ERR'])]
+    assert list(ed_utils.iter_grep_many(['ERROR', 'ERR'], filename, regex=True)) == literal
+
+    # \A and lookbehinds see the line only, as in grep()
+    assert list(ed_utils.iter_grep_many([r'\Afoo', r'(?<=bar )foo'], filename, regex=True)) == \
+        [(4, 'foo bar', [r'\Afoo']), (5, 'bar foo', [r'(?<=bar )foo'])]
+
+
+def test_trie_regex_long_words():
+    words = [b'a' * 5_000, b'a' * 4_999 + b'b', b'a' * 10]
+    regex = re.compile(ed_utils._trie_regex(words))
+    assert all(regex.fullmatch(word) for word in words)
+    assert regex.fullmatch(b'a' * 11) is None
+
+
+@pytest.mark.parametrize('pattern, sees_past_line', [
+    (r'\Aa', True), (r'a\Z', True), (r'a(?=b)', True), (r'a(?!b)', True), (r'(?<=a)b', True), (r'(?<!a)b', True),
+    (r'^a', False), (r'b$', False), (r'a\s+b', False), (r'\\A', False), (r'\(?=', False), (r'(?P<x>a)', False),
+])
+def test_sees_past_line(pattern, sees_past_line):
+    assert ed_utils._sees_past_line(pattern.encode()) is sees_past_line
+
+
+@pytest.mark.parametrize('pattern', [r'\Ab', r'b\Z', r'(?<=a)b', r'^a', r'a\s+b'])
+def test_grep_files_matches_iter_grep(tmp_path, pattern):
+    rng = random.Random(pattern)
+    for i in range(3):
+        lines = (''.join(rng.choice('ab \t') for _ in range(rng.randint(0, 8))) for _ in range(40))
+        (tmp_path / f'f{i}.txt').write_text('\n'.join(lines) + '\n')
+
+    expected = [(str(tmp_path / f'f{i}.txt'), line_number, line) for i in range(3)
+                for line_number, line in ed_utils.iter_grep(pattern, str(tmp_path / f'f{i}.txt'))]
+    assert list(ed_utils.grep_files(pattern, str(tmp_path), workers=1)) == expected
+
+
+def test_grep_files_rejects_zero_workers(tmp_path):
+    with pytest.raises(ValueError):
+        ed_utils.grep_files('a', str(tmp_path), workers=0)
+
+
+# -------------------------------------------------------------------------------------------------------
+# KLLSketch
+
+def test_kll_sketch_is_exact_while_small():
+    values = np.random.default_rng(0).permutation(150).astype(float)
+    sketch = ed_utils.KLLSketch(k=200).update(values)
+    assert sketch.retained == 150
+    assert sketch.five_number_summary() == (0.0, 37.0, 74.0, 112.0, 149.0)
+    assert sketch._order_statistics([0, 1, 148, 149]).tolist() == [0.0, 1.0, 148.0, 149.0]
+
+
+def test_kll_sketch_rank_error_and_merge():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=200_000)
+    qs = np.linspace(0.01, 0.99, 99)
+
+    whole = ed_utils.KLLSketch(k=200, seed=2)
+    for chunk in np.array_split(values, 37):
+        whole.update(chunk)
+    merged = ed_utils.KLLSketch(k=200, seed=3)
+    for part in np.array_split(values, 4):
+        merged.merge(ed_utils.KLLSketch.from_bytes(ed_utils.KLLSketch(k=200, seed=4).update(part).to_bytes()))
+
+    ordered = np.sort(values)
+    for sketch in (whole, merged):
+        assert sketch.count == len(values) and sketch.retained < 3 * sketch.k
+        assert (sketch.min, sketch.max) == (ordered[0], ordered[-1])
+        ranks = np.searchsorted(ordered, sketch.quantiles(qs), side='right') / len(values)
+        assert np.max(np.abs(ranks - qs)) <= sketch.rank_error
+
+
+def test_kll_sketch_rejects_bad_input():
+    with pytest.raises(ValueError):
+        ed_utils.KLLSketch().quantile(0.5)
+    with pytest.raises(ValueError):
+        ed_utils.KLLSketch(k=100).merge(ed_utils.KLLSketch(k=200).update([1.0]))
+    with pytest.raises(ValueError):
+        ed_utils.KLLSketch().update([1.0]).quantile(1.5)
+
+
+# -------------------------------------------------------------------------------------------------------
+# iqr_fences, iqr_outliers
+
+@pytest.mark.parametrize('method, q3', [('hinge', 52.0), ('linear', 28.0)])
+def test_iqr_fences_chunks_use_the_same_quartiles(method, q3):
+    df = pd.DataFrame({'clicks': [1.0, 2.0, 4.0, 100.0], 'one': [np.nan, np.nan, np.nan, 5.0]})
+    in_memory = ed_utils.iqr_fences(df, method=method)
+    chunked = ed_utils.iqr_fences([df.iloc[:2], df.iloc[2:]], method=method)
+    pd.testing.assert_frame_equal(chunked, in_memory)
+    assert in_memory.loc['clicks', 'Q3'] == q3
+    assert in_memory.loc['one'].isna().all()   # fewer than 2 values
+
+    mask = ed_utils.iqr_outliers(df, 'clicks', method=method)
+    chunk_masks = ed_utils.iqr_outliers(lambda: iter([df.iloc[:2], df.iloc[2:]]), 'clicks', method=method)
+    assert pd.concat(list(chunk_masks)).tolist() == mask.tolist()
+
+
+def test_iqr_fences_chunks_approximate_large_columns():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({'price': rng.normal(100, 15, 100_000), 'clicks': rng.poisson(3, 100_000)})
+    chunks = [df.iloc[i:i + 7_000] for i in range(0, len(df), 7_000)]
+    exact = ed_utils.iqr_fences(df)
+    approximate = ed_utils.iqr_fences(chunks)
+
+    ordered = np.sort(df['price'].to_numpy())
+    ranks = np.searchsorted(ordered, approximate.loc['price', ['Q1', 'Q3']].to_numpy(), side='right') / len(df)
+    assert np.all(np.abs(ranks - [0.25, 0.75]) <= ed_utils.KLLSketch(k=200).rank_error)
+    # the many ties of the counts leave no room for error
+    assert approximate.loc['clicks'].tolist() == exact.loc['clicks'].tolist()
+
+
+def test_iqr_outliers_outputs():
+    df = pd.DataFrame({'price': [10.0, 11, 12, 13, 14, 500], 'clicks': [1.0, 2, 3, -400, 2, 1], 'name': list('abcdef')})
+    mask = ed_utils.iqr_outliers(df)
+    assert mask.tolist() == [False, False, False, True, False, True]
+    outside = ed_utils.iqr_outliers(df, output='columns')
+    assert list(outside.columns) == ['price', 'clicks']
+    assert outside['price'].tolist() == [False] * 5 + [True]
+    assert outside['clicks'].tolist() == [False, False, False, True, False, False]
+    assert ed_utils.iqr_outliers(df, 'price', output='filter').index.tolist() == [0, 1, 2, 3, 4]
+
+    fences = ed_utils.iqr_fences(df)
+    assert ed_utils.iqr_outliers(df, 'clicks', fences=fences).tolist() == outside['clicks'].tolist()
+
+    with pytest.raises(ValueError):
+        ed_utils.iqr_outliers(iter([df]))   # an iterator cannot be read twice
+    with pytest.raises(ValueError):
+        ed_utils.iqr_outliers(df, output='rows')
+    with pytest.raises(ValueError):
+        ed_utils.iqr_fences([df], method='nearest')